@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Indexed activity catalog for the activities agent
+
+Activities are loaded from a local JSON or CSV dataset and indexed by
+destination, by (destination, interest tag) and by price, so queries only
+touch the posting lists they need instead of scanning every activity.
+Posting lists are kept sorted by rating (best first), which lets top-k
+queries stop early.
+"""
+
+import csv
+import heapq
+import json
+import os
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "activities.json")
+
+_LIST_FIELDS = ("tags", "time_slots")
+_NUMBER_FIELDS = {"price": float, "rating": float, "duration_minutes": int, "lat": float, "lon": float}
+
+
+def destination_key(destination: str) -> str:
+    """'Munich, Germany' -> 'munich'"""
+    return destination.split(",")[0].strip().lower()
+
+
+def _normalize_activity(raw: Dict[str, Any]) -> Dict[str, Any]:
+    activity = dict(raw)
+    for name in _LIST_FIELDS:
+        value = activity.get(name) or []
+        if isinstance(value, str):
+            value = [v.strip() for v in value.split(";") if v.strip()]
+        activity[name] = value
+    for name, cast in _NUMBER_FIELDS.items():
+        if activity.get(name) not in (None, ""):
+            value = cast(activity[name])
+            activity[name] = int(value) if isinstance(value, float) and value.is_integer() else value
+    return activity
+
+
+class ActivityCatalog:
+    """In-memory activity catalog with inverted and filter indexes"""
+
+    def __init__(self, activities: Iterable[Dict[str, Any]] = ()):
+        self._activities: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, int] = {}
+        self._by_destination: Dict[str, List[int]] = {}
+        self._by_tag: Dict[tuple, List[int]] = {}
+        self._by_price: Dict[str, tuple] = {}
+        for activity in activities:
+            self._add(_normalize_activity(activity))
+        self._build_indexes()
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_DATASET) -> "ActivityCatalog":
+        """Load a catalog from a .json (list of objects) or .csv file"""
+        with open(path, newline="", encoding="utf-8") as f:
+            if path.endswith(".csv"):
+                return cls(csv.DictReader(f))
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self._activities)
+
+    def get(self, activity_id: str) -> Optional[Dict[str, Any]]:
+        index = self._by_id.get(activity_id)
+        return self._activities[index] if index is not None else None
+
+    def _add(self, activity: Dict[str, Any]):
+        index = len(self._activities)
+        self._activities.append(activity)
+        self._by_id[activity["id"]] = index
+        key = destination_key(activity["destination"])
+        self._by_destination.setdefault(key, []).append(index)
+        for tag in activity["tags"]:
+            self._by_tag.setdefault((key, tag.lower()), []).append(index)
+
+    def _build_indexes(self):
+        by_rating = lambda i: (-self._activities[i]["rating"], i)
+        for postings in self._by_destination.values():
+            postings.sort(key=by_rating)
+        for postings in self._by_tag.values():
+            postings.sort(key=by_rating)
+        for key, postings in self._by_destination.items():
+            ordered = sorted(postings, key=lambda i: self._activities[i]["price"])
+            self._by_price[key] = ([self._activities[i]["price"] for i in ordered], ordered)
+
+    def search(self, destination: str, interests: Iterable[str] = (), k: int = 10,
+               max_price: Optional[float] = None, min_rating: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Top-k activities at destination matching any interest, best rated first.
+
+        With no interests, returns the best-rated activities at the destination.
+        """
+        key = destination_key(destination)
+        tags = {interest.lower() for interest in interests}
+        if tags:
+            postings = [self._by_tag[(key, tag)] for tag in tags if (key, tag) in self._by_tag]
+            candidates = self._merge_by_rating(postings)
+        elif max_price is not None and key in self._by_price:
+            # Cheap activities only: restrict to the price-sorted prefix, then rank it
+            prices, ordered = self._by_price[key]
+            within_budget = ordered[:bisect_right(prices, max_price)]
+            candidates = iter(sorted(within_budget, key=lambda i: (-self._activities[i]["rating"], i)))
+        else:
+            candidates = iter(self._by_destination.get(key, ()))
+
+        results = []
+        for index in candidates:
+            activity = self._activities[index]
+            if min_rating is not None and activity["rating"] < min_rating:
+                break  # candidates arrive in rating order
+            if max_price is not None and activity["price"] > max_price:
+                continue
+            results.append(activity)
+            if len(results) >= k:
+                break
+        return results
+
+    def _merge_by_rating(self, postings: List[List[int]]):
+        """Lazily merge rating-sorted posting lists, skipping duplicates"""
+        if len(postings) == 1:
+            yield from postings[0]
+            return
+        activities = self._activities
+
+        def keyed(posting):
+            for i in posting:
+                yield -activities[i]["rating"], i
+
+        seen = set()
+        for _, index in heapq.merge(*(keyed(p) for p in postings)):
+            if index not in seen:
+                seen.add(index)
+                yield index
+
+
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+
+def default_catalog() -> ActivityCatalog:
+    """Catalog loaded from ACTIVITY_CATALOG_PATH (or activities.json), built on first use"""
+    global _default_catalog
+    if _default_catalog is None:
+        with _default_catalog_lock:
+            if _default_catalog is None:
+                _default_catalog = ActivityCatalog.load(os.environ.get("ACTIVITY_CATALOG_PATH", DEFAULT_DATASET))
+    return _default_catalog
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Shared, tuned AWS clients
+
+boto3 clients are thread-safe once created, so every caller in the process
+shares one bedrock-runtime client per configuration instead of building its own
+with botocore's defaults (10 pooled connections, legacy retries, 60 s timeouts).
+Defaults can be overridden with BEDROCK_* environment variables. boto3 and
+botocore are imported on first use, so importing this module is cheap.
+"""
+
+import os
+import threading
+from typing import Optional
+
+DEFAULT_REGION = "us-west-2"
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def bedrock_client_config(max_pool_connections: int = None, max_attempts: int = None,
+                          connect_timeout: float = None, read_timeout: float = None):
+    """botocore Config for Bedrock calls: larger pool, adaptive retries, explicit timeouts, TCP keepalive"""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=max_pool_connections or int(os.environ.get("BEDROCK_MAX_POOL_CONNECTIONS", 50)),
+        retries={
+            "mode": "adaptive",
+            "max_attempts": max_attempts or int(os.environ.get("BEDROCK_MAX_ATTEMPTS", 4)),
+        },
+        connect_timeout=connect_timeout or float(os.environ.get("BEDROCK_CONNECT_TIMEOUT", 3)),
+        read_timeout=read_timeout or float(os.environ.get("BEDROCK_READ_TIMEOUT", 30)),
+        tcp_keepalive=True,
+    )
+
+
+def get_bedrock_runtime_client(region_name: str = None, endpoint_url: Optional[str] = None,
+                               max_pool_connections: int = None, max_attempts: int = None,
+                               connect_timeout: float = None, read_timeout: float = None):
+    """Return the process-wide bedrock-runtime client for this configuration, creating it on first use"""
+    region_name = region_name or os.environ.get("AWS_REGION", DEFAULT_REGION)
+    endpoint_url = endpoint_url or os.environ.get("BEDROCK_ENDPOINT_URL") or None
+    config = bedrock_client_config(max_pool_connections, max_attempts, connect_timeout, read_timeout)
+    key = (
+        region_name, endpoint_url, config.max_pool_connections, config.retries["max_attempts"],
+        config.connect_timeout, config.read_timeout,
+    )
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    # boto3 sessions are not thread-safe, so client creation is serialized
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            import boto3
+            session = boto3.session.Session()
+            client = session.client("bedrock-runtime", region_name=region_name,
+                                    endpoint_url=endpoint_url, config=config)
+            _clients[key] = client
+        return client
+
+
+def reset_clients():
+    """Drop cached clients (tests, or after credentials change)"""
+    with _clients_lock:
+        _clients.clear()
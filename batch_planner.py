@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Batch trip planning: JSONL prompts in, JSONL plans out
+
+Each input line is a JSON object with a "prompt" (other fields such as "id"
+are echoed into the result) or a bare JSON string. Each output line is
+
+    {"index": <input line number from 0>, "id": ..., "prompt": ..., "response": {...}}
+
+Prompts are parsed up front and lines whose parsed trip requests are identical
+share one planning run while any of them is still unwritten; the shared plan
+is dropped once the last of those lines is written, so memory stays bounded by
+the read-ahead window (later repeats are answered by the plan cache). Plans
+run on the asyncio handler (threads) or on a pool of warm worker processes,
+with a bounded number in flight. Output is written in input order, or as plans
+finish with --unordered.
+
+Progress is checkpointed to <output>.checkpoint: the input byte offset and
+line index below which every result is on disk. --resume seeks the input
+there, drops any partial trailing output line and skips lines that were
+already written past the checkpoint.
+
+Usage:
+    python batch_planner.py prompts.jsonl plans.jsonl [--mode asyncio|process]
+        [--concurrency 8] [--workers 4] [--unordered] [--resume] [--no-cache]
+        [--summary-batch 8] [--summary-window-ms 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from invocation_backends import invoke_in_worker, warm_worker
+from summary_batcher import DEFAULT_SUMMARY_WINDOW, SummaryBatcher
+from travel_orchestrator import ainvoke_handler, error_response, orchestrator
+from trip_cache import trip_request_key
+
+MODES = ("asyncio", "process")
+DEFAULT_CONCURRENCY = 8
+WINDOW_PER_SLOT = 8  # lines read ahead of the checkpoint per concurrent plan
+CHECKPOINT_EVERY = 10
+
+
+def checkpoint_path(output_path: str) -> str:
+    return output_path + ".checkpoint"
+
+
+def read_lines(path: str, offset: int, index: int) -> Iterator[Tuple[int, int, str]]:
+    """Yield (index, end byte offset, text) for each non-blank line from offset"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            offset += len(raw)
+            text = raw.decode("utf-8").strip()
+            if text:
+                yield index, offset, text
+                index += 1
+
+
+def parse_line(text: str) -> Dict[str, Any]:
+    """Input line as a record dict; raises ValueError if it is not a JSON object or string"""
+    record = json.loads(text)
+    if isinstance(record, str):
+        record = {"prompt": record}
+    if not isinstance(record, dict):
+        raise ValueError("line must be a JSON string or object")
+    return record
+
+
+class BatchWriter:
+    """Writes result lines and advances the checkpoint over the contiguous done prefix"""
+
+    def __init__(self, output_path: str, input_path: str, next_index: int, input_offset: int,
+                 ordered: bool, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.output_path = output_path
+        self.input_path = input_path
+        self.next_index = next_index
+        self.input_offset = input_offset
+        self.ordered = ordered
+        self.checkpoint_every = checkpoint_every
+        self._out = open(output_path, "a", encoding="utf-8")
+        self._pending: Dict[int, Tuple[int, Optional[Dict[str, Any]]]] = {}
+        self._since_checkpoint = 0
+
+    def complete(self, index: int, end_offset: int, result: Optional[Dict[str, Any]]) -> int:
+        """Record a finished line (result None = already on disk); returns lines checkpointable"""
+        if result is not None and not self.ordered:
+            self._write(result)
+            result = None
+        self._pending[index] = (end_offset, result)
+        advanced = 0
+        while self.next_index in self._pending:
+            end_offset, result = self._pending.pop(self.next_index)
+            if result is not None:
+                self._write(result)
+            self.next_index += 1
+            self.input_offset = end_offset
+            advanced += 1
+        self._since_checkpoint += advanced
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+        return advanced
+
+    def _write(self, result: Dict[str, Any]):
+        self._out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    def checkpoint(self):
+        """Flush results, then atomically record how far the input is fully processed"""
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        state = {"input": os.path.abspath(self.input_path), "next_index": self.next_index,
+                 "input_offset": self.input_offset}
+        tmp_path = checkpoint_path(self.output_path) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, checkpoint_path(self.output_path))
+        self._since_checkpoint = 0
+
+    def close(self):
+        self.checkpoint()
+        self._out.close()
+
+
+def load_resume_state(input_path: str, output_path: str) -> Tuple[int, int, Set[int]]:
+    """(next_index, input_offset, indices already in the output past the checkpoint)"""
+    try:
+        with open(checkpoint_path(output_path), encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {"next_index": 0, "input_offset": 0}
+    if state.get("input", os.path.abspath(input_path)) != os.path.abspath(input_path):
+        raise ValueError(f"Checkpoint belongs to a different input: {state['input']}")
+
+    written = set()
+    if os.path.exists(output_path):
+        with open(output_path, "rb+") as f:
+            data = f.read()
+            complete = data[:data.rfind(b"\n") + 1]
+            if len(complete) != len(data):
+                f.truncate(len(complete))  # a crash mid-write leaves a partial line
+        for line in complete.splitlines():
+            index = json.loads(line)["index"]
+            if index >= state["next_index"]:
+                written.add(index)
+    return state["next_index"], state["input_offset"], written
+
+
+async def run_batch(input_path: str, output_path: str, mode: str = "asyncio",
+                    concurrency: int = DEFAULT_CONCURRENCY, workers: int = 4, ordered: bool = True,
+                    resume: bool = False, use_cache: bool = True,
+                    checkpoint_every: int = CHECKPOINT_EVERY, summary_batch_size: int = 1,
+                    summary_window: float = DEFAULT_SUMMARY_WINDOW) -> Dict[str, Any]:
+    """Plan every prompt in input_path into output_path; returns run statistics
+
+    summary_batch_size > 1 packs the summaries of plans that finish within
+    summary_window seconds of each other into shared model calls. Only plans
+    running in the same process can share a call, so this pays off in asyncio
+    mode.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of: {', '.join(MODES)}")
+    if resume:
+        next_index, input_offset, written = load_resume_state(input_path, output_path)
+    else:
+        next_index, input_offset, written = 0, 0, set()
+        open(output_path, "w").close()
+
+    stats = {"lines": 0, "planned": 0, "deduplicated": 0, "errors": 0, "skipped": 0,
+             "resumed_from": next_index}
+    writer = BatchWriter(output_path, input_path, next_index, input_offset, ordered, checkpoint_every)
+    window = asyncio.Semaphore(concurrency * WINDOW_PER_SLOT)
+    slots = asyncio.Semaphore(concurrency)
+    plans: Dict[str, asyncio.Task] = {}  # one planning task per distinct parsed request with unwritten lines
+    users: Dict[str, int] = {}  # request key -> lines waiting on or holding its plan
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker) if mode == "process" else None
+    loop = asyncio.get_running_loop()
+
+    async def plan(payload: Dict[str, Any]) -> Dict[str, Any]:
+        async with slots:
+            stats["planned"] += 1
+            try:
+                if pool is not None:
+                    return await loop.run_in_executor(pool, invoke_in_worker, payload)
+                return await ainvoke_handler(payload)
+            except Exception as e:
+                return error_response(e)
+
+    async def handle(index: int, end_offset: int, text: str):
+        result = {"index": index}
+        key = None
+        try:
+            record = parse_line(text)
+            result.update({k: v for k, v in record.items() if k not in ("index", "response")})
+            prompt = record.get("prompt")
+            if not isinstance(prompt, str) or not prompt.strip():
+                raise ValueError("line has no \"prompt\"")
+            trip_request = await asyncio.to_thread(orchestrator.parse_trip_request, prompt)
+            key = trip_request_key(trip_request)
+            task = plans.get(key)
+            if task is None:
+                payload = {"prompt": prompt, "trip_request": trip_request, "use_cache": use_cache}
+                task = plans[key] = asyncio.create_task(plan(payload))
+            else:
+                stats["deduplicated"] += 1
+            users[key] = users.get(key, 0) + 1
+            result["response"] = await task
+        except Exception as e:
+            result["response"] = error_response(e)
+        if "error" in result["response"]:
+            stats["errors"] += 1
+        for _ in range(writer.complete(index, end_offset, result)):
+            window.release()
+        if key in users:
+            # Every line sharing this plan has been handed to the writer
+            users[key] -= 1
+            if not users[key]:
+                del users[key], plans[key]
+
+    previous_batcher = orchestrator.summary_batcher
+    if summary_batch_size > 1:
+        orchestrator.summary_batcher = SummaryBatcher(orchestrator, summary_batch_size, summary_window)
+
+    start = time.perf_counter()
+    tasks = set()
+    try:
+        for index, end_offset, text in read_lines(input_path, input_offset, next_index):
+            await window.acquire()
+            stats["lines"] += 1
+            if index in written:
+                stats["skipped"] += 1
+                for _ in range(writer.complete(index, end_offset, None)):
+                    window.release()
+                continue
+            task = asyncio.create_task(handle(index, end_offset, text))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if orchestrator.summary_batcher is not previous_batcher:
+            stats["summary_calls"] = orchestrator.summary_batcher.stats()["model_calls"]
+            orchestrator.summary_batcher.close()
+            orchestrator.summary_batcher = previous_batcher
+    stats["elapsed_s"] = round(time.perf_counter() - start, 3)
+    if pool is None:
+        stats["summary_tokens"] = orchestrator.summary_usage.report()
+        stats["bedrock"] = orchestrator.bedrock_guard.metrics()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan every prompt in a JSONL file")
+    parser.add_argument('input', help="JSONL file of prompts")
+    parser.add_argument('output', help="JSONL file to write plans to")
+    parser.add_argument('--mode', choices=MODES, default="asyncio",
+                        help="asyncio: in-process handler on threads; process: warm worker processes")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Plans in flight at once")
+    parser.add_argument('--workers', type=int, default=4, help="Worker processes for --mode process")
+    parser.add_argument('--unordered', action='store_true', help="Write results as they finish")
+    parser.add_argument('--resume', action='store_true', help="Continue from the output's checkpoint")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass the trip plan cache")
+    parser.add_argument('--summary-batch', type=int, default=1,
+                        help="Pack up to this many AI summaries into one model call (asyncio mode)")
+    parser.add_argument('--summary-window-ms', type=float, default=DEFAULT_SUMMARY_WINDOW * 1000,
+                        help="How long a summary waits for others to share its model call")
+    args = parser.parse_args()
+
+    try:
+        stats = asyncio.run(run_batch(
+            args.input, args.output, mode=args.mode, concurrency=args.concurrency, workers=args.workers,
+            ordered=not args.unordered, resume=args.resume, use_cache=not args.no_cache,
+            summary_batch_size=args.summary_batch, summary_window=args.summary_window_ms / 1000))
+    except KeyboardInterrupt:
+        print(f"\n🛑 Interrupted - rerun with --resume to continue from {checkpoint_path(args.output)}",
+              file=sys.stderr)
+        sys.exit(130)
+    print(f"✅ {stats['lines']} lines, {stats['planned']} plans, {stats['deduplicated']} deduplicated, "
+          f"{stats['errors']} errors in {stats['elapsed_s']}s", file=sys.stderr)
+    print(json.dumps(stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Latency budget, hedged requests and a circuit breaker for Bedrock calls
+
+botocore retries and read timeouts can keep a summary waiting for minutes
+before the canned fallback is used. BedrockGuard runs each call in a worker
+thread and stops waiting once it is slower than the recent p95:
+
+- "hedge" mode sends a second, identical request and takes whichever answers
+  first, giving up at the latency budget
+- "fallback" mode gives up right away, so the caller answers with its
+  deterministic fallback
+- "off" only enforces the latency budget
+
+A circuit breaker opens when the error rate over the last calls is too high
+and then rejects calls without touching Bedrock until a cooldown has passed;
+one probe call decides whether it closes again. metrics() reports counters,
+failures by error code (e.g. ThrottlingException), latency percentiles and
+the breaker state.
+
+Abandoned calls cannot be interrupted; they finish in the background and
+their latency still feeds the p95.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Sequence
+
+SLOW_CALL_MODES = ("hedge", "fallback", "off")
+DEFAULT_LATENCY_BUDGET = 20.0   # seconds before a call is abandoned
+DEFAULT_HEDGE_AFTER = 8.0       # slow-call threshold until enough latencies are known
+MIN_HEDGE_AFTER = 0.05
+LATENCY_WINDOW = 200            # recent successful call latencies kept for percentiles
+MIN_LATENCY_SAMPLES = 20
+BREAKER_WINDOW = 20             # recent call outcomes the error rate is computed over
+BREAKER_MIN_CALLS = 10
+BREAKER_ERROR_RATE = 0.5
+BREAKER_COOLDOWN = 30.0
+
+
+class CircuitOpenError(Exception):
+    """The circuit breaker is open; the call was not sent"""
+
+
+class LatencyBudgetExceeded(TimeoutError):
+    """No answer within the latency budget (or the p95 threshold in fallback mode)"""
+
+
+def error_code(error: BaseException) -> str:
+    """AWS error code of a botocore ClientError, otherwise the exception class name"""
+    response = getattr(error, "response", None)
+    code = response.get("Error", {}).get("Code") if isinstance(response, dict) else None
+    return code or type(error).__name__
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(q / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker: closed -> open -> half_open -> closed"""
+
+    def __init__(self, window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 error_rate: float = BREAKER_ERROR_RATE, cooldown: float = BREAKER_COOLDOWN):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self._outcomes = deque(maxlen=window)  # True = success
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                return "half_open"
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now; after the cooldown only one probe at a time is let through"""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self._state = "half_open"
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record(self, success: bool):
+        with self._lock:
+            if self._state == "half_open":
+                self._probe_in_flight = False
+                if success:
+                    self._state = "closed"
+                    self._outcomes.clear()
+                    print("✅ Bedrock circuit breaker closed")
+                else:
+                    self._trip()
+                return
+            self._outcomes.append(success)
+            if self._state == "closed" and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.error_rate:
+                    self._trip()
+                    print(f"🔌 Bedrock circuit breaker open: {failures}/{len(self._outcomes)} recent calls failed")
+
+    def _trip(self):
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self.opened += 1
+
+
+class BedrockGuard:
+    """Runs Bedrock calls under a latency budget, with hedging and a circuit breaker"""
+
+    def __init__(self, latency_budget: float = DEFAULT_LATENCY_BUDGET, slow_call_mode: str = "hedge",
+                 hedge_after: float = DEFAULT_HEDGE_AFTER, breaker: Optional[CircuitBreaker] = None,
+                 max_workers: int = 32):
+        if slow_call_mode not in SLOW_CALL_MODES:
+            raise ValueError(f"Unknown slow call mode '{slow_call_mode}', expected one of: {', '.join(SLOW_CALL_MODES)}")
+        self.latency_budget = latency_budget
+        self.slow_call_mode = slow_call_mode
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bedrock-call")
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("calls", "successes", "failures", "hedged", "hedge_wins", "slow_fallbacks", "budget_exceeded",
+             "short_circuited"), 0)
+        self._errors = Counter()
+
+    @classmethod
+    def from_env(cls) -> "BedrockGuard":
+        """Guard configured from BEDROCK_LATENCY_BUDGET, BEDROCK_SLOW_CALL_MODE, BEDROCK_HEDGE_AFTER,
+        BEDROCK_BREAKER_ERROR_RATE and BEDROCK_BREAKER_COOLDOWN"""
+        breaker = CircuitBreaker(
+            error_rate=float(os.environ.get("BEDROCK_BREAKER_ERROR_RATE", BREAKER_ERROR_RATE)),
+            cooldown=float(os.environ.get("BEDROCK_BREAKER_COOLDOWN", BREAKER_COOLDOWN)),
+        )
+        return cls(
+            latency_budget=float(os.environ.get("BEDROCK_LATENCY_BUDGET", DEFAULT_LATENCY_BUDGET)),
+            slow_call_mode=os.environ.get("BEDROCK_SLOW_CALL_MODE", "hedge").lower(),
+            hedge_after=float(os.environ.get("BEDROCK_HEDGE_AFTER", DEFAULT_HEDGE_AFTER)),
+            breaker=breaker,
+        )
+
+    def slow_threshold(self) -> float:
+        """Seconds after which a call counts as slow: the recent p95, within [MIN_HEDGE_AFTER, budget]"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        threshold = percentile(latencies, 95) if len(latencies) >= MIN_LATENCY_SAMPLES else self.hedge_after
+        return min(max(threshold, MIN_HEDGE_AFTER), self.latency_budget)
+
+    def call(self, func: Callable[..., Any], *args) -> Any:
+        """func(*args) under the guard; raises CircuitOpenError, LatencyBudgetExceeded or func's error"""
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError("Bedrock circuit breaker is open")
+        self._count("calls")
+
+        start = time.monotonic()
+        slow_at = start + self.slow_threshold()
+        deadline = slow_at if self.slow_call_mode == "fallback" else start + self.latency_budget
+        attempts = [self._executor.submit(self._timed, func, args)]
+        pending = set(attempts)
+        error = None
+        while pending:
+            hedge_due = self.slow_call_mode == "hedge" and len(attempts) == 1 and slow_at < deadline
+            timeout = max(0.0, (slow_at if hedge_due else deadline) - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    if attempt is not attempts[0]:
+                        self._count("hedge_wins")
+                    self._finish(True)
+                    return attempt.result()
+                error = attempt.exception()
+            if not pending:
+                break
+            if time.monotonic() >= deadline:
+                self._count("slow_fallbacks" if self.slow_call_mode == "fallback" else "budget_exceeded")
+                error = LatencyBudgetExceeded(f"No Bedrock answer within {deadline - start:.2f}s")
+                self._finish(False, error)
+                raise error
+            if hedge_due:
+                self._count("hedged")
+                hedge = self._executor.submit(self._timed, func, args)
+                attempts.append(hedge)
+                pending.add(hedge)
+        self._finish(False, error)
+        raise error
+
+    def _timed(self, func, args):
+        start = time.monotonic()
+        result = func(*args)
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return result
+
+    def _finish(self, success: bool, error: Optional[BaseException] = None):
+        self._count("successes" if success else "failures")
+        if error is not None:
+            self.record_error(error)
+        self.breaker.record(success)
+
+    def record_error(self, error: BaseException):
+        """Count a failed Bedrock call by error code, also for calls made outside call()"""
+        with self._lock:
+            self._errors[error_code(error)] += 1
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._counters)
+            metrics["errors"] = dict(self._errors)
+            latencies = sorted(self._latencies)
+        metrics.update({
+            "latency_p50_s": round(percentile(latencies, 50), 4),
+            "latency_p95_s": round(percentile(latencies, 95), 4),
+            "slow_threshold_s": round(self.slow_threshold(), 4),
+            "slow_call_mode": self.slow_call_mode,
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+        })
+        return metrics
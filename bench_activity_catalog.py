@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark indexed activity search against a linear scan over a synthetic catalog
+
+Usage: python bench_activity_catalog.py [--activities 100000] [--queries 500]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from activity_catalog import ActivityCatalog, destination_key
+
+CITIES = ["Munich", "Berlin", "Vienna", "Amsterdam", "Paris", "London", "Rome", "Prague",
+          "Barcelona", "Lisbon", "Zurich", "Copenhagen", "Budapest", "Dublin", "Madrid", "Milan"]
+TAGS = ["history", "beer", "craft beer", "Oktoberfest", "food", "art", "museums", "nightlife",
+        "nature", "shopping", "architecture", "family", "walking tours", "classical music",
+        "coffee culture", "fine dining", "romance", "hiking", "cycling", "wine"]
+
+
+def synthetic_activities(count, rng):
+    for i in range(count):
+        yield {
+            "id": f"act_{i:06d}",
+            "name": f"Activity {i}",
+            "destination": rng.choice(CITIES),
+            "location": f"Street {i % 500}",
+            "price": rng.randint(0, 150),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "tags": rng.sample(TAGS, rng.randint(1, 4)),
+            "time_slots": ["10:00", "14:00"],
+        }
+
+
+def linear_search(activities, destination, interests, k):
+    """The old approach: check every activity's destination and interests"""
+    key = destination_key(destination)
+    wanted = {i.lower() for i in interests}
+    matches = [a for a in activities
+               if destination_key(a["destination"]) == key and wanted & {t.lower() for t in a["tags"]}]
+    matches.sort(key=lambda a: -a["rating"])
+    return matches[:k]
+
+
+def time_queries(search, queries):
+    start = time.perf_counter()
+    for destination, interests in queries:
+        search(destination, interests)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--activities', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    activities = list(synthetic_activities(args.activities, rng))
+    start = time.perf_counter()
+    catalog = ActivityCatalog(activities)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = [(rng.choice(CITIES), rng.sample(TAGS, rng.randint(1, 3))) for _ in range(args.queries)]
+    linear_queries = queries[:max(1, args.queries // 20)]  # the scan is slow; sample it
+
+    indexed_us = time_queries(lambda d, i: catalog.search(d, i, k=args.k), queries)
+    linear_us = time_queries(lambda d, i: linear_search(activities, d, i, args.k), linear_queries)
+
+    for destination, interests in linear_queries:
+        indexed = [a["rating"] for a in catalog.search(destination, interests, k=args.k)]
+        assert indexed == [a["rating"] for a in linear_search(activities, destination, interests, args.k)]
+
+    report = {
+        "activities": args.activities,
+        "queries": args.queries,
+        "build_ms": round(build_ms, 1),
+        "indexed_us_per_query": round(indexed_us, 2),
+        "linear_scan_us_per_query": round(linear_us, 2),
+        "speedup": round(linear_us / indexed_us, 1),
+    }
+    print(f"⚡ indexed {report['indexed_us_per_query']} µs vs scan {report['linear_scan_us_per_query']} µs per query",
+          file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
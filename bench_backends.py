@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark agent invocation backends: requests/sec and p50/p99 latency
+
+Usage: python bench_backends.py [--requests 50] [--concurrency 4] [--backends subprocess inprocess pool]
+
+The subprocess backend uses the `agentcore` CLI when it is on PATH; otherwise it
+starts a fresh local Python interpreter per request, which pays the same
+interpreter startup and import costs as the CLI does.
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from invocation_backends import BACKENDS, create_backend
+
+PROMPT = "Plan a 3-day trip to Munich for Oktoberfest, budget $800"
+
+FRESH_PROCESS_CMD = [
+    sys.executable, '-c',
+    'import json, sys, travel_orchestrator; '
+    'print(json.dumps(travel_orchestrator.invoke_handler(json.loads(sys.argv[1]))))',
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def make_backend(name, workers):
+    if name == 'subprocess':
+        cmd = None if shutil.which('agentcore') else FRESH_PROCESS_CMD
+        return create_backend(name, cmd=cmd)
+    if name == 'pool':
+        return create_backend(name, workers=workers)
+    return create_backend(name)
+
+
+def run_benchmark(backend, requests, concurrency):
+    latencies = []
+
+    def timed_call(_):
+        start = time.perf_counter()
+        backend.invoke(PROMPT)
+        latencies.append(time.perf_counter() - start)
+
+    backend.invoke(PROMPT)  # exclude one-off warm-up from the measurement
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed_call, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "backend": backend.name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=4, help="Pool backend worker processes")
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), default=['subprocess', 'inprocess', 'pool'])
+    args = parser.parse_args()
+
+    results = []
+    for name in args.backends:
+        backend = make_backend(name, args.workers)
+        try:
+            result = run_benchmark(backend, args.requests, args.concurrency)
+        finally:
+            backend.close()
+        print(f"⏱️ {name:<10} {result['rps']:>9} req/s  p50 {result['p50_ms']:>9} ms  p99 {result['p99_ms']:>9} ms",
+              file=sys.stderr)
+        results.append(result)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for importing travel_orchestrator
+
+Imports the module in fresh interpreters under `python -X importtime`, reports
+the median and best cumulative import time, the slowest modules by self time
+and whether boto3/botocore/asyncio/bedrock_agentcore got imported, and exits
+with status 1 when the median is over the target.
+
+Usage: python bench_cold_start.py [--runs 10] [--target-ms 150] [--module travel_orchestrator]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("boto3", "botocore", "asyncio", "bedrock_agentcore")
+
+
+def import_profile(module):
+    """({imported module: (self_us, cumulative_us)}, heavy modules loaded) for one fresh interpreter"""
+    check = f"import sys, {module}; print('heavy:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    heavy = [m for m in result.stdout.strip().splitlines()[-1][len("heavy:"):].split(",") if m]
+    return profile, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--target-ms', type=float, default=150)
+    parser.add_argument('--module', default='travel_orchestrator')
+    args = parser.parse_args()
+
+    import_profile(args.module)  # warm the filesystem and bytecode caches
+    runs = [import_profile(args.module) for _ in range(args.runs)]
+    totals_ms = [profile[args.module][1] / 1000 for profile, _ in runs]
+    profile, heavy = runs[-1]
+    slowest = sorted(profile.items(), key=lambda item: item[1][0], reverse=True)[:10]
+
+    result = {
+        "module": args.module,
+        "median_ms": round(statistics.median(totals_ms), 1),
+        "best_ms": round(min(totals_ms), 1),
+        "target_ms": args.target_ms,
+        "heavy_modules_imported": heavy,
+        "slowest_self_ms": {name: round(self_us / 1000, 2) for name, (self_us, _) in slowest},
+    }
+    ok = result["median_ms"] <= args.target_ms
+    print(f"{'✅' if ok else '❌'} import {args.module}: median {result['median_ms']} ms, "
+          f"best {result['best_ms']} ms (target {args.target_ms} ms)", file=sys.stderr)
+    if heavy:
+        print(f"⚠️ Imported at startup: {', '.join(heavy)}", file=sys.stderr)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON response encoding on large itineraries
+
+Scales the daily plan of sample_trip_plan.json up to the given number of days
+and times the server's old json.dumps(...).encode('utf-8') against every
+json_codec backend installed here, checking that all backends emit identical
+bytes.
+
+Usage: python bench_json_codec.py [--days 30 365 3650] [--repeat 5]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from json_codec import BACKEND, available_backends
+from trip_fixtures import make_sample_plan
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365, 3650])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    encoders = available_backends()
+    print(f"🔧 Installed backends: {', '.join(encoders)} (default: {BACKEND})", file=sys.stderr)
+    results = []
+    for days in args.days:
+        plan = make_sample_plan(days)
+        legacy_s, _ = best_of(lambda: json.dumps(plan).encode('utf-8'), args.repeat)
+        result = {"days": days, "legacy_ms": round(legacy_s * 1000, 3)}
+        outputs = {}
+        for name, encode in encoders.items():
+            seconds, outputs[name] = best_of(lambda: encode(plan), args.repeat)
+            result[f"{name}_ms"] = round(seconds * 1000, 3)
+        assert len(set(outputs.values())) == 1, "backends disagree"
+        assert json.loads(outputs["stdlib"]) == plan
+        result["bytes"] = len(outputs["stdlib"])
+        print(f"📦 {days:>5} days {result['bytes']:>10} B  legacy {result['legacy_ms']:>8} ms  " +
+              "  ".join(f"{name} {result[f'{name}_ms']:>8} ms" for name in encoders), file=sys.stderr)
+        results.append(result)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON extraction from agentcore CLI output on multi-megabyte inputs
+
+Compares the previous three-pass approach (json.loads, then the "Response:"
+regex, then the nested-brace regex) with the single-pass json_extract module,
+and feeds the same response pretty-printed (indent=2) through the streaming
+extractor in 64 KB chunks, the shape that used to trigger a decode per line.
+
+Usage: python bench_json_extract.py [--sizes-mb 1 4 16] [--repeat 3]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+from json_extract import StreamingJSONExtractor, extract_json
+from test_json_parsing import sample_output
+
+BOX, RESPONSE = sample_output.split("Response:\n", 1)
+
+
+def legacy_parse(output):
+    """The parsing chain handle_generate_plan used before json_extract"""
+    try:
+        return json.loads(output)
+    except json.JSONDecodeError:
+        pass
+    response_match = re.search(r'Response:\s*(\{.*\})', output, re.DOTALL)
+    if response_match:
+        try:
+            return json.loads(response_match.group(1).strip())
+        except json.JSONDecodeError:
+            pass
+    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', output, re.DOTALL)
+    if json_match:
+        try:
+            return json.loads(json_match.group(0))
+        except json.JSONDecodeError:
+            pass
+    return None
+
+
+def make_output(size_mb, indent=None):
+    """Decorated CLI output whose response carries a large daily schedule, plus trailing log noise"""
+    data = json.loads(RESPONSE)
+    day = data["raw_data"]["trip_plan"]["itinerary"]["daily_plan"][0]
+    target = size_mb * 1024 * 1024
+    day_size = len(json.dumps(day))
+    data["raw_data"]["trip_plan"]["itinerary"]["daily_plan"] = [day] * max(1, target // day_size)
+    trailer = "\n".join(f"INFO request finished {{id={i}}}" for i in range(1000))
+    return BOX + "Response:\n" + json.dumps(data, indent=indent) + "\n" + trailer
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    def chunked(output):
+        extractor = StreamingJSONExtractor()
+        for i in range(0, len(output), 65536):
+            if extractor.feed(output[i:i + 65536]) is not None:
+                break
+        return extractor.close()
+
+    results = []
+    for size_mb in args.sizes_mb:
+        output = make_output(size_mb)
+        indented = make_output(size_mb, indent=2)
+
+        legacy_s, legacy = best_of(lambda: legacy_parse(output), args.repeat)
+        single_s, single = best_of(lambda: extract_json(output), args.repeat)
+        chunked_s, streamed = best_of(lambda: chunked(output), args.repeat)
+        indented_s, streamed_indented = best_of(lambda: chunked(indented), args.repeat)
+        assert single == streamed == streamed_indented
+        result = {
+            "size_mb": round(len(output) / 1024 / 1024, 2),
+            "legacy_ms": round(legacy_s * 1000, 2),
+            "legacy_found_response": legacy == single,
+            "single_pass_ms": round(single_s * 1000, 2),
+            "chunked_ms": round(chunked_s * 1000, 2),
+            "indented_size_mb": round(len(indented) / 1024 / 1024, 2),
+            "indented_chunked_ms": round(indented_s * 1000, 2),
+        }
+        print(f"📦 {result['size_mb']:>6} MB  legacy {result['legacy_ms']:>9} ms  "
+              f"single-pass {result['single_pass_ms']:>9} ms  chunked {result['chunked_ms']:>9} ms  "
+              f"indented ({result['indented_size_mb']} MB) {result['indented_chunked_ms']:>9} ms", file=sys.stderr)
+        results.append(result)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Load-test the planning pipeline: ops/sec, latency percentiles and peak RSS
+
+Targets:
+- invoke_handler   the agent entrypoint (plan cache off, Bedrock stubbed)
+- plan_trip        local_testing.TripOrchestratorAgent.plan_trip
+- markdown         local_testing.format_trip_plan_markdown on prebuilt plans
+- http             POST /api/generate-plan on an in-process travel_server
+
+Each request is a synthetic trip (random city, start date, travelers and a
+length drawn from --days) sent by --concurrency threads. Every target runs in
+its own interpreter so its peak RSS is its own. Results are printed as JSON.
+With --baseline, a previous result file is compared and the run exits 1 when
+ops/sec falls, or p99 or peak RSS grows, by more than --max-regression.
+--fake-bedrock sends the model calls over HTTP to a local fake_bedrock server
+with the given latency spec (and --throttle-rate) instead of the in-process stub;
+the server runs in this process, also with --in-process.
+
+Usage: python bench_pipeline.py [--targets ...] [--requests 200] [--concurrency 4] [--days 2 3 7 14 30]
+                                [--baseline bench.json] [--max-regression 0.2] [--output bench.json]
+                                [--fake-bedrock lognormal:-1.5,0.5] [--throttle-rate 0.05]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+TARGETS = ("invoke_handler", "plan_trip", "markdown", "http")
+CITIES = ["Munich", "Berlin", "Vienna", "Amsterdam", "Paris", "London", "Rome"]
+INTERESTS = ["history", "food", "art", "beer", "museums", "nightlife", "architecture"]
+GATED = (("ops_per_s", -1), ("p99_ms", 1), ("peak_rss_mb", 1))  # metric, direction that is worse
+
+
+def trip_specs(count, days_choices, seed):
+    """Synthetic trips; distinct start dates keep them from being identical requests"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        days = rng.choice(days_choices)
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+        travelers = rng.randint(1, 3)
+        yield {
+            "city": rng.choice(CITIES),
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=days - 1)).isoformat(),
+            "days": days,
+            "budget": 400 * days * travelers,
+            "interests": rng.sample(INTERESTS, 2),
+            "travelers": travelers,
+        }
+
+
+def prompt(spec):
+    return (f"Plan a trip to {spec['city']} from {spec['start_date']} to {spec['end_date']} for "
+            f"{spec['travelers']} travelers, budget ${spec['budget']}, interests: {' and '.join(spec['interests'])}")
+
+
+def local_request(spec):
+    from local_testing import TripRequest
+    return TripRequest(destination=spec["city"], dates={"start_date": spec["start_date"], "end_date": spec["end_date"]},
+                       budget=spec["budget"], interests=spec["interests"], travelers=spec["travelers"])
+
+
+def make_invoke_handler(specs):
+    from travel_orchestrator import invoke_handler
+
+    def op(spec):
+        return "status" in invoke_handler({"prompt": prompt(spec), "use_cache": False})
+    return op, None
+
+
+def make_plan_trip(specs):
+    from local_testing import TripOrchestratorAgent
+    agent = TripOrchestratorAgent()
+
+    def op(spec):
+        plan = asyncio.run(agent.plan_trip(local_request(spec), user_id=f"user_{spec['travelers']}"))
+        return bool(plan["itinerary"]["daily_plan"])
+    return op, None
+
+
+def make_markdown(specs):
+    from local_testing import TripOrchestratorAgent, format_trip_plan_markdown
+    agent = TripOrchestratorAgent()
+    plans = {}
+    for spec in specs:  # plans are built up front; only the formatting is timed
+        key = (spec["city"], spec["days"])
+        if key not in plans:
+            plans[key] = asyncio.run(agent.plan_trip(local_request(spec)))
+
+    def op(spec):
+        return bool(format_trip_plan_markdown(plans[(spec["city"], spec["days"])]))
+    return op, None
+
+
+def make_http(specs, concurrency):
+    from travel_server import TravelPlannerHandler, TravelPlannerServer
+    from invocation_backends import create_backend
+    TravelPlannerHandler.backend = create_backend("inprocess")
+    TravelPlannerHandler.log_message = lambda *args: None
+    httpd = TravelPlannerServer(("127.0.0.1", 0), TravelPlannerHandler, workers=concurrency,
+                                max_inflight=concurrency, queue_size=concurrency * 2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/api/generate-plan"
+
+    def op(spec):
+        request = urllib.request.Request(url, data=json.dumps({"prompt": prompt(spec)}).encode("utf-8"),
+                                         headers={"Content-Type": "application/json", "Accept-Encoding": "gzip"})
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+                return response.status == 200
+        except urllib.error.HTTPError:
+            return False
+
+    def close():
+        httpd.shutdown()
+        httpd.server_close()
+    return op, close
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KiB elsewhere
+
+
+def run_target(target, args):
+    """Run one target in this process and return its result"""
+    from bedrock_resilience import percentile
+
+    specs = list(trip_specs(args.requests + args.warmup, args.days, args.seed))
+    with contextlib.redirect_stdout(open(os.devnull, "w")):  # the agents print progress
+        if target == "http":
+            op, close = make_http(specs, args.concurrency)
+        else:
+            op, close = {"invoke_handler": make_invoke_handler, "plan_trip": make_plan_trip,
+                         "markdown": make_markdown}[target](specs)
+        try:
+            for spec in specs[:args.warmup]:
+                op(spec)
+            latencies, errors = [], 0
+
+            def timed(spec):
+                start = time.perf_counter()
+                try:
+                    ok = op(spec)
+                except Exception:
+                    ok = False
+                return time.perf_counter() - start, ok
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                for latency, ok in executor.map(timed, specs[args.warmup:]):
+                    latencies.append(latency)
+                    errors += not ok
+            elapsed = time.perf_counter() - start
+        finally:
+            if close:
+                close()
+
+    latencies.sort()
+    return {
+        "target": target,
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": args.concurrency,
+        "ops_per_s": round(len(latencies) / elapsed, 2),
+        **{f"p{q}_ms": round(percentile(latencies, q) * 1000, 3) for q in (50, 90, 99)},
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_isolated(target, args):
+    """Run one target in a fresh interpreter, so peak RSS and warm caches are its own"""
+    command = [sys.executable, os.path.abspath(__file__), "--targets", target, "--in-process",
+               "--requests", str(args.requests), "--concurrency", str(args.concurrency), "--warmup", str(args.warmup),
+               "--seed", str(args.seed), "--days", *map(str, args.days)]
+    child = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if child.returncode != 0:
+        sys.stderr.write(child.stderr)
+        raise RuntimeError(f"{target} benchmark failed with exit code {child.returncode}")
+    return json.loads(child.stdout)["results"][0]
+
+
+def regressions(results, baseline, max_regression):
+    """Human-readable list of metrics that got worse than the baseline by more than max_regression"""
+    previous = {result["target"]: result for result in baseline.get("results", [])}
+    found = []
+    for result in results:
+        before = previous.get(result["target"])
+        if before is None:
+            continue
+        for metric, worse in GATED:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change * worse > max_regression:
+                found.append(f"{result['target']} {metric}: {old} -> {new} ({change:+.0%})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--requests', type=int, default=200, help="timed requests per target")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--days', type=int, nargs='+', default=[2, 3, 7, 14, 30], help="trip lengths to mix")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', help="previous JSON output to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    parser.add_argument('--output', help="also write the JSON results to this file")
+    parser.add_argument('--in-process', action='store_true', help="run the targets in this interpreter")
+    parser.add_argument('--bedrock', action='store_true', help="call Bedrock instead of the local stub")
+    parser.add_argument('--cache', action='store_true', help="keep the trip plan cache enabled")
+    parser.add_argument('--fake-bedrock', metavar='LATENCY', help="call a local fake_bedrock server, e.g. 0.3")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="share of fake Bedrock calls throttled")
+    args = parser.parse_args()
+
+    fake = None
+    if args.fake_bedrock:
+        # Isolated targets reach it through the inherited environment; with --in-process it
+        # shares this interpreter (and its GIL) with the load, which inflates latencies a little
+        from fake_bedrock import start_fake_bedrock
+        fake = start_fake_bedrock(latency=args.fake_bedrock, throttle_rate=args.throttle_rate, seed=args.seed)
+        os.environ.update(BEDROCK_ENDPOINT_URL=fake.endpoint_url, BEDROCK_STUB="0")
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+    elif not args.bedrock:
+        os.environ.setdefault("BEDROCK_STUB", "1")
+    if not args.cache:
+        os.environ.setdefault("TRIP_CACHE_MAX_ENTRIES", "0")
+
+    results = []
+    for target in args.targets:
+        result = run_target(target, args) if args.in_process else run_isolated(target, args)
+        print(f"⏱️ {target:<15} {result['ops_per_s']:>9} ops/s  p50 {result['p50_ms']:>9} ms  "
+              f"p99 {result['p99_ms']:>9} ms  peak RSS {result['peak_rss_mb']:>7} MB  errors {result['errors']}",
+              file=sys.stderr)
+        results.append(result)
+
+    report = {"config": {"requests": args.requests, "concurrency": args.concurrency, "days": args.days,
+                         "seed": args.seed, "python": sys.version.split()[0]},
+              "results": results}
+    if fake is not None:
+        report["fake_bedrock"] = dict(fake.stats(), latency=args.fake_bedrock, throttle_rate=args.throttle_rate)
+        fake.shutdown()
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(results, json.load(f), args.max_regression)
+        for line in found:
+            print(f"❌ Regression: {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print(f"✅ Within {args.max_regression:.0%} of {args.baseline}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
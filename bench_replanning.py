@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark follow-up turns: incremental re-planning against planning from scratch
+
+Each session plans a trip, then sends follow-up turns that change one field
+(budget, an added interest, travelers, dates). Every follow-up is answered
+twice through invoke_handler: as a session turn with "changes", which reruns
+only the affected stages, and as a fresh request for the same trip. The flights
+& hotels and activities agents are given --agent-latency seconds and Bedrock
+(a FaultInjectingBedrock stub) --bedrock-latency seconds, standing in for the
+remote calls. Reports mean latency and sub-agent/Bedrock calls per turn as JSON.
+
+Usage: python bench_replanning.py [--sessions 20] [--agent-latency 0.05] [--bedrock-latency 0.2]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+FOLLOW_UPS = {
+    "budget": {"budget": 2600},
+    "add_interest": {"interests": ["history", "beer"]},
+    "travelers": {"travelers": 3, "budget": 3000},
+    "dates": {"start_date": "2025-10-02", "end_date": "2025-10-05"},
+}
+TRIP = {"destination": "Munich, Germany", "start_date": "2025-10-01", "end_date": "2025-10-03", "budget": 2000,
+        "interests": ["history"], "travelers": 2}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--agent-latency', type=float, default=0.05, help="seconds per sub-agent call")
+    parser.add_argument('--bedrock-latency', type=float, default=0.2, help="seconds per Bedrock call")
+    args = parser.parse_args()
+
+    os.environ.update(SUMMARY_BATCH_SIZE="1", TRIP_CACHE_MAX_ENTRIES="0")
+    from fake_bedrock import FaultInjectingBedrock
+    from travel_orchestrator import invoke_handler, orchestrator
+
+    calls = Counter()
+    bedrock = FaultInjectingBedrock(latency=args.bedrock_latency)
+    orchestrator.bedrock_client = bedrock
+
+    def remote(name, func):
+        def call(request):
+            calls[name] += 1
+            time.sleep(args.agent_latency)
+            return func(request)
+        return call
+    orchestrator.call_flights_hotels_agent = remote("flights_hotels", orchestrator.call_flights_hotels_agent)
+    orchestrator.call_activities_agent = remote("activities", orchestrator.call_activities_agent)
+
+    def measure(payload):
+        before, bedrock_before = Counter(calls), bedrock.calls
+        start = time.perf_counter()
+        response = invoke_handler(payload)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        upstream = dict(calls - before, bedrock=bedrock.calls - bedrock_before)
+        return time.perf_counter() - start, upstream, response
+
+    totals = {kind: {"incremental": [0.0, Counter()], "full": [0.0, Counter()]} for kind in FOLLOW_UPS}
+    with contextlib.redirect_stdout(open(os.devnull, "w")):  # the agents print progress
+        for session in range(args.sessions):
+            session_id = f"bench-{session}"
+            for kind, changes in FOLLOW_UPS.items():
+                measure({"trip_request": TRIP, "session_id": session_id, "use_cache": False})
+                seconds, upstream, incremental = measure(
+                    {"session_id": session_id, "changes": changes, "use_cache": False})
+                totals[kind]["incremental"][0] += seconds
+                totals[kind]["incremental"][1].update(upstream)
+                seconds, upstream, full = measure({"trip_request": {**TRIP, **changes}, "use_cache": False})
+                totals[kind]["full"][0] += seconds
+                totals[kind]["full"][1].update(upstream)
+                if incremental != full:
+                    raise RuntimeError(f"{kind}: incremental plan differs from the full replan")
+
+    results = {}
+    for kind, modes in totals.items():
+        results[kind] = {mode: {"mean_ms": round(seconds / args.sessions * 1000, 2),
+                                "calls_per_turn": {name: count / args.sessions for name, count in sorted(counts.items())}}
+                         for mode, (seconds, counts) in modes.items()}
+        full_ms, incremental_ms = results[kind]["full"]["mean_ms"], results[kind]["incremental"]["mean_ms"]
+        print(f"🔁 {kind:<13} full {full_ms:>8} ms  incremental {incremental_ms:>8} ms  "
+              f"({1 - incremental_ms / full_ms:.0%} faster)", file=sys.stderr)
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
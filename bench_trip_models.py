@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark the trip_models itinerary against the equivalent nested dicts
+
+Builds itineraries of the given number of days (four activities a day) both as
+plain dicts and as trip_models objects, and reports the memory each takes
+(tracemalloc), json_codec encoding time for both forms with every installed
+backend, and the cost of to_wire(). Checks that both forms encode to the same
+bytes.
+
+Usage: python bench_trip_models.py [--days 30 365 3650] [--repeat 5]
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+
+from bench_json_codec import best_of
+from json_codec import available_backends
+from trip_fixtures import make_itinerary_dict
+from trip_models import Itinerary, to_wire
+
+def allocated_bytes(build):
+    """Bytes still allocated by build()'s result"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365, 3650])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    encoders = available_backends()
+    Itinerary.from_dict(make_itinerary_dict(1))  # warm up, so one-off imports and caches are not counted
+    results = []
+    for days in args.days:
+        dict_bytes, as_dict = allocated_bytes(lambda: make_itinerary_dict(days))
+        model_bytes, model = allocated_bytes(lambda: Itinerary.from_dict(make_itinerary_dict(days)))
+        result = {"days": days, "dict_bytes": dict_bytes, "model_bytes": model_bytes,
+                  "memory_ratio": round(model_bytes / dict_bytes, 3)}
+        for name, encode in encoders.items():
+            dict_s, dict_out = best_of(lambda: encode(as_dict), args.repeat)
+            model_s, model_out = best_of(lambda: encode(model), args.repeat)
+            assert dict_out == model_out, f"{name}: model and dict encode differently"
+            result[f"{name}_dict_ms"] = round(dict_s * 1000, 3)
+            result[f"{name}_model_ms"] = round(model_s * 1000, 3)
+        to_wire_s, wire = best_of(lambda: to_wire(model), args.repeat)
+        assert wire == as_dict
+        result["to_wire_ms"] = round(to_wire_s * 1000, 3)
+        print(f"📦 {days:>5} days  dicts {dict_bytes / 1024:>9.1f} KiB  models {model_bytes / 1024:>9.1f} KiB  " +
+              "  ".join(f"{name} {result[f'{name}_dict_ms']}/{result[f'{name}_model_ms']} ms"
+                        for name in encoders), file=sys.stderr)
+        results.append(result)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
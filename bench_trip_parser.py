@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fast-path trip request parser over the sample prompt corpus
+
+Usage: python bench_trip_parser.py [--corpus sample_prompts.txt] [--iterations 2000]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from trip_parser import FAST_PATH_MIN_CONFIDENCE, fast_parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--corpus', default='sample_prompts.txt')
+    parser.add_argument('--iterations', type=int, default=2000, help="Parses per prompt")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding='utf-8') as f:
+        prompts = [line.strip() for line in f if line.strip()]
+
+    per_prompt_us = []
+    fast_path = 0
+    for prompt in prompts:
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            result = fast_parse(prompt)
+        per_prompt_us.append((time.perf_counter() - start) / args.iterations * 1e6)
+        if result.confidence >= FAST_PATH_MIN_CONFIDENCE:
+            fast_path += 1
+        else:
+            print(f"🐢 LLM fallback ({result.confidence}): {prompt}", file=sys.stderr)
+
+    report = {
+        "prompts": len(prompts),
+        "fast_path_hit_rate": round(fast_path / len(prompts), 4),
+        "mean_us": round(statistics.mean(per_prompt_us), 2),
+        "p50_us": round(statistics.median(per_prompt_us), 2),
+        "max_us": round(max(per_prompt_us), 2),
+    }
+    print(f"⚡ {report['mean_us']} µs/prompt, fast-path hit rate {report['fast_path_hit_rate']:.0%}", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark trip plan rendering: streamed chunks against string concatenation
+
+Builds local_testing-shaped plans of the given number of days with --options
+flights, hotels and activities per day, and compares the original `md +=`
+formatter (trip_fixtures.concat_markdown) with trip_renderer: joining all chunks,
+writing through write_trip_plan into a UTF-8 byte sink as an HTTP handler
+would, and the time until the first chunk can be sent. Also reports the peak
+memory of each approach (tracemalloc) and checks that the Markdown is
+identical.
+
+Usage: python bench_trip_renderer.py [--days 30 365] [--options 48] [--repeat 5]
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+
+from bench_json_codec import best_of
+from trip_fixtures import ByteSink, concat_markdown, make_local_plan
+from trip_renderer import iter_markdown, write_trip_plan
+
+
+def peak_bytes(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365])
+    parser.add_argument('--options', type=int, default=48, help="flights, hotels and activities per day")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for days in args.days:
+        plan = make_local_plan(days, args.options)
+        concat_s, concat_md = best_of(lambda: concat_markdown(plan), args.repeat)
+        join_s, joined_md = best_of(lambda: "".join(iter_markdown(plan)), args.repeat)
+        assert joined_md == concat_md, "trip_renderer Markdown differs from the concatenated formatter"
+        stream_s, _ = best_of(lambda: write_trip_plan(plan, ByteSink(), encoding="utf-8"), args.repeat)
+        html_s, _ = best_of(lambda: write_trip_plan(plan, ByteSink(), "html", encoding="utf-8"), args.repeat)
+        first_s, _ = best_of(lambda: next(iter_markdown(plan)), args.repeat)
+        sink = ByteSink()
+        write_trip_plan(plan, sink, encoding="utf-8")
+
+        result = {
+            "days": days,
+            "options": args.options,
+            "markdown_bytes": sink.written,
+            "writes": sink.writes,
+            "concat_ms": round(concat_s * 1000, 3),
+            "join_ms": round(join_s * 1000, 3),
+            "stream_ms": round(stream_s * 1000, 3),
+            "html_stream_ms": round(html_s * 1000, 3),
+            "first_chunk_ms": round(first_s * 1000, 4),
+            "concat_peak_bytes": peak_bytes(lambda: concat_markdown(plan).encode("utf-8")),
+            "stream_peak_bytes": peak_bytes(lambda: write_trip_plan(plan, ByteSink(), encoding="utf-8")),
+        }
+        print(f"📝 {days:>4} days  {sink.written / 1024:>8.1f} KiB  concat {result['concat_ms']:>8} ms  "
+              f"join {result['join_ms']:>8} ms  stream {result['stream_ms']:>8} ms  "
+              f"first chunk {result['first_chunk_ms']} ms  peak {result['concat_peak_bytes'] // 1024} -> "
+              f"{result['stream_peak_bytes'] // 1024} KiB", file=sys.stderr)
+        results.append(result)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark the user memory store at millions of users
+
+Seeds a SQLite database with --users users, then measures, on a fresh store
+whose LRU holds --cache users:
+
+- lookups with a skewed access pattern (80% on a hot set of users, loaded
+  first), split into LRU hits and disk misses
+- remember_trip() latency while the write-behind thread commits, next to the
+  longest commit and to a write-through baseline that commits on every call
+
+The request path does not wait for commits; its max latency reflects
+garbage-collection pauses and GIL hand-offs to the writer thread instead.
+
+Usage: python bench_user_memory.py [--users 1000000] [--cache 100000] [--lookups 200000] [--writes 20000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from bedrock_resilience import percentile
+from user_memory import SCHEMA, UserMemoryStore
+
+INTERESTS = ["history", "beer", "food", "art", "museums", "nightlife", "nature", "shopping", "wine", "hiking"]
+CITIES = ["Munich, Germany", "Paris, France", "Rome, Italy", "Vienna, Austria", "Lisbon, Portugal"]
+
+
+def user_id(i):
+    return f"user_{i:08d}"
+
+
+def seed(path, users, rng):
+    """Write `users` preference rows straight into the database"""
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    batch = 100000
+    with connection:
+        for start in range(0, users, batch):
+            connection.executemany(
+                "INSERT OR REPLACE INTO preferences (user_id, data, updated_at) VALUES (?, ?, ?)",
+                [(user_id(i), json.dumps({"budget": rng.randint(300, 3000), "interests": rng.sample(INTERESTS, 3),
+                                          "last_destination": rng.choice(CITIES), "trips": 1}), time.time())
+                 for i in range(start, min(start + batch, users))])
+    connection.close()
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "p50_us": round(percentile(latencies, 50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 1),
+        "max_us": round(latencies[-1] * 1e6, 1) if latencies else 0.0,
+    }
+
+
+def bench_lookups(store, users, cache, lookups, rng):
+    hot = max(1, cache // 2)
+    for i in range(hot):
+        store.get(user_id(i))
+    hits, misses = [], []
+    for _ in range(lookups):
+        i = rng.randrange(hot) if rng.random() < 0.8 else rng.randrange(users)
+        disk_reads = store.disk_reads
+        start = time.perf_counter()
+        store.get(user_id(i))
+        elapsed = time.perf_counter() - start
+        (misses if store.disk_reads > disk_reads else hits).append(elapsed)
+    return {"hits": summarize(hits), "misses": summarize(misses), "hit_rate": round(len(hits) / lookups, 4)}
+
+
+def trip(rng):
+    return {"destination": rng.choice(CITIES), "budget": rng.randint(300, 3000), "interests": rng.sample(INTERESTS, 2)}
+
+
+def bench_writes(store, users, writes, rng):
+    hot = max(1, store.max_entries // 2)  # written users are mostly cached, like the lookups
+    cached, loaded = [], []
+    for _ in range(writes):
+        i = rng.randrange(hot) if rng.random() < 0.8 else rng.randrange(users)
+        disk_reads = store.disk_reads
+        start = time.perf_counter()
+        store.remember_trip(user_id(i), trip(rng))
+        elapsed = time.perf_counter() - start
+        (loaded if store.disk_reads > disk_reads else cached).append(elapsed)
+    flush_start = time.perf_counter()
+    store.flush()
+    return {"all": summarize(cached + loaded), "cached_users": summarize(cached), "loaded_users": summarize(loaded),
+            "final_flush_ms": round((time.perf_counter() - flush_start) * 1000, 1)}
+
+
+def bench_write_through(path, users, writes, rng):
+    """Baseline: insert and commit inside every call"""
+    connection = sqlite3.connect(path)
+    latencies = []
+    for _ in range(writes):
+        i = rng.randrange(users)
+        start = time.perf_counter()
+        with connection:
+            connection.execute("INSERT INTO trips (user_id, recorded_at, data) VALUES (?, ?, ?)",
+                               (user_id(i), time.time(), json.dumps(trip(rng))))
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    return summarize(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--cache', type=int, default=100000, help='LRU size in users')
+    parser.add_argument('--lookups', type=int, default=200000)
+    parser.add_argument('--writes', type=int, default=20000)
+    parser.add_argument('--path', help='database file (default: a temporary file)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    directory = None if args.path else tempfile.TemporaryDirectory()
+    path = args.path or os.path.join(directory.name, "user_memory.sqlite3")
+
+    start = time.perf_counter()
+    seed(path, args.users, rng)
+    seed_s = time.perf_counter() - start
+    print(f"🌱 Seeded {args.users:,} users in {seed_s:.1f}s", file=sys.stderr)
+
+    store = UserMemoryStore(path, max_entries=args.cache)
+    lookups = bench_lookups(store, args.users, args.cache, args.lookups, rng)
+    print(f"🔎 Lookups: hit rate {lookups['hit_rate']:.1%}, hit p99 {lookups['hits']['p99_us']} µs, "
+          f"miss p99 {lookups['misses']['p99_us']} µs", file=sys.stderr)
+
+    writes = bench_writes(store, args.users, args.writes, rng)
+    stats = store.stats()
+    store.close()
+    write_through = bench_write_through(path, args.users, min(args.writes, 2000), rng)
+    print(f"✍️  remember_trip p99 {writes['all']['p99_us']} µs (cached users {writes['cached_users']['p99_us']} µs, "
+          f"loaded from disk {writes['loaded_users']['p99_us']} µs); longest background commit "
+          f"{stats['max_flush_ms']} ms over {stats['flushes']} commits; write-through p99 "
+          f"{write_through['p99_us']} µs", file=sys.stderr)
+
+    print(json.dumps({"users": args.users, "cache": args.cache, "seed_s": round(seed_s, 2), "lookups": lookups,
+                      "write_behind": writes, "write_through": write_through, "store": stats}, indent=2))
+    if directory is not None:
+        directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
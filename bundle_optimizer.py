@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Budget-constrained flight x hotel x activities bundle optimizer
+
+A bundle is one flight, one hotel and a set of up to max_activities
+activities. Its score is the sum of the ratings of everything in it (flights
+without a rating count 0), and its cost is
+
+    travelers * (flight price + activity prices) + hotel price * nights
+
+optimize_bundles returns the top-N distinct flight/hotel bundles that fit the
+budget, each with its best activity set, without enumerating every
+combination:
+
+1. Dominance pruning. An option is dropped when at least N (or max_activities)
+   other options of the same kind are both no more expensive and no worse
+   rated: any bundle using it can be swapped for that many bundles at least as
+   good. On real search results this leaves a few dozen of each.
+2. Knapsack over activities. A count-capped 0/1 knapsack on the surviving
+   activities gives the best activity rating for every leftover budget, so
+   each flight/hotel pair is scored with one table lookup.
+3. Branch and bound over flight/hotel pairs, visiting hotels best first and
+   stopping once no remaining pair can beat the current N-th best bundle.
+"""
+
+import heapq
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_TOP_N = 5
+DEFAULT_MAX_ACTIVITIES = 6
+MAX_BUDGET_BUCKETS = 500  # knapsack resolution; prices are rounded up to buckets
+
+
+def _rating(option: Dict[str, Any]) -> float:
+    return option.get("rating") or 0
+
+
+def prune_dominated(options: Sequence[Dict[str, Any]], keep: int, cost_scale: float = 1) -> List[Dict[str, Any]]:
+    """Options dominated (cheaper-or-equal and rated at-least-as-well) by fewer than `keep` others"""
+    # Cheapest first; among equal prices best rated first so ties dominate each other once
+    ordered = sorted(options, key=lambda o: (o["price"] * cost_scale, -_rating(o)))
+    best_ratings: List[float] = []  # min-heap of the `keep` best ratings seen so far
+    survivors = []
+    for option in ordered:
+        rating = _rating(option)
+        if len(best_ratings) < keep:
+            heapq.heappush(best_ratings, rating)
+        elif rating > best_ratings[0]:
+            heapq.heapreplace(best_ratings, rating)
+        else:
+            continue
+        survivors.append(option)
+    return survivors
+
+
+class ActivityKnapsack:
+    """Best activity set of at most max_items activities for every budget up to capacity"""
+
+    def __init__(self, activities: Sequence[Dict[str, Any]], capacity: float, max_items: int, travelers: int = 1):
+        self.step = max(1.0, capacity / MAX_BUDGET_BUCKETS)
+        self.buckets = max(0, int(capacity // self.step))
+        self.max_items = max_items
+        self.activities = list(activities)
+        # Round costs up so a set that fits in buckets always fits the real budget
+        self.weights = [math.ceil(a["price"] * travelers / self.step) for a in self.activities]
+        self._solve()
+
+    def _solve(self):
+        width = self.buckets + 1
+        # best[k][b]: best total rating using at most k activities costing at most b buckets
+        best = [[0.0] * width for _ in range(self.max_items + 1)]
+        self._taken = []
+        for activity, weight in zip(self.activities, self.weights):
+            value = _rating(activity)
+            taken = {}
+            if weight < width:
+                for k in range(self.max_items, 0, -1):
+                    row, previous = best[k], best[k - 1]
+                    # Shifted row update, one list comprehension per (item, k) instead of a Python loop per cell
+                    with_item = [p + value for p in previous[:width - weight]]
+                    flags = bytes(w > r for w, r in zip(with_item, row[weight:]))
+                    if any(flags):
+                        row[weight:] = [w if f else r for w, r, f in zip(with_item, row[weight:], flags)]
+                        taken[k] = flags
+            self._taken.append(taken)
+        self.best = best[self.max_items]
+
+    def bucket(self, budget: float) -> int:
+        return min(self.buckets, int(budget // self.step)) if budget >= 0 else -1
+
+    def value(self, budget: float) -> float:
+        b = self.bucket(budget)
+        return self.best[b] if b >= 0 else -math.inf
+
+    def select(self, budget: float) -> List[Dict[str, Any]]:
+        """Activities achieving value(budget)"""
+        b = self.bucket(budget)
+        k = self.max_items
+        chosen = []
+        for index in range(len(self.activities) - 1, -1, -1):
+            if k == 0 or b < 0:
+                break
+            flags = self._taken[index].get(k)
+            weight = self.weights[index]
+            if flags is not None and b >= weight and flags[b - weight]:
+                chosen.append(self.activities[index])
+                b -= weight
+                k -= 1
+        chosen.reverse()
+        return chosen
+
+
+def optimize_bundles(flights: Sequence[Dict[str, Any]], hotels: Sequence[Dict[str, Any]],
+                     activities: Sequence[Dict[str, Any]], budget: float, travelers: int = 1,
+                     nights: int = 1, top_n: int = DEFAULT_TOP_N,
+                     max_activities: int = DEFAULT_MAX_ACTIVITIES) -> List[Dict[str, Any]]:
+    """Top-N bundles within budget, best score first (ties: cheaper first)"""
+    travelers = max(1, travelers)
+    flights = prune_dominated(flights, top_n, travelers)
+    hotels = prune_dominated(hotels, top_n, nights)
+    activities = prune_dominated(activities, max_activities, travelers)
+    if not flights or not hotels:
+        return []
+
+    knapsack = ActivityKnapsack(activities, budget, max_activities, travelers)
+    best_activities = knapsack.value(budget)
+    hotels = sorted(hotels, key=lambda h: (-_rating(h), h["price"]))
+    top: List[tuple] = []  # min-heap of (score, -fixed_cost, -flight index, -hotel index)
+
+    for f, flight in enumerate(flights):
+        flight_cost = flight["price"] * travelers
+        if flight_cost > budget:
+            break  # flights are sorted by price
+        flight_rating = _rating(flight)
+        for h, hotel in enumerate(hotels):
+            # Hotels are rating-ordered, so this bound only falls from here on
+            if len(top) == top_n and flight_rating + _rating(hotel) + best_activities < top[0][0]:
+                break
+            fixed_cost = flight_cost + hotel["price"] * nights
+            if fixed_cost > budget:
+                continue
+            score = flight_rating + _rating(hotel) + knapsack.value(budget - fixed_cost)
+            entry = (score, -fixed_cost, -f, -h)
+            if len(top) < top_n:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                heapq.heapreplace(top, entry)
+
+    bundles = []
+    for score, negative_cost, f, h in sorted(top, reverse=True):
+        fixed_cost = -negative_cost
+        chosen = knapsack.select(budget - fixed_cost)
+        bundles.append({
+            "flight": flights[-f],
+            "hotel": hotels[-h],
+            "activities": chosen,
+            "total_cost": fixed_cost + sum(a["price"] for a in chosen) * travelers,
+            "score": round(score, 2),
+        })
+    return bundles
+
+
+def cheapest_bundle(flights: Sequence[Dict[str, Any]], hotels: Sequence[Dict[str, Any]],
+                    travelers: int = 1, nights: int = 1) -> Optional[Dict[str, Any]]:
+    """Best-effort bundle when nothing fits the budget: cheapest flight and hotel, no activities"""
+    if not flights or not hotels:
+        return None
+    flight = min(flights, key=lambda o: (o["price"], -_rating(o)))
+    hotel = min(hotels, key=lambda o: (o["price"], -_rating(o)))
+    return {
+        "flight": flight,
+        "hotel": hotel,
+        "activities": [],
+        "total_cost": flight["price"] * max(1, travelers) + hotel["price"] * nights,
+        "score": round(_rating(flight) + _rating(hotel), 2),
+    }
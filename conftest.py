@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures
+"""
+
+import pytest
+
+from aws_clients import reset_clients
+from fake_bedrock import start_fake_bedrock
+
+
+@pytest.fixture
+def fake_bedrock_server(monkeypatch):
+    """fake_bedrock.FakeBedrockServer that the shared bedrock-runtime client (BEDROCK_ENDPOINT_URL) talks to;
+    tests tune it through its attributes (latency, throttle_rate, max_inflight, chunks, runtime)"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    server = start_fake_bedrock()
+    monkeypatch.setenv("BEDROCK_ENDPOINT_URL", server.endpoint_url)
+    reset_clients()
+    yield server
+    server.shutdown()
+    server.server_close()
+    reset_clients()
@@ -2,4 +2,4 @@
 # Helper script to extract JSON from agentcore invoke responses
 
 # Run agentcore command and extract just the JSON response
-agentcore invoke "$1" | sed -n '/^{.*$/,/}$/p' | tr -d '\n' | jq .
\ No newline at end of file
+agentcore invoke "$1" | python3 "$(dirname "$0")/json_extract.py"
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Local bedrock-runtime stand-in server for performance testing
+
+Serves the two bedrock-runtime operations the agent uses over real HTTP, so a
+boto3 client created with endpoint_url (BEDROCK_ENDPOINT_URL) exercises its
+connection pool, retries, timeouts and event-stream parsing:
+
+- POST /model/{modelId}/invoke
+- POST /model/{modelId}/invoke-with-response-stream (AWS event stream framing)
+
+Replies come from StubBedrockRuntime, so usage reports prompt-cache writes and
+reads. Each call first waits for a latency drawn from a scripted distribution,
+and can be rejected with ThrottlingException (HTTP 429) at a given rate or
+when more than max_inflight calls are running. Random draws use a seeded
+generator, so a run with the same seed and call order is reproducible.
+GET /stats returns counters, including the TCP connections clients opened. Requests are not authenticated; any credentials
+work (e.g. AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test).
+
+FaultInjectingBedrock is the in-process counterpart for unit tests: a client
+object that injects latency and errors in front of StubBedrockRuntime.
+
+Usage: python fake_bedrock.py [--port 8765] [--latency lognormal:-1.5,0.5] [--throttle-rate 0.05]
+                              [--max-inflight 8] [--chunks 8] [--chunk-delay 0.02] [--seed 42]
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from summary_prompt import StubBedrockRuntime, TokenUsage, stream_events
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential", "sequence")
+_PATH_RE = re.compile(r"^/model/(?P<model>[^/]+)/(?P<operation>invoke|invoke-with-response-stream)$")
+
+
+def latency_sampler(spec: str, seed: Optional[int] = None) -> Callable[[], float]:
+    """Seconds-per-call sampler for a spec such as "0.2", "fixed:0.2", "uniform:0.1,0.5", "normal:0.3,0.1",
+    "lognormal:-1.5,0.5" (of the underlying normal), "exponential:0.3" (mean) or "sequence:0.1,0.1,2" (cycled)"""
+    name, _, params = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown latency distribution '{name}', expected one of: {', '.join(LATENCY_DISTRIBUTIONS)}")
+    values = [float(v) for v in params.split(",") if v.strip()]
+    expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}.get(name)
+    if (expected and len(values) != expected) or not values:
+        raise ValueError(f"Latency '{spec}': {name} takes {expected or 'one or more'} comma-separated numbers")
+
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    position = [0]
+    draw = {
+        "fixed": lambda: values[0],
+        "uniform": lambda: rng.uniform(*values),
+        "normal": lambda: rng.gauss(*values),
+        "lognormal": lambda: rng.lognormvariate(*values),
+        "exponential": lambda: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0,
+    }.get(name)
+
+    def sample():
+        with lock:
+            if draw is not None:
+                return max(0.0, draw())
+            value = values[position[0] % len(values)]
+            position[0] += 1
+            return max(0.0, value)
+    return sample
+
+
+def encode_event(headers: Dict[str, str], payload: bytes) -> bytes:
+    """One message in the AWS event stream binary format (string headers only)"""
+    encoded_headers = b"".join(
+        struct.pack("B", len(name)) + name.encode("utf-8") + b"\x07" + struct.pack(">H", len(value.encode("utf-8")))
+        + value.encode("utf-8")
+        for name, value in headers.items())
+    total = 12 + len(encoded_headers) + len(payload) + 4
+    prelude = struct.pack(">II", total, len(encoded_headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + encoded_headers + payload
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def chunk_event(data: Dict[str, Any]) -> bytes:
+    """A bedrock-runtime "chunk" event carrying one Anthropic streaming event"""
+    payload = json.dumps({"bytes": base64.b64encode(json.dumps(data).encode("utf-8")).decode("ascii")})
+    return encode_event({":event-type": "chunk", ":content-type": "application/json", ":message-type": "event"},
+                        payload.encode("utf-8"))
+
+
+class FakeBedrockServer(ThreadingHTTPServer):
+    """bedrock-runtime stand-in with scripted latency and throttling"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address: Tuple[str, int], latency: str = "0", throttle_rate: float = 0.0,
+                 max_inflight: Optional[int] = None, chunks: int = 8, chunk_delay: float = 0.0,
+                 seed: Optional[int] = None, runtime: Optional[StubBedrockRuntime] = None):
+        super().__init__(server_address, FakeBedrockHandler)
+        self.latency = latency_sampler(latency, seed)
+        self.throttle_rate = throttle_rate
+        self.max_inflight = max_inflight
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.runtime = runtime or StubBedrockRuntime()
+        self.usage = TokenUsage()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._counters = dict.fromkeys(
+            ("calls", "invocations", "streams", "throttled", "peak_inflight", "connections"), 0)
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def connected(self):
+        with self._lock:
+            self._counters["connections"] += 1
+
+    def admit(self) -> bool:
+        """Count a call and decide whether it is throttled; admitted calls must be released"""
+        with self._lock:
+            self._counters["calls"] += 1
+            throttled = self._random.random() < self.throttle_rate
+            if self.max_inflight is not None and self._inflight >= self.max_inflight:
+                throttled = True
+            if throttled:
+                self._counters["throttled"] += 1
+                return False
+            self._inflight += 1
+            self._counters["peak_inflight"] = max(self._counters["peak_inflight"], self._inflight)
+            return True
+
+    def release(self, operation: str):
+        with self._lock:
+            self._inflight -= 1
+            self._counters["streams" if operation == "invoke-with-response-stream" else "invocations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters, inflight=self._inflight)
+        stats["usage"] = self.usage.report()
+        return stats
+
+
+class FakeBedrockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint, so the client pool is exercised
+
+    def setup(self):
+        super().setup()  # once per TCP connection, however many requests it carries
+        self.server.connected()
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.send_json(200, self.server.stats())
+        else:
+            self.send_json(404, {"message": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        match = _PATH_RE.match(self.path)
+        if not match:
+            self.send_json(404, {"message": f"Unknown path {self.path}"}, "UnknownOperationException")
+            return
+        if not self.server.admit():
+            self.send_json(429, {"message": "Too many requests, please wait before trying again."},
+                           "ThrottlingException")
+            return
+        operation = match.group("operation")
+        try:
+            time.sleep(self.server.latency())
+            try:
+                reply = self.server.runtime.reply(modelId=match.group("model"), body=body)
+            except ValueError as e:
+                self.send_json(400, {"message": f"Malformed input request: {e}"}, "ValidationException")
+                return
+            self.server.usage.record(reply.get("usage"))
+            if operation == "invoke":
+                self.send_json(200, reply)
+            else:
+                self.send_stream(reply)
+        finally:
+            self.server.release(operation)
+
+    def send_json(self, status: int, data: Dict[str, Any], error_type: Optional[str] = None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if error_type:
+            self.send_header("x-amzn-ErrorType", error_type)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, reply: Dict[str, Any]):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, event in enumerate(stream_events(reply, self.server.chunks)):
+            if i and self.server.chunk_delay and event["type"] == "content_block_delta":
+                time.sleep(self.server.chunk_delay)
+            message = chunk_event(event)
+            self.wfile.write(f"{len(message):X}\r\n".encode("ascii") + message + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FaultInjectingBedrock:
+    """bedrock-runtime stand-in that injects latency and errors, for resilience tests
+
+    latency is a number of seconds or a callable returning one per call;
+    error_rate is the share of calls failing with error_code. Calls that do
+    not fail are passed to client, a StubBedrockRuntime unless one is given.
+    Unlike FakeBedrockServer it runs in-process, without an HTTP round trip.
+    """
+
+    def __init__(self, client=None, latency=0.0, error_rate: float = 0.0,
+                 error_code: str = "ThrottlingException", seed: Optional[int] = None):
+        self.client = client or StubBedrockRuntime()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def invoke_model(self, modelId: str, body, **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.error_rate
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        if fail:
+            from botocore.exceptions import ClientError
+            raise ClientError({"Error": {"Code": self.error_code, "Message": "Injected fault"}}, "InvokeModel")
+        return self.client.invoke_model(modelId=modelId, body=body, **kwargs)
+
+
+def start_fake_bedrock(port: int = 0, **options) -> FakeBedrockServer:
+    """FakeBedrockServer on 127.0.0.1 served from a daemon thread; use .endpoint_url and .shutdown()"""
+    server = FakeBedrockServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, name="fake-bedrock", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default="0", help="e.g. 0.2, uniform:0.1,0.5, lognormal:-1.5,0.5, sequence:0.1,2")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="share of calls rejected with 429")
+    parser.add_argument('--max-inflight', type=int, help="throttle calls beyond this many concurrent ones")
+    parser.add_argument('--chunks', type=int, default=8, help="text deltas per streamed reply")
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help="seconds between streamed deltas")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    server = FakeBedrockServer(("127.0.0.1", args.port), latency=args.latency, throttle_rate=args.throttle_rate,
+                               max_inflight=args.max_inflight, chunks=args.chunks, chunk_delay=args.chunk_delay,
+                               seed=args.seed)
+    print(f"🧪 Fake bedrock-runtime at {server.endpoint_url} (latency {args.latency}, "
+          f"throttle rate {args.throttle_rate}, max in flight {args.max_inflight or 'unlimited'})")
+    print(f"   BEDROCK_ENDPOINT_URL={server.endpoint_url} AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {json.dumps(server.stats())}")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
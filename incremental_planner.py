@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Incremental re-planning for multi-turn trip refinement
+
+A follow-up turn ("raise the budget", "add museums") usually changes one field
+of the trip request. Callers that pass a session_id keep the previous turn's
+request and stage outputs here, and only the stages reading a changed field,
+plus everything downstream of them, run again:
+
+    flights_hotels  <- destination, dates, travelers
+    activities      <- destination, interests
+    itinerary       <- flights_hotels + activities, budget, dates, travelers
+    summary         <- flights_hotels + activities + itinerary, every field, prompt
+
+So a new interest reruns activities, itinerary and summary but not flights and
+hotels, and a budget change reruns only the itinerary (bundle selection and
+scheduling) and the summary. The summary quotes the user's request, so a new
+prompt that parses to the same fields reruns just the summary. Fields are compared in the plan cache's
+normalized form, so reordering interests or changing case reruns nothing.
+
+Sessions live in a bounded in-memory LRU with a TTL, per process: with the
+pool or subprocess backends a follow-up can land in another process and is
+then planned from scratch. Concurrent turns of one session each start from the
+last stored plan and the last one to finish is kept.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from trip_cache import normalize_trip_request
+from trip_models import TripModelError, TripRequest, to_wire
+
+ALL_FIELDS = ("destination", "start_date", "end_date", "budget", "interests", "travelers")
+# stage: (trip request fields it reads, upstream stages whose outputs it takes, in argument order)
+STAGE_GRAPH = {
+    "flights_hotels": (("destination", "start_date", "end_date", "travelers"), ()),
+    "activities": (("destination", "interests"), ()),
+    "itinerary": (("destination", "start_date", "end_date", "budget", "travelers"), ("flights_hotels", "activities")),
+    "summary": (ALL_FIELDS + ("prompt",), ("flights_hotels", "activities", "itinerary")),
+}
+DEFAULT_MAX_SESSIONS = 1024
+DEFAULT_SESSION_TTL = 3600.0
+
+
+def changed_fields(previous: TripRequest, current: TripRequest) -> set:
+    """Trip request fields whose normalized values differ"""
+    before, after = normalize_trip_request(previous), normalize_trip_request(current)
+    return {name for name in ALL_FIELDS if before[name] != after[name]}
+
+
+def stages_to_rerun(changed: set) -> List[str]:
+    """Stages, in run order, that read a changed field or take the output of a stage being rerun"""
+    stale = []
+    for stage, (reads, upstream) in STAGE_GRAPH.items():  # insertion order is a topological order
+        if changed.intersection(reads) or any(name in stale for name in upstream):
+            stale.append(stage)
+    return stale
+
+
+def apply_changes(trip_request: TripRequest, changes: Dict[str, Any]) -> TripRequest:
+    """trip_request with the changed fields replaced, validated; raises TripModelError naming changes.<field>"""
+    if not isinstance(changes, dict):
+        raise TripModelError(f"changes must be an object, got {type(changes).__name__}")
+    return TripRequest.from_dict({**to_wire(trip_request), **changes}, path="changes")
+
+
+class IncrementalPlanner:
+    """Runs the planning stages of a session, reusing the outputs a changed request does not affect"""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, ttl: Optional[float] = DEFAULT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # session_id -> (expires_at, trip_request, prompt, outputs)
+        self._lock = threading.Lock()
+        self._runs = Counter()
+        self._reuses = Counter()
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "IncrementalPlanner":
+        """Planner configured from PLAN_SESSIONS_MAX (0 disables sessions) and PLAN_SESSION_TTL"""
+        return cls(
+            max_sessions=int(os.environ.get("PLAN_SESSIONS_MAX", DEFAULT_MAX_SESSIONS)),
+            ttl=float(os.environ.get("PLAN_SESSION_TTL", DEFAULT_SESSION_TTL)),
+        )
+
+    def previous(self, session_id: Optional[str]) -> Optional[Tuple[TripRequest, str]]:
+        """(trip request, prompt) of the session's last turn, if it is still kept"""
+        session = self._get(session_id)
+        return session[1:3] if session else None
+
+    def plan(self, session_id: Optional[str], trip_request: TripRequest, stages: Dict[str, Callable[..., Any]],
+             timer, prompt: str = "") -> Dict[str, Any]:
+        """Outputs of every stage for trip_request; stages[name](*upstream outputs, trip_request) is
+        timed with timer.timed and only called when the session has no reusable output for it"""
+        session = self._get(session_id)
+        if session is None or not session[3]:
+            outputs, stale = {}, list(STAGE_GRAPH)
+        else:
+            outputs = dict(session[3])
+            changed = changed_fields(session[1], trip_request)
+            if session[2] != prompt:
+                changed.add("prompt")
+            stale = stages_to_rerun(changed)
+        for stage in stale:
+            upstream = [outputs[name] for name in STAGE_GRAPH[stage][1]]
+            outputs[stage] = timer.timed(stage, stages[stage], *upstream, trip_request)
+
+        with self._lock:
+            self._runs.update(stale)
+            self._reuses.update(stage for stage in STAGE_GRAPH if stage not in stale)
+        self.remember(session_id, trip_request, prompt, outputs)
+        return outputs
+
+    def remember(self, session_id: Optional[str], trip_request: TripRequest, prompt: str = "",
+                 outputs: Optional[Dict[str, Any]] = None):
+        """Make trip_request the session's current one (e.g. for an answer from the plan cache);
+        without outputs the next turn plans from scratch"""
+        if session_id is None or self.max_sessions <= 0:
+            return
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._sessions[session_id] = (expires_at, trip_request, prompt, outputs or {})
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "evictions": self.evictions,
+                "stage_runs": dict(self._runs),
+                "stage_reuses": dict(self._reuses),
+            }
+
+    def _get(self, session_id):
+        if session_id is None:
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if session[0] is not None and session[0] <= time.time():
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Agent invocation backends for the travel planner web server
+
+- subprocess: runs `agentcore invoke` per request (fresh process every time)
+- inprocess:  calls travel_orchestrator.invoke_handler directly
+- pool:       dispatches to a pool of long-lived, pre-warmed worker processes
+
+Every backend exposes invoke(prompt, **options) -> response dict and
+stream(prompt, **options), which yields (event, data) pairs. Options such as
+profile or timings are passed to the agent in its payload. Only the in-process backend streams individual
+pipeline stages; the others yield a single "complete" event.
+
+bedrock_metrics() returns the agent's Bedrock guard metrics. The subprocess and
+pool backends ask the agent for its stage timings and guard metrics with every
+request and record them here (stage_metrics.WorkerMetrics), so the server's
+/metrics covers stages that ran in other processes.
+"""
+
+import json
+import logging
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from json_extract import JSONExtractionError, extract_json
+from stage_metrics import WorkerMetrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 120  # 2 minute timeout
+
+
+class AgentInvocationError(Exception):
+    """Raised when a backend cannot produce a response; carries the HTTP status to report"""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class SubprocessBackend:
+    """Run the agent CLI in a new process for every request"""
+
+    name = "subprocess"
+
+    def __init__(self, cmd: Optional[List[str]] = None, timeout: float = DEFAULT_TIMEOUT):
+        self.cmd = cmd or ['agentcore', 'invoke']
+        self.timeout = timeout
+        self.worker_metrics = WorkerMetrics()
+
+    def invoke(self, prompt: str, **options) -> Dict[str, Any]:
+        cmd = self.cmd + [json.dumps({"prompt": prompt, **options, "worker_metrics": True})]
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+                cwd=os.getcwd()
+            )
+        except subprocess.TimeoutExpired:
+            logger.error("agentcore command timed out")
+            raise AgentInvocationError("Request timed out", 504)
+        except FileNotFoundError:
+            logger.error("agentcore command not found")
+            raise AgentInvocationError("agentcore command not found. Please ensure it's installed and in PATH.", 500)
+        except subprocess.SubprocessError as e:
+            logger.error("Subprocess error executing agentcore: %s", e)
+            raise AgentInvocationError("Error executing agentcore: " + str(e), 500)
+
+        if result.returncode != 0:
+            logger.error(f"agentcore command failed: {result.stderr}")
+            raise AgentInvocationError(f"Agent execution failed: {result.stderr}", 500)
+
+        logger.info("agentcore raw output: %s", result.stdout)
+        response_data = parse_agent_output(result.stdout)
+        self.worker_metrics.record(response_data.pop("worker_metrics", {}))
+        return response_data
+
+    def stream(self, prompt: str, **options) -> Iterator[Tuple[str, Any]]:
+        yield "complete", self.invoke(prompt, **options)
+
+    def bedrock_metrics(self) -> Dict[str, Any]:
+        return self.worker_metrics.bedrock()
+
+    def close(self):
+        pass
+
+
+def parse_agent_output(output: str) -> Dict[str, Any]:
+    """Extract the JSON response from (possibly decorated) agentcore stdout"""
+    try:
+        response_data = extract_json(output)
+    except JSONExtractionError:
+        logger.error("Could not extract valid JSON from agentcore output")
+        raise AgentInvocationError("Could not parse JSON from agent response", 500)
+    logger.info("Successfully extracted JSON from agentcore response")
+    return response_data
+
+
+class InProcessBackend:
+    """Call travel_orchestrator.invoke_handler in the server process"""
+
+    name = "inprocess"
+
+    def __init__(self):
+        from travel_orchestrator import invoke_handler, orchestrator, stream_handler
+        self._invoke_handler = invoke_handler
+        self._stream_handler = stream_handler
+        self._orchestrator = orchestrator
+
+    def invoke(self, prompt: str, **options) -> Dict[str, Any]:
+        return self._invoke_handler({"prompt": prompt, **options})
+
+    def stream(self, prompt: str, **options) -> Iterator[Tuple[str, Any]]:
+        return self._stream_handler({"prompt": prompt, **options})
+
+    def bedrock_metrics(self) -> Dict[str, Any]:
+        return self._orchestrator.bedrock_guard.metrics()
+
+    def close(self):
+        pass
+
+
+def warm_worker():
+    """Pool initializer: pay the orchestrator import and client setup once per worker"""
+    import travel_orchestrator
+    travel_orchestrator.orchestrator.bedrock_client  # created lazily otherwise
+
+
+def invoke_in_worker(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one invocation in a pool worker; picklable, so process pools can submit it"""
+    from travel_orchestrator import invoke_handler
+    return invoke_handler(payload)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class WorkerPoolBackend:
+    """Dispatch requests to a pool of long-lived worker processes"""
+
+    name = "pool"
+
+    def __init__(self, workers: int = 4, timeout: float = DEFAULT_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker)
+        self.worker_metrics = WorkerMetrics()
+
+    def warm_up(self):
+        """Start every worker up front so the first requests do not pay startup cost"""
+        futures = [self._executor.submit(_ping) for _ in range(self.workers)]
+        for future in futures:
+            future.result(timeout=self.timeout)
+
+    def invoke(self, prompt: str, **options) -> Dict[str, Any]:
+        future = self._executor.submit(invoke_in_worker, {"prompt": prompt, **options, "worker_metrics": True})
+        try:
+            response_data = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.error("Worker pool invocation timed out")
+            raise AgentInvocationError("Request timed out", 504)
+        except Exception as e:
+            logger.error("Worker pool invocation failed: %s", e)
+            raise AgentInvocationError("Agent execution failed: " + str(e), 500)
+        self.worker_metrics.record(response_data.pop("worker_metrics", {}))
+        return response_data
+
+    def stream(self, prompt: str, **options) -> Iterator[Tuple[str, Any]]:
+        yield "complete", self.invoke(prompt, **options)
+
+    def bedrock_metrics(self) -> Dict[str, Any]:
+        return self.worker_metrics.bedrock()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+BACKENDS = {
+    SubprocessBackend.name: SubprocessBackend,
+    InProcessBackend.name: InProcessBackend,
+    WorkerPoolBackend.name: WorkerPoolBackend,
+}
+
+
+def create_backend(name: str, **kwargs):
+    """Build a backend by name ('subprocess', 'inprocess' or 'pool')"""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}', expected one of: {', '.join(BACKENDS)}") from None
+    backend = backend_cls(**kwargs)
+    if isinstance(backend, WorkerPoolBackend):
+        backend.warm_up()
+    return backend
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Itinerary scheduling engine
+
+Assigns candidate activities to trip days and start times. Every activity is
+used at most once, starts at one of its time_slots, runs for its
+duration_minutes inside that weekday's opening hours, and leaves enough travel
+time from the previous activity and to the next one on the same day.
+
+Activities are picked greedily to maximize total rating within the activity
+budget: by rating when the budget covers every candidate, otherwise by rating
+per dollar with cost floored at $1 (so free and $1 activities rank alike),
+which is the classic knapsack greedy.
+Placement is insertion into per-day sorted timelines, so a week-long trip with
+hundreds of candidates schedules in a few milliseconds.
+"""
+
+import math
+from bisect import bisect_left
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_DURATION_MINUTES = 120
+DEFAULT_TIME_SLOTS = ("10:00", "14:00")
+DAY_START = "09:00"
+DAY_END = "23:00"
+MAX_ACTIVITIES_PER_DAY = 3
+
+# Door-to-door city travel: average transit speed plus a fixed overhead per leg
+TRAVEL_SPEED_KMH = 15.0
+TRAVEL_OVERHEAD_MINUTES = 10
+UNKNOWN_TRAVEL_MINUTES = 20     # different locations without coordinates
+ARRIVAL_BUFFER_MINUTES = 90     # airport to first activity on arrival day
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_ALWAYS_OPEN = ((0, 24 * 60),) * 7
+
+
+@lru_cache(maxsize=1024)
+def to_minutes(hhmm: str) -> int:
+    """'14:30' -> 870"""
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes: int) -> str:
+    """870 -> '14:30'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_opening_hours(value) -> tuple:
+    """Opening window (open, close) in minutes per weekday, None when closed.
+
+    Accepts None (always open), "09:00-18:00" (same every day) or a dict of
+    weekday abbreviation -> "HH:MM-HH:MM", where missing weekdays are closed.
+    """
+    if not value:
+        return _ALWAYS_OPEN
+    if isinstance(value, str):
+        return (_parse_window(value),) * 7
+    return tuple(_parse_window(value[day]) if value.get(day) else None for day in WEEKDAYS)
+
+
+def _parse_window(window: str) -> tuple:
+    opens, closes = window.split("-")
+    return to_minutes(opens.strip()), to_minutes(closes.strip())
+
+
+def travel_minutes(a: "_Candidate", b: "_Candidate") -> int:
+    """Estimated minutes to get from one activity to the next"""
+    if a.location == b.location:
+        return 0
+    if a.coords is None or b.coords is None:
+        return UNKNOWN_TRAVEL_MINUTES
+    (lat1, lon1), (lat2, lon2) = a.coords, b.coords
+    # Equirectangular approximation; accurate to well under 1% at city scale
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    km = 6371.0 * math.hypot(x, y)
+    return TRAVEL_OVERHEAD_MINUTES + math.ceil(km / TRAVEL_SPEED_KMH * 60)
+
+
+class _Candidate:
+    __slots__ = ("activity", "location", "coords", "cost", "rating", "duration", "slots", "hours")
+
+    def __init__(self, activity: Dict[str, Any]):
+        self.activity = activity
+        self.location = activity.get("location")
+        lat, lon = activity.get("lat"), activity.get("lon")
+        self.coords = (lat, lon) if lat is not None and lon is not None else None
+        self.cost = activity.get("price") or 0
+        self.rating = activity.get("rating") or 0
+        self.duration = int(activity.get("duration_minutes") or DEFAULT_DURATION_MINUTES)
+        self.slots = sorted(to_minutes(s) for s in activity.get("time_slots") or DEFAULT_TIME_SLOTS)
+        self.hours = parse_opening_hours(activity.get("opening_hours"))
+
+
+class _Day:
+    __slots__ = ("weekday", "start", "end", "starts", "entries")
+
+    def __init__(self, weekday: int, start: int, end: int):
+        self.weekday = weekday
+        self.start = start
+        self.end = end
+        self.starts: List[int] = []                 # sorted start minutes
+        self.entries: List[tuple] = []              # (start, end, candidate), same order
+
+    def find_start(self, candidate: _Candidate) -> Optional[int]:
+        """Earliest time slot at which candidate fits into this day, if any"""
+        window = candidate.hours[self.weekday]
+        if window is None:
+            return None
+        earliest = max(self.start, window[0])
+        latest_end = min(self.end, window[1])
+        for start in candidate.slots:
+            end = start + candidate.duration
+            if start < earliest:
+                continue
+            if end > latest_end:
+                break  # slots are sorted, later ones end later
+            if self._fits(candidate, start, end):
+                return start
+        return None
+
+    def _fits(self, candidate: _Candidate, start: int, end: int) -> bool:
+        position = bisect_left(self.starts, start)
+        if position > 0:
+            _, previous_end, previous = self.entries[position - 1]
+            if previous_end + travel_minutes(previous, candidate) > start:
+                return False
+        if position < len(self.entries):
+            next_start, _, following = self.entries[position]
+            if end + travel_minutes(candidate, following) > next_start:
+                return False
+        return True
+
+    def add(self, candidate: _Candidate, start: int):
+        position = bisect_left(self.starts, start)
+        self.starts.insert(position, start)
+        self.entries.insert(position, (start, start + candidate.duration, candidate))
+
+
+def schedule_itinerary(activities: Iterable[Dict[str, Any]], dates: List[date],
+                       budget: Optional[float] = None,
+                       max_per_day: int = MAX_ACTIVITIES_PER_DAY,
+                       day_start: str = DAY_START, day_end: str = DAY_END,
+                       first_day_start: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+    """Schedule activities over dates; returns one time-ordered activity list per date.
+
+    budget caps the summed activity prices (None = unlimited). first_day_start
+    is the arrival time on the first day; activities start after a buffer.
+    """
+    candidates = [_Candidate(a) for a in activities]
+    start, end = to_minutes(day_start), to_minutes(day_end)
+    days = [_Day(d.weekday(), start, end) for d in dates]
+    if days and first_day_start:
+        days[0].start = max(start, to_minutes(first_day_start) + ARRIVAL_BUFFER_MINUTES)
+
+    remaining = math.inf if budget is None else max(budget, 0)
+    if sum(c.cost for c in candidates) <= remaining:
+        candidates.sort(key=lambda c: (-c.rating, c.cost))
+    else:
+        candidates.sort(key=lambda c: (-c.rating / max(c.cost, 1), -c.rating))
+
+    open_days = list(days)
+    for candidate in candidates:
+        if not open_days:
+            break
+        if candidate.cost > remaining:
+            continue
+        # Spread activities over the trip: try the emptiest days first
+        for day in sorted(open_days, key=lambda d: len(d.entries)):
+            slot = day.find_start(candidate)
+            if slot is not None:
+                day.add(candidate, slot)
+                remaining -= candidate.cost
+                if len(day.entries) >= max_per_day:
+                    open_days.remove(day)
+                break
+
+    return [[_scheduled_activity(s, e, c) for s, e, c in day.entries] for day in days]
+
+
+def _scheduled_activity(start: int, end: int, candidate: _Candidate) -> Dict[str, Any]:
+    activity = candidate.activity
+    return {
+        "time": format_minutes(start),
+        "end_time": format_minutes(end),
+        "activity": activity["name"],
+        "location": activity.get("location"),
+        "price": activity.get("price", 0),
+    }
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+JSON encoding straight to UTF-8 bytes
+
+dumps() uses orjson or msgspec when one is installed and the stdlib json
+module otherwise (JSON_BACKEND=orjson|msgspec|stdlib forces one). All backends
+write compact separators and non-ASCII characters as UTF-8, so "Hofbräu
+München" is sent as-is rather than as \\u escapes. orjson and msgspec encode
+directly to bytes without the intermediate str the stdlib path builds and then
+copies. Dataclasses such as the trip_models types are encoded as objects with
+their fields in definition order.
+
+The bytes are identical for what plans contain (strings, 64-bit ints, floats
+such as prices and ratings that print without an exponent), but not at the
+edges:
+
+- floats printed with an exponent: orjson writes 1e16 and 1e-7 where the
+  stdlib writes 1e+16 and 1e-07 (both decode to the same number)
+- NaN and infinity: orjson and msgspec write null; the stdlib raises
+  ValueError instead of emitting NaN, which is not valid JSON
+- ints outside -2**63 .. 2**64-1: orjson raises TypeError, the stdlib
+  encodes them
+
+`python bench_json_codec.py` compares the backends on large itineraries.
+"""
+
+import json
+import os
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict
+
+BACKEND_ORDER = ("orjson", "msgspec", "stdlib")
+
+
+_FIELD_NAMES: Dict[type, tuple] = {}
+
+
+def _dataclass_fields(obj: Any) -> Dict[str, Any]:
+    names = _FIELD_NAMES.get(type(obj))
+    if names is None:
+        if not is_dataclass(obj) or isinstance(obj, type):
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+        names = _FIELD_NAMES[type(obj)] = tuple(f.name for f in fields(obj))
+    return {name: getattr(obj, name) for name in names}
+
+
+def _stdlib_encoder() -> Callable[[Any], bytes]:
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), allow_nan=False,
+                              default=_dataclass_fields).encode
+    return lambda obj: encode(obj).encode("utf-8")
+
+
+def _orjson_encoder() -> Callable[[Any], bytes]:
+    import orjson
+    option = orjson.OPT_NON_STR_KEYS  # like the stdlib, accept int keys
+    return lambda obj: orjson.dumps(obj, option=option)
+
+
+def _msgspec_encoder() -> Callable[[Any], bytes]:
+    import msgspec
+    return msgspec.json.Encoder().encode
+
+
+_LOADERS = {"orjson": _orjson_encoder, "msgspec": _msgspec_encoder, "stdlib": _stdlib_encoder}
+
+
+def available_backends() -> Dict[str, Callable[[Any], bytes]]:
+    """{backend name: encoder} for every backend importable here, fastest first"""
+    encoders = {}
+    for name in BACKEND_ORDER:
+        try:
+            encoders[name] = _LOADERS[name]()
+        except ImportError:
+            continue
+    return encoders
+
+
+def _select_backend():
+    requested = os.environ.get("JSON_BACKEND", "").lower()
+    if requested and requested not in _LOADERS:
+        raise ValueError(f"Unknown JSON_BACKEND '{requested}', expected one of: {', '.join(BACKEND_ORDER)}")
+    for name in ((requested,) if requested else BACKEND_ORDER):
+        try:
+            return name, _LOADERS[name]()
+        except ImportError:
+            if requested:
+                print(f"⚠️ JSON_BACKEND={requested} is not installed, using the stdlib json module")
+    return "stdlib", _stdlib_encoder()
+
+
+BACKEND, _encode = _select_backend()
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes for obj"""
+    return _encode(obj)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Single-pass extraction of the first JSON object from agentcore CLI output
+
+`agentcore invoke` prints a decorated session box, then "Response:", then the
+agent's JSON. StreamingJSONExtractor finds the first complete top-level object
+with the C json decoder in amortized linear time, whether the output arrives
+all at once or in chunks, and never backtracks the way the old regexes did.
+
+Usage as a CLI (replacement for the old sed/tr/jq pipeline):
+    agentcore invoke '{"prompt": "..."}' | python3 json_extract.py
+"""
+
+import argparse
+import json
+import re
+import sys
+from typing import Any, Dict, IO, Optional
+
+# Inside an object we only care about braces and string boundaries.
+# The last alternative matches an opening quote whose string never closes.
+_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]|"')
+
+_decoder = json.JSONDecoder()
+
+
+class JSONExtractionError(ValueError):
+    """Raised when the input contains no complete JSON object"""
+
+
+class StreamingJSONExtractor:
+    """Incrementally locate and decode the first top-level JSON object in a text stream
+
+    Text before the first '{' is discarded as it arrives. While a candidate
+    object is buffered, raw_decode is retried when a chunk ends a line with '}'
+    and the buffer has doubled since the last attempt, or when it has grown
+    fourfold, so a complete object is detected early and pretty-printed output
+    (a '}' on every other line) still costs amortized linear time. If the candidate turns out not to be JSON (a stray
+    brace in the CLI banner), close() falls back to one brace-matching scan that
+    skips string contents.
+    """
+
+    def __init__(self):
+        self.result: Optional[Dict[str, Any]] = None
+        self._chunks = []       # buffered text, starting at the candidate '{'
+        self._length = 0
+        self._buffer = ""       # joined view of _chunks as of the last decode attempt
+        self._last_attempt = 0  # buffered length at the last decode attempt
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        if self.done:
+            return self.result
+        if not self._chunks:
+            start = chunk.find("{")
+            if start < 0:
+                return None
+            chunk = chunk[start:]
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        # The CLI ends the object with a newline, so "}\n" is the cheap cue to try
+        # decoding; both the cue and the backstop for one-line outputs back off
+        # geometrically so every attempt re-reads at most twice the text before it
+        if self._length >= 4 * self._last_attempt or (
+                "}\n" in chunk and self._length >= 2 * self._last_attempt):
+            self._join()
+            self._try_decode(0)
+            self._last_attempt = self._length
+        return self.result
+
+    def close(self) -> Dict[str, Any]:
+        """Signal end of input; returns the object or raises JSONExtractionError"""
+        if not self.done and self._chunks:
+            self._join()
+            if not self._try_decode(0):
+                self._scan()
+        if not self.done:
+            raise JSONExtractionError("Could not find a complete JSON object in output")
+        return self.result
+
+    def _join(self):
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        self._buffer = self._chunks[0]
+
+    def _try_decode(self, start: int) -> bool:
+        try:
+            obj, _ = _decoder.raw_decode(self._buffer, start)
+        except ValueError:
+            return False
+        if isinstance(obj, dict):
+            self.result = obj
+            return True
+        return False
+
+    def _scan(self):
+        """Brace-match candidates in order, decoding each balanced one.
+
+        A candidate that runs to end of input cannot contain a later top-level
+        object except nested inside it (after a stray '{'), so scanning resumes
+        at its first child object rather than the next character, keeping
+        truncated input linear.
+        """
+        buffer = self._buffer
+        pos = 0
+        while not self.done:
+            start = buffer.find("{", pos)
+            if start < 0:
+                return
+            depth = 0
+            first_child = -1
+            balanced = False
+            for match in _TOKEN_RE.finditer(buffer, start):
+                token = match.group()
+                if token == '"':
+                    break  # unterminated string: candidate is truncated
+                if token == "{":
+                    depth += 1
+                    if depth == 2 and first_child < 0:
+                        first_child = match.start()
+                elif token == "}":
+                    depth -= 1
+                    if depth == 0:
+                        balanced = True
+                        break
+            if balanced:
+                # Either the object, or braces that are not JSON ("{not json}")
+                if self._try_decode(start):
+                    return
+                pos = start + 1
+            else:
+                pos = first_child if first_child >= 0 else len(buffer)
+
+
+def extract_json(text: str) -> Dict[str, Any]:
+    """Return the first complete top-level JSON object in text"""
+    extractor = StreamingJSONExtractor()
+    extractor.feed(text)
+    return extractor.close()
+
+
+def extract_json_from_stream(stream: IO[str], chunk_size: int = 65536) -> Dict[str, Any]:
+    """Read a text stream until the first complete JSON object is available"""
+    extractor = StreamingJSONExtractor()
+    while not extractor.done:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        extractor.feed(chunk)
+    return extractor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the first JSON object found on stdin")
+    parser.add_argument('--compact', action='store_true', help="Print on one line instead of indented")
+    args = parser.parse_args()
+
+    try:
+        data = extract_json_from_stream(sys.stdin)
+    except JSONExtractionError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(data, ensure_ascii=False, indent=None if args.compact else 2))
+
+
+if __name__ == '__main__':
+    main()
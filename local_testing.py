@@ -6,10 +6,15 @@ Tests each agent (Orchestrator, Flights/Hotels, Activities, Itinerary) independe
 
 import json
 import asyncio
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from activity_catalog import default_catalog
+from itinerary_scheduler import schedule_itinerary
+from trip_renderer import iter_markdown
+from user_memory import UserMemoryStore
+
 
 @dataclass
 class TripRequest:
@@ -58,26 +63,19 @@ class MockActivitiesAgent:
         # Simulate API calls to TripAdvisor/Yelp
         activities = []
         
-        if "history" in request.interests:
-            activities.append({
-                "activity_id": "act_001",
-                "name": "Marienplatz Historical Tour",
-                "description": "Guided tour of Munich's historic city center",
-                "time_slots": ["10:00", "14:00", "16:00"],
-                "price": 25,
-                "location": "Marienplatz",
-                "rating": 4.6
-            })
-            
-        if "craft beer" in request.interests or "beer" in request.interests:
+        for activity in default_catalog().search(request.destination, request.interests):
             activities.append({
-                "activity_id": "act_002", 
-                "name": "Hofbräu Beer Garden",
-                "description": "Traditional Bavarian beer garden experience",
-                "time_slots": ["12:00", "17:00", "19:00"],
-                "price": 15,
-                "location": "Hofbräu München",
-                "rating": 4.4
+                "activity_id": activity["id"],
+                "name": activity["name"],
+                "description": activity["description"],
+                "time_slots": activity["time_slots"],
+                "duration_minutes": activity.get("duration_minutes"),
+                "opening_hours": activity.get("opening_hours"),
+                "price": activity["price"],
+                "location": activity["location"],
+                "lat": activity.get("lat"),
+                "lon": activity.get("lon"),
+                "rating": activity["rating"]
             })
             
         return {"activities": activities}
@@ -91,30 +89,30 @@ class MockItineraryAgent:
         start_date = datetime.strptime(request.dates["start_date"], "%Y-%m-%d")
         end_date = datetime.strptime(request.dates["end_date"], "%Y-%m-%d")
         
-        days = []
+        dates = []
         current_date = start_date
-        
         while current_date <= end_date:
-            day_activities = []
-            
-            # Add activities based on availability and preferences
-            for activity in activities.get("activities", []):
-                if len(day_activities) < 2:  # Max 2 activities per day
-                    day_activities.append({
-                        "time": activity["time_slots"][0],
-                        "activity": activity["name"],
-                        "location": activity["location"],
-                        "price": activity["price"]
-                    })
-            
+            dates.append(current_date)
+            current_date += timedelta(days=1)
+        
+        # Schedule activities by time slot, opening hours and travel time within the budget
+        flights = flights_hotels.get("flights", [])
+        fixed_cost = sum(f["price"] for f in flights) + sum(h["price"] for h in flights_hotels.get("hotels", [])) * len(dates)
+        schedule = schedule_itinerary(
+            activities.get("activities", []),
+            dates,
+            budget=request.budget - fixed_cost,
+            first_day_start=flights[0].get("arrival") if flights else None,
+        )
+        
+        days = []
+        for day_date, day_activities in zip(dates, schedule):
             days.append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "day_name": current_date.strftime("%A"),
+                "date": day_date.strftime("%Y-%m-%d"),
+                "day_name": day_date.strftime("%A"),
                 "activities": day_activities,
                 "accommodation": flights_hotels.get("hotels", [{}])[0].get("name", "TBD")
             })
-            
-            current_date += timedelta(days=1)
         
         return {
             "itinerary": {
@@ -135,21 +133,23 @@ class MockItineraryAgent:
 class TripOrchestratorAgent:
     """Main orchestrator that coordinates all sub-agents"""
     
-    def __init__(self):
+    def __init__(self, user_memory: Optional[UserMemoryStore] = None):
         self.flights_hotels_agent = MockFlightsHotelsAgent()
         self.activities_agent = MockActivitiesAgent()
         self.itinerary_agent = MockItineraryAgent()
-        self.user_memory = {}  # Simulate AgentCore Memory
+        # Simulate AgentCore Memory: bounded LRU, persisted to SQLite when USER_MEMORY_PATH is set
+        self.user_memory = user_memory if user_memory is not None else UserMemoryStore.from_env()
     
     async def plan_trip(self, request: TripRequest, user_id: str = "test_user") -> Dict[str, Any]:
         """Main trip planning orchestration"""
         
-        # Store user preferences in memory
-        self.user_memory[user_id] = {
+        # Add the trip to the user's history and preferences (written to disk in the background)
+        preferences = self.user_memory.remember_trip(user_id, {
+            "destination": request.destination,
+            "dates": request.dates,
             "budget": request.budget,
-            "interests": request.interests,
-            "last_destination": request.destination
-        }
+            "interests": request.interests
+        })
         
         print(f"🧭 Orchestrator: Planning trip to {request.destination}")
         print(f"   Budget: ${request.budget}, Interests: {', '.join(request.interests)}")
@@ -178,7 +178,7 @@ class TripOrchestratorAgent:
             "accommodation": flights_hotels["hotels"], 
             "activities": activities["activities"],
             "itinerary": itinerary["itinerary"],
-            "user_memory": self.user_memory.get(user_id, {})
+            "user_memory": preferences
         }
         
         return final_plan
@@ -186,40 +186,8 @@ class TripOrchestratorAgent:
 
 def format_trip_plan_markdown(plan: Dict[str, Any]) -> str:
     """Format the trip plan into readable markdown"""
-    
-    md = f"""# Trip Plan: {plan['request']['destination']}
-
-## 📋 Trip Overview
-- **Destination**: {plan['request']['destination']}
-- **Dates**: {plan['request']['dates']['start_date']} to {plan['request']['dates']['end_date']}
-- **Budget**: ${plan['request']['budget']}
-- **Interests**: {', '.join(plan['request']['interests'])}
-- **Estimated Total Cost**: ${plan['itinerary']['total_estimated_cost']}
-
-## ✈️ Transportation
-"""
-    
-    for flight in plan['transportation']:
-        md += f"- **Flight {flight['option_id']}**: ${flight['price']}, {flight['duration']}\n"
-        md += f"  Departure: {flight['departure']} → Arrival: {flight['arrival']}\n"
-        md += f"  [Book Now]({flight['booking_link']})\n\n"
-    
-    md += "## 🏨 Accommodation\n"
-    for hotel in plan['accommodation']:
-        md += f"- **{hotel['name']}**: ${hotel['price']}/night, Rating: {hotel['rating']}/5\n"
-        md += f"  Check-in: {hotel['check_in']} → Check-out: {hotel['check_out']}\n"
-        md += f"  [Book Now]({hotel['booking_link']})\n\n"
-    
-    md += "## 📅 Daily Itinerary\n"
-    for day in plan['itinerary']['daily_plan']:
-        md += f"### {day['day_name']}, {day['date']}\n"
-        md += f"**Accommodation**: {day['accommodation']}\n\n"
-        
-        for activity in day['activities']:
-            md += f"- **{activity['time']}**: {activity['activity']} (${activity['price']})\n"
-            md += f"  📍 {activity['location']}\n\n"
-    
-    return md
+    # trip_renderer.iter_markdown / write_trip_plan stream the same text in chunks
+    return "".join(iter_markdown(plan))
 
 
 async def test_trip_agent():
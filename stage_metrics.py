@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency histograms for the trip planning pipeline
+
+Handlers time each stage (parse, flights_hotels, activities, itinerary,
+summary, plus the whole request as total) with a RequestTimer; the server adds
+serialize for encoding the JSON response. Every timing goes into a
+process-wide StageMetrics registry that keeps a cumulative histogram per stage
+for Prometheus and a window of recent samples for p50/p95/p99.
+
+With the pool or subprocess backends the agent stages run in other processes,
+which return their stage durations and Bedrock guard metrics with each
+response; WorkerMetrics feeds those into this process's registry.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+from bedrock_resilience import percentile
+
+STAGES = ("parse", "flights_hotels", "activities", "itinerary", "summary", "serialize", "total")
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+QUANTILES = (50, 95, 99)
+RECENT_SAMPLES = 1024  # per stage, for the quantiles
+# Cumulative BedrockGuard.metrics() fields, exported as counters
+BEDROCK_COUNTERS = ("calls", "successes", "failures", "hedged", "hedge_wins", "slow_fallbacks", "budget_exceeded",
+                    "short_circuited", "breaker_opened")
+BREAKER_STATES = ("closed", "half_open", "open")
+MAX_WORKER_PROCESSES = 256
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts and sum, plus the most recent samples for quantiles"""
+
+    def __init__(self, buckets=BUCKETS, recent: int = RECENT_SAMPLES):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=recent)
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def quantiles(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+        return {f"p{q}": percentile(recent, q) for q in QUANTILES}
+
+
+class StageMetrics:
+    """Thread-safe registry of one LatencyHistogram per stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{stage: {"count", "sum_s", "p50_s", "p95_s", "p99_s"}}"""
+        with self._lock:
+            snapshot = {}
+            for stage, histogram in self._histograms.items():
+                entry = {"count": histogram.count, "sum_s": round(histogram.sum, 6)}
+                entry.update({f"{name}_s": round(value, 6) for name, value in histogram.quantiles().items()})
+                snapshot[stage] = entry
+            return snapshot
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = [
+            "# HELP travel_stage_duration_seconds Time spent in each trip planning stage",
+            "# TYPE travel_stage_duration_seconds histogram",
+        ]
+        quantile_lines = [
+            "# HELP travel_stage_duration_quantile_seconds Stage latency quantiles over recent requests",
+            "# TYPE travel_stage_duration_quantile_seconds gauge",
+        ]
+        with self._lock:
+            for stage in sorted(self._histograms, key=_stage_order):
+                histogram = self._histograms[stage]
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'travel_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'travel_stage_duration_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'travel_stage_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+                recent = sorted(histogram.recent)
+                for q in QUANTILES:
+                    quantile_lines.append(f'travel_stage_duration_quantile_seconds{{stage="{stage}",quantile="{q / 100}"}} '
+                                          f'{percentile(recent, q):.6f}')
+        return "\n".join(lines + quantile_lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+def _stage_order(stage: str):
+    return (STAGES.index(stage) if stage in STAGES else len(STAGES), stage)
+
+
+# Process-wide registry used by the handlers and the server
+stage_metrics = StageMetrics()
+
+
+class RequestTimer:
+    """Times the stages of one request into the registry and keeps them for a timings block"""
+
+    def __init__(self, metrics: StageMetrics = stage_metrics):
+        self.metrics = metrics
+        self.started = time.perf_counter()
+        self._timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name: str, func: Callable[..., Any], *args) -> Any:
+        """func(*args), timed as stage name (for calls handed to worker threads)"""
+        with self.stage(name):
+            return func(*args)
+
+    def record(self, name: str, seconds: float):
+        self._timings[name] = seconds
+        self.metrics.observe(name, seconds)
+
+    def seconds(self) -> Dict[str, float]:
+        """Seconds per stage recorded so far"""
+        return dict(self._timings)
+
+    def finish(self) -> Dict[str, float]:
+        """Record the total and return the timings block: milliseconds per stage"""
+        self.record("total", time.perf_counter() - self.started)
+        return {f"{name}_ms": round(seconds * 1000, 2) for name, seconds in self._timings.items()}
+
+
+class WorkerMetrics:
+    """Stage timings and Bedrock guard metrics reported by agent worker processes
+
+    Each report is {"process", "stages": {stage: seconds}, "bedrock":
+    BedrockGuard.metrics()}. Stage durations go into the local registry. Guard
+    counters are cumulative per process, so the latest report of each process
+    is kept and the processes are summed; the least recently reporting process
+    beyond max_processes is folded into a retired total.
+    """
+
+    def __init__(self, metrics: StageMetrics = stage_metrics, max_processes: int = MAX_WORKER_PROCESSES):
+        self.metrics = metrics
+        self.max_processes = max_processes
+        self._lock = threading.Lock()
+        self._processes = OrderedDict()  # process id -> latest guard metrics
+        self._retired = Counter()
+        self._retired_errors = Counter()
+
+    def record(self, report: Dict[str, Any]):
+        if not isinstance(report, dict):
+            return  # an agent that does not report metrics
+        for stage, seconds in report.get("stages", {}).items():
+            self.metrics.observe(stage, seconds)
+        bedrock, process = report.get("bedrock"), report.get("process")
+        if bedrock is None or process is None:
+            return
+        with self._lock:
+            self._processes.pop(process, None)
+            self._processes[process] = bedrock
+            while len(self._processes) > self.max_processes:
+                _, retired = self._processes.popitem(last=False)
+                self._retired.update({name: retired.get(name, 0) for name in BEDROCK_COUNTERS})
+                self._retired_errors.update(retired.get("errors", {}))
+
+    def bedrock(self) -> Dict[str, Any]:
+        """Guard counters and errors summed over processes, and how many processes are in each breaker state"""
+        with self._lock:
+            totals = Counter(self._retired)
+            errors = Counter(self._retired_errors)
+            states = Counter()
+            for metrics in self._processes.values():
+                totals.update({name: metrics.get(name, 0) for name in BEDROCK_COUNTERS})
+                errors.update(metrics.get("errors", {}))
+                states[metrics.get("breaker_state", "closed")] += 1
+        return {**{name: totals[name] for name in BEDROCK_COUNTERS}, "errors": dict(errors),
+                "breaker_states": dict(states)}
+
+
+def bedrock_prometheus(metrics: Dict[str, Any]) -> str:
+    """BedrockGuard.metrics() or WorkerMetrics.bedrock() in Prometheus text format"""
+    lines = []
+    for name in BEDROCK_COUNTERS:
+        lines.append(f"# TYPE travel_bedrock_{name}_total counter")
+        lines.append(f"travel_bedrock_{name}_total {metrics.get(name, 0)}")
+    lines.append("# HELP travel_bedrock_errors_total Failed Bedrock calls by error code")
+    lines.append("# TYPE travel_bedrock_errors_total counter")
+    for code, count in sorted(metrics.get("errors", {}).items()):
+        lines.append(f'travel_bedrock_errors_total{{code="{code}"}} {count}')
+    states = metrics.get("breaker_states")
+    if states is None:
+        states = {metrics["breaker_state"]: 1} if "breaker_state" in metrics else {}
+    lines.append("# HELP travel_bedrock_breaker_state Agent processes whose circuit breaker is in each state")
+    lines.append("# TYPE travel_bedrock_breaker_state gauge")
+    for state in BREAKER_STATES:
+        lines.append(f'travel_bedrock_breaker_state{{state="{state}"}} {states.get(state, 0)}')
+    for name in ("latency_p50_s", "latency_p95_s", "slow_threshold_s"):
+        if name in metrics:  # only this process's guard; quantiles of several processes cannot be summed
+            lines.append(f"# TYPE travel_bedrock_{name[:-2]}_seconds gauge")
+            lines.append(f"travel_bedrock_{name[:-2]}_seconds {metrics[name]}")
+    return "\n".join(lines) + "\n"
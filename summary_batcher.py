@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Micro-batched trip summaries
+
+Each summary is a ~1 KB prompt for a few hundred output tokens, so under
+batch load most of the cost of one invoke_model call is per-request overhead
+and throttling pressure. SummaryBatcher collects summary requests that arrive
+within a short window (or until the batch is full), packs their trip details
+into one prompt behind the same cacheable system prefix as single summaries,
+asks for a JSON list of summaries, and hands each caller its own summary
+back. A batch of one uses the normal single-trip prompt. If
+the model's reply cannot be split into exactly one summary per trip, the
+affected trips are retried one call each.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+from json_extract import JSONExtractionError, extract_json
+from summary_prompt import ANTHROPIC_VERSION, system_blocks
+
+DEFAULT_SUMMARY_BATCH_SIZE = 8
+DEFAULT_SUMMARY_WINDOW = 0.05       # seconds to wait for more requests after the first
+MAX_CONCURRENT_BATCHES = 4
+TOKENS_PER_SUMMARY = 300
+MAX_BATCH_TOKENS = 4096
+
+
+class SummaryBatcher:
+    """Collects concurrent summary requests into shared Bedrock calls for an orchestrator agent"""
+
+    def __init__(self, agent, max_batch_size: int = DEFAULT_SUMMARY_BATCH_SIZE,
+                 max_wait: float = DEFAULT_SUMMARY_WINDOW, max_concurrent_batches: int = MAX_CONCURRENT_BATCHES):
+        self.agent = agent
+        self.max_batch_size = max(1, min(max_batch_size, MAX_BATCH_TOKENS // TOKENS_PER_SUMMARY))
+        self.max_wait = max_wait
+        self.max_concurrent_batches = max_concurrent_batches
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "model_calls": 0, "batches": 0, "split_failures": 0}
+        self._pid = None
+        self._closed = False
+
+    def _start(self):
+        """Start the collector thread; also after a fork, which does not copy threads"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_batches,
+                                                thread_name_prefix="summary-batch")
+            threading.Thread(target=self._collect, name="summary-batcher", daemon=True).start()
+
+    def summarize(self, trip_plan_data: Dict[str, Any], user_input: str) -> str:
+        """Summary for one trip; blocks until the micro-batch it joined has been answered"""
+        if self._closed:
+            raise RuntimeError("SummaryBatcher is closed")
+        if self._pid != os.getpid():
+            self._start()
+        future = Future()
+        self._queue.put(((trip_plan_data, user_input), future))
+        return future.result()
+
+    def summarize_many(self, items: Sequence[Tuple[Dict[str, Any], str]]) -> List[str]:
+        """Summaries for (trip_plan_data, user_input) pairs, packed max_batch_size per call"""
+        summaries = []
+        for start in range(0, len(items), self.max_batch_size):
+            summaries.extend(self._summarize_batch(list(items[start:start + self.max_batch_size])))
+        return summaries
+
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                self._executor.shutdown(wait=False)
+                return
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._queue.put(None)  # finish this batch, then stop
+                    break
+                batch.append(entry)
+            self._executor.submit(self._answer, batch)
+
+    def _answer(self, batch: List[Tuple[Tuple[Dict[str, Any], str], Future]]):
+        try:
+            summaries = self._summarize_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), summary in zip(batch, summaries):
+            future.set_result(summary)
+
+    def _summarize_batch(self, items: List[Tuple[Dict[str, Any], str]]) -> List[str]:
+        with self._lock:
+            self._counters["requests"] += len(items)
+            self._counters["batches"] += 1
+        if len(items) == 1:
+            return [self._invoke(self.agent.build_summary_request(*items[0]))]
+
+        text = self._invoke(self.build_batch_request(items))
+        summaries = split_summaries(text, len(items))
+        if summaries is None:
+            with self._lock:
+                self._counters["split_failures"] += 1
+            return [self._invoke(self.agent.build_summary_request(*item)) for item in items]
+        return summaries
+
+    def _invoke(self, request_body: Dict[str, Any]) -> str:
+        with self._lock:
+            self._counters["model_calls"] += 1
+        return self.agent.invoke_summary_model(request_body)
+
+    def build_batch_request(self, items: Sequence[Tuple[Dict[str, Any], str]]) -> Dict[str, Any]:
+        """One Bedrock request asking for a summary of every trip in items"""
+        trips = "\n\n".join(
+            f"=== Trip {i} ===\n{self.agent.summary_trip_details(trip_plan_data, user_input)}"
+            for i, (trip_plan_data, user_input) in enumerate(items, 1)
+        )
+        prompt = f"""Below are {len(items)} separate trip plans, each for a different customer. Write one summary per trip, following your instructions for each.
+
+{trips}
+
+Reply with only a JSON object of the form {{"summaries": ["<summary of Trip 1>", ..., "<summary of Trip {len(items)}>"]}} with exactly {len(items)} summaries in trip order."""
+
+        # Same cacheable system prefix as single-trip summaries
+        return {
+            "anthropic_version": ANTHROPIC_VERSION,
+            "max_tokens": min(MAX_BATCH_TOKENS, TOKENS_PER_SUMMARY * len(items) + 100),
+            "system": system_blocks(cache=self.agent.prompt_caching),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["requests_per_call"] = round(stats["requests"] / stats["model_calls"], 2) if stats["model_calls"] else 0.0
+        return stats
+
+    def close(self):
+        """Answer queued requests, then stop the collector thread"""
+        self._closed = True
+        if self._pid == os.getpid():
+            self._queue.put(None)
+
+
+def split_summaries(text: str, count: int):
+    """The list of `count` summaries from a batch reply, or None if it does not parse"""
+    try:
+        summaries = extract_json(text).get("summaries")
+    except JSONExtractionError:
+        return None
+    if not isinstance(summaries, list) or len(summaries) != count:
+        return None
+    if not all(isinstance(s, str) and s.strip() for s in summaries):
+        return None
+    return [s.strip() for s in summaries]
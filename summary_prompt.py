@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Summary prompt: cacheable static prefix plus a precompiled per-trip template
+
+The travel-agent persona and writing instructions are identical for every
+summary, so they are sent as a system prompt that can be marked with Anthropic
+cache_control. Bedrock then bills repeated prefixes as cache reads (10% of the
+input price) and skips re-processing them. Only the per-trip facts change;
+they are rendered from a template parsed once at import time.
+
+Only some Bedrock models accept cache_control (others reject the request), and
+they only cache prefixes of at least 1,024 tokens on Sonnet models (2,048 on
+Haiku). use_prompt_caching() checks both up front against
+PROMPT_CACHING_MODELS. StubBedrockRuntime follows the same caching rules
+locally and reports the tokens caching would save, without calling AWS.
+"""
+
+import hashlib
+import io
+import json
+import math
+import re
+import threading
+import time
+from string import Formatter
+from typing import Any, Dict, Iterator, List, Optional
+
+ANTHROPIC_VERSION = "bedrock-2023-05-31"
+MIN_CACHEABLE_TOKENS = 1024
+CACHE_TTL_SECONDS = 300
+CACHE_READ_PRICE_RATIO = 0.1      # cache reads cost 10% of normal input tokens
+CACHE_WRITE_PRICE_RATIO = 1.25    # cache writes cost 25% more
+
+# Bedrock models known to accept cache_control: model id fragment -> minimum cacheable prefix tokens
+PROMPT_CACHING_MODELS = {
+    "anthropic.claude-3-7-sonnet": MIN_CACHEABLE_TOKENS,
+    "anthropic.claude-sonnet-4": MIN_CACHEABLE_TOKENS,
+    "anthropic.claude-opus-4": MIN_CACHEABLE_TOKENS,
+    "anthropic.claude-3-5-haiku": 2048,
+}
+
+SUMMARY_SYSTEM_PROMPT = """You are a friendly and professional travel agent. Based on the trip planning data you are given, create an engaging and personalized travel summary for the customer.
+
+Please write a warm, enthusiastic, and informative summary that:
+1. Acknowledges their specific interests and budget
+2. Highlights the exciting experiences they'll have
+3. Mentions the great value (cost vs budget)
+4. Creates excitement about their upcoming trip
+5. Keep it concise but engaging (2-3 paragraphs)
+
+Write in a friendly, professional tone as if you're personally excited to help them plan this amazing trip."""
+
+
+class PromptTemplate:
+    """str.format-style template parsed once; render() only joins literals and values"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._parts = []
+        for literal, field, spec, conversion in Formatter().parse(text):
+            if spec or conversion:
+                raise ValueError(f"Unsupported format spec in template field '{field}'")
+            self._parts.append((literal, field))
+        self.fields = [field for _, field in self._parts if field is not None]
+
+    def render(self, **values) -> str:
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return "".join(out)
+
+
+TRIP_DETAILS_TEMPLATE = PromptTemplate("""User's Original Request: "{user_input}"
+
+Trip Details:
+- Destination: {destination}
+- Duration: {duration}
+- Budget: {budget}
+- Total Estimated Cost: ${total_cost}
+- Interests: {interests}
+- Hotel: {hotel}
+- Activities planned: {activities}""")
+
+
+def system_blocks(text: str = SUMMARY_SYSTEM_PROMPT, cache: bool = True) -> List[Dict[str, Any]]:
+    """System prompt content blocks, with a cache checkpoint after the static prefix"""
+    block = {"type": "text", "text": text}
+    if cache:
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Claude token count (about 4 characters per token)"""
+    return math.ceil(len(text) / 4)
+
+
+def caching_minimum(model_id: str) -> Optional[int]:
+    """Minimum cacheable prefix tokens for model_id, or None if it is not known to support prompt caching"""
+    for fragment, minimum in PROMPT_CACHING_MODELS.items():
+        if fragment in model_id:  # also matches cross-region ids such as us.anthropic...
+            return minimum
+    return None
+
+
+def use_prompt_caching(model_id: str, prefix: str = SUMMARY_SYSTEM_PROMPT, requested: bool = True) -> bool:
+    """Whether to mark prefix with cache_control: requested, supported by the model and long enough to cache"""
+    minimum = caching_minimum(model_id)
+    return requested and minimum is not None and estimate_tokens(prefix) >= minimum
+
+
+def _block_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+
+class StubBedrockRuntime:
+    """Local stand-in for the bedrock-runtime client that emulates Anthropic prompt caching
+
+    The cached prefix is everything up to the last cache_control block (system
+    blocks first, then messages). A prefix of at least min_cacheable_tokens is
+    written on first use and read back for ttl seconds; usage in each response
+    reports input_tokens, cache_creation_input_tokens and cache_read_input_tokens
+    like the real API. The reply text is a short canned summary;
+    invoke_model_with_response_stream returns it as Anthropic stream events.
+    """
+
+    def __init__(self, min_cacheable_tokens: int = MIN_CACHEABLE_TOKENS, ttl: float = CACHE_TTL_SECONDS):
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self.ttl = ttl
+        self._cache: Dict[str, float] = {}  # prefix hash -> expiry
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def invoke_model(self, modelId: str, body, **kwargs) -> Dict[str, Any]:
+        reply = self.reply(modelId, body)
+        return {"body": io.BytesIO(json.dumps(reply).encode("utf-8")), "contentType": "application/json"}
+
+    def invoke_model_with_response_stream(self, modelId: str, body, chunks: int = 8, **kwargs) -> Dict[str, Any]:
+        events = stream_events(self.reply(modelId, body), chunks)
+        return {"body": ({"chunk": {"bytes": json.dumps(event).encode("utf-8")}} for event in events),
+                "contentType": "application/json"}
+
+    def reply(self, modelId: str, body) -> Dict[str, Any]:
+        """Messages-API reply for a request body, with emulated cache usage"""
+        request = json.loads(body)
+        prefix, rest = self._split(request)
+        prefix_tokens = estimate_tokens(prefix)
+        usage = {
+            "input_tokens": estimate_tokens(rest),
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "output_tokens": 60,
+        }
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            key = hashlib.sha256(f"{modelId}\0{prefix}".encode("utf-8")).hexdigest()
+            if prefix and prefix_tokens >= self.min_cacheable_tokens:
+                if self._cache.get(key, 0) > now:
+                    usage["cache_read_input_tokens"] = prefix_tokens
+                else:
+                    usage["cache_creation_input_tokens"] = prefix_tokens
+                self._cache[key] = now + self.ttl  # each hit refreshes the TTL
+            else:
+                usage["input_tokens"] += prefix_tokens
+
+        text = "🎯 (stub) Your trip summary would appear here."
+        return {"type": "message", "role": "assistant",
+                "content": [{"type": "text", "text": text}], "usage": usage}
+
+    @staticmethod
+    def _split(request: Dict[str, Any]):
+        """(cached prefix text, remaining input text) at the last cache_control marker"""
+        blocks = []
+        system = request.get("system")
+        if isinstance(system, str):
+            blocks.append({"text": system})
+        elif system:
+            blocks.extend(system)
+        for message in request.get("messages", []):
+            content = message.get("content")
+            blocks.extend(content if isinstance(content, list) else [{"text": _block_text(content)}])
+        marked = [i for i, block in enumerate(blocks) if block.get("cache_control")]
+        cut = marked[-1] + 1 if marked else 0
+        return ("".join(b.get("text", "") for b in blocks[:cut]),
+                "".join(b.get("text", "") for b in blocks[cut:]))
+
+
+def stream_events(reply: Dict[str, Any], chunks: int) -> Iterator[Dict[str, Any]]:
+    """Anthropic messages-API stream events for a complete reply, with the text split into `chunks` deltas"""
+    text = "".join(block.get("text", "") for block in reply["content"])
+    usage = reply["usage"]
+    yield {"type": "message_start", "message": {"type": "message", "role": "assistant", "content": [],
+                                                "usage": dict(usage, output_tokens=1)}}
+    yield {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+    words = re.findall(r"\S+\s*", text) or [text]
+    size = max(1, math.ceil(len(words) / max(1, chunks)))
+    for start in range(0, len(words), size):
+        yield {"type": "content_block_delta", "index": 0,
+               "delta": {"type": "text_delta", "text": "".join(words[start:start + size])}}
+    yield {"type": "content_block_stop", "index": 0}
+    yield {"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+           "usage": {"output_tokens": usage.get("output_tokens", 0)}}
+    yield {"type": "message_stop"}
+
+
+class TokenUsage:
+    """Thread-safe running totals of Bedrock usage blocks"""
+
+    FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = dict.fromkeys(self.FIELDS, 0)
+        self._calls = 0
+
+    def record(self, usage: Optional[Dict[str, Any]]):
+        with self._lock:
+            self._calls += 1
+            for field in self.FIELDS:
+                self._totals[field] += (usage or {}).get(field) or 0
+
+    def report(self) -> Dict[str, Any]:
+        """Totals plus input tokens saved by cache reads, net of cache write surcharges"""
+        with self._lock:
+            report = dict(self._totals, calls=self._calls)
+        saved = (report["cache_read_input_tokens"] * (1 - CACHE_READ_PRICE_RATIO)
+                 - report["cache_creation_input_tokens"] * (CACHE_WRITE_PRICE_RATIO - 1))
+        report["input_tokens_saved"] = round(saved)
+        return report
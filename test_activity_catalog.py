@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed activity catalog
+"""
+
+from activity_catalog import ActivityCatalog, default_catalog
+
+ACTIVITIES = [
+    {"id": "a1", "name": "Old Town Tour", "destination": "Munich, Germany", "location": "Marienplatz",
+     "price": 25, "rating": 4.6, "tags": ["history", "walking tours"], "time_slots": ["10:00"]},
+    {"id": "a2", "name": "Beer Hall", "destination": "Munich, Germany", "location": "Platzl 9",
+     "price": 15, "rating": 4.4, "tags": ["beer", "food"], "time_slots": ["19:00"]},
+    {"id": "a3", "name": "Palace", "destination": "Munich, Germany", "location": "Nymphenburg",
+     "price": 20, "rating": 4.8, "tags": ["History", "architecture"], "time_slots": ["09:00"]},
+    {"id": "a4", "name": "Wall Memorial", "destination": "Berlin, Germany", "location": "Bernauer Str.",
+     "price": 0, "rating": 4.7, "tags": ["history"], "time_slots": ["10:00"]},
+]
+
+
+def names(results):
+    return [a["name"] for a in results]
+
+
+def test_search_by_interest_is_rating_ordered_and_per_destination():
+    catalog = ActivityCatalog(ACTIVITIES)
+    assert names(catalog.search("Munich, Germany", ["history"])) == ["Palace", "Old Town Tour"]
+    assert names(catalog.search("munich", ["HISTORY", "beer"])) == ["Palace", "Old Town Tour", "Beer Hall"]
+    assert names(catalog.search("Berlin", ["history", "beer"])) == ["Wall Memorial"]
+    assert catalog.search("Munich, Germany", ["surfing"]) == []
+
+
+def test_top_k_and_filters():
+    catalog = ActivityCatalog(ACTIVITIES)
+    assert names(catalog.search("Munich", ["history", "beer", "food"], k=2)) == ["Palace", "Old Town Tour"]
+    assert names(catalog.search("Munich", ["history", "beer"], max_price=20)) == ["Palace", "Beer Hall"]
+    assert names(catalog.search("Munich", ["history", "beer"], min_rating=4.5)) == ["Palace", "Old Town Tour"]
+    # No interests: best rated at the destination, optionally within a price cap
+    assert names(catalog.search("Munich")) == ["Palace", "Old Town Tour", "Beer Hall"]
+    assert names(catalog.search("Munich", max_price=16)) == ["Beer Hall"]
+
+
+def test_load_csv(tmp_path):
+    path = tmp_path / "activities.csv"
+    path.write_text(
+        "id,name,destination,location,price,rating,tags,time_slots\n"
+        "c1,Canal Cruise,\"Amsterdam, Netherlands\",Centrum,18,4.5,canals;family,10:00;13:00\n"
+        "c2,Rijksmuseum,\"Amsterdam, Netherlands\",Museumstraat 1,22.5,4.8,museums;art,09:00\n",
+        encoding="utf-8",
+    )
+    catalog = ActivityCatalog.load(str(path))
+    assert len(catalog) == 2
+    cruise = catalog.get("c1")
+    assert cruise["price"] == 18 and cruise["rating"] == 4.5
+    assert cruise["tags"] == ["canals", "family"] and cruise["time_slots"] == ["10:00", "13:00"]
+    assert names(catalog.search("Amsterdam", ["art", "family"])) == ["Rijksmuseum", "Canal Cruise"]
+
+
+def test_default_dataset_keeps_munich_activities():
+    catalog = default_catalog()
+    beer = names(catalog.search("Munich, Germany", ["beer", "Oktoberfest"]))
+    assert "Hofbräu Beer Garden" in beer
+    assert "Marienplatz Historical Tour" in names(catalog.search("Munich, Germany", ["history"]))
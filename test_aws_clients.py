@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared bedrock-runtime client factory
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from aws_clients import get_bedrock_runtime_client, reset_clients
+
+STUB_TEXT = "🎯 (stub) Your trip summary would appear here."
+
+
+def invoke(client):
+    response = client.invoke_model(modelId="anthropic.claude-3-5-sonnet-20240620-v1:0", body=b"{}")
+    return json.loads(response["body"].read())["content"][0]["text"]
+
+
+def test_client_is_shared_and_configured():
+    reset_clients()
+    client = get_bedrock_runtime_client(max_pool_connections=32, read_timeout=12)
+    assert get_bedrock_runtime_client(max_pool_connections=32, read_timeout=12) is client
+    assert get_bedrock_runtime_client(max_pool_connections=8) is not client
+
+    config = client.meta.config
+    assert config.max_pool_connections == 32
+    assert config.read_timeout == 12
+    assert config.retries["mode"] == "adaptive"
+    assert config.tcp_keepalive is True
+    reset_clients()
+
+
+def test_sequential_calls_reuse_one_connection(fake_bedrock_server):
+    client = get_bedrock_runtime_client(endpoint_url=fake_bedrock_server.endpoint_url)
+
+    for _ in range(10):
+        assert invoke(client) == STUB_TEXT
+
+    stats = fake_bedrock_server.stats()
+    assert (stats["calls"], stats["connections"]) == (10, 1)
+
+
+def test_concurrent_calls_bounded_by_pool(fake_bedrock_server):
+    client = get_bedrock_runtime_client(endpoint_url=fake_bedrock_server.endpoint_url, max_pool_connections=4)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: invoke(client), range(40)))
+
+    assert results == [STUB_TEXT] * 40
+    stats = fake_bedrock_server.stats()
+    assert stats["calls"] == 40
+    assert stats["connections"] <= 4
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch trip planner
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import batch_planner
+from batch_planner import checkpoint_path, run_batch
+from travel_orchestrator import plan_cache
+
+PROMPTS = [
+    {"id": "oktoberfest", "prompt": "Plan a 3-day trip to Munich for Oktoberfest"},
+    {"id": "history", "prompt": "Plan a 3-day trip to Munich for history"},
+    {"id": "oktoberfest-again", "prompt": "plan a 3-day trip to munich for oktoberfest"},
+    "Plan a 3-day trip to Munich for food",
+    {"id": "broken"},
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_plan_cache():
+    plan_cache.clear()
+    yield
+    plan_cache.clear()
+
+
+@pytest.fixture
+def fake_handler(monkeypatch):
+    """Replace the orchestrator with a recorder; delays make later lines finish first"""
+    calls = []
+
+    async def handler(payload):
+        calls.append(payload["prompt"])
+        await asyncio.sleep(0.05 if "Oktoberfest" in payload["prompt"] else 0.01)
+        return {"status": "success", "destination": payload["trip_request"]["destination"],
+                "interests": payload["trip_request"]["interests"]}
+
+    monkeypatch.setattr(batch_planner, "ainvoke_handler", handler)
+    return calls
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    return str(path)
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_ordered_output_with_dedup(tmp_path, fake_handler):
+    input_path = write_jsonl(tmp_path / "prompts.jsonl", PROMPTS)
+    output_path = str(tmp_path / "plans.jsonl")
+
+    stats = asyncio.run(run_batch(input_path, output_path, concurrency=4))
+
+    results = read_jsonl(output_path)
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert [r.get("id") for r in results] == ["oktoberfest", "history", "oktoberfest-again", None, "broken"]
+    assert results[2]["response"] == results[0]["response"]
+    assert "error" in results[4]["response"]
+    assert len(fake_handler) == 3
+    assert (stats["planned"], stats["deduplicated"], stats["errors"]) == (3, 1, 1)
+    with open(checkpoint_path(output_path)) as f:
+        assert json.load(f)["next_index"] == 5
+
+
+def test_finished_plans_are_released(tmp_path, fake_handler, monkeypatch):
+    monkeypatch.setattr(batch_planner, "WINDOW_PER_SLOT", 1)  # one line in flight at a time
+    input_path = write_jsonl(tmp_path / "prompts.jsonl", [PROMPTS[0], PROMPTS[1], PROMPTS[2]])
+    output_path = str(tmp_path / "plans.jsonl")
+
+    stats = asyncio.run(run_batch(input_path, output_path, concurrency=1, use_cache=False))
+
+    # The first Oktoberfest plan was written and dropped before its repeat was read
+    assert (stats["planned"], stats["deduplicated"]) == (3, 0)
+    results = read_jsonl(output_path)
+    assert results[2]["response"] == results[0]["response"]
+
+
+def test_unordered_output_streams_as_finished(tmp_path, fake_handler):
+    input_path = write_jsonl(tmp_path / "prompts.jsonl", PROMPTS[:4])
+    output_path = str(tmp_path / "plans.jsonl")
+
+    asyncio.run(run_batch(input_path, output_path, concurrency=4, ordered=False))
+
+    order = [r["index"] for r in read_jsonl(output_path)]
+    assert sorted(order) == [0, 1, 2, 3]
+    assert order.index(1) < order.index(0)  # the slow Oktoberfest plan lands last
+
+
+def test_resume_after_crash(tmp_path, fake_handler):
+    input_path = write_jsonl(tmp_path / "prompts.jsonl", PROMPTS)
+    output_path = str(tmp_path / "plans.jsonl")
+    asyncio.run(run_batch(input_path, output_path, concurrency=4))
+    full = read_jsonl(output_path)
+
+    # Simulate a crash: checkpoint after line 0, line 3 written out of order, line 1 cut mid-write
+    with open(input_path, "rb") as f:
+        first_line = len(f.readline())
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(full[0]) + "\n" + json.dumps(full[3]) + "\n" + json.dumps(full[1])[:20])
+    with open(checkpoint_path(output_path), "w") as f:
+        json.dump({"next_index": 1, "input_offset": first_line}, f)
+    fake_handler.clear()
+
+    stats = asyncio.run(run_batch(input_path, output_path, concurrency=4, resume=True))
+
+    results = read_jsonl(output_path)
+    assert sorted(r["index"] for r in results) == [0, 1, 2, 3, 4]
+    assert {r["index"]: r for r in results} == {r["index"]: r for r in full}
+    assert sorted(fake_handler) == sorted([PROMPTS[1]["prompt"], PROMPTS[2]["prompt"]])
+    assert (stats["resumed_from"], stats["skipped"]) == (1, 1)
+
+
+def test_process_mode(tmp_path):
+    input_path = write_jsonl(tmp_path / "prompts.jsonl", PROMPTS[:3])
+    output_path = str(tmp_path / "plans.jsonl")
+
+    stats = asyncio.run(run_batch(input_path, output_path, mode="process", workers=2, use_cache=False))
+
+    results = read_jsonl(output_path)
+    assert [r["response"]["status"] for r in results] == ["success"] * 3
+    assert results[0]["response"]["trip_overview"]["destination"] == "Munich, Germany"
+    assert (stats["planned"], stats["deduplicated"]) == (2, 1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the Bedrock latency budget, hedging and circuit breaker, using a fault-injecting stub
+"""
+
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from bedrock_resilience import (
+    MIN_HEDGE_AFTER, BedrockGuard, CircuitBreaker, CircuitOpenError, LatencyBudgetExceeded, percentile,
+)
+from fake_bedrock import FaultInjectingBedrock
+from travel_orchestrator import TravelOrchestratorAgent
+from trip_models import Itinerary, TripRequest
+
+TRIP = ({"trip_plan": {
+    "request": TripRequest(destination="Munich, Germany", start_date="2024-10-01", end_date="2024-10-03",
+                           budget=800, interests=["history"]),
+    "itinerary": Itinerary(destination="Munich, Germany", duration="3 days", total_cost=700),
+    "accommodation": [{"name": "Munich City Hotel"}],
+    "activities": [{"name": "Marienplatz Historical Tour"}],
+}}, "Plan a 3-day trip to Munich")
+
+
+def slow_first_call(slow=0.5, fast=0.01):
+    delays = iter([slow])
+    return lambda: next(delays, fast)
+
+
+def invoke(stub):
+    return lambda: stub.invoke_model(modelId="m", body="{}")
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("BEDROCK_STUB", "1")
+    monkeypatch.setenv("SUMMARY_BATCH_SIZE", "1")
+    return TravelOrchestratorAgent()
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([], 95) == 0.0
+
+
+def test_hedged_request_answers_past_the_slow_threshold():
+    stub = FaultInjectingBedrock(latency=slow_first_call())
+    guard = BedrockGuard(latency_budget=2.0, hedge_after=0.05)
+
+    start = time.monotonic()
+    guard.call(invoke(stub))
+
+    assert time.monotonic() - start < 0.3
+    metrics = guard.metrics()
+    assert (metrics["hedged"], metrics["hedge_wins"], metrics["successes"]) == (1, 1, 1)
+    assert stub.calls == 2
+
+
+def test_fallback_mode_gives_up_at_the_slow_threshold(agent):
+    agent.bedrock_client = FaultInjectingBedrock(latency=0.5)
+    agent.bedrock_guard = BedrockGuard(slow_call_mode="fallback", hedge_after=0.05)
+
+    with pytest.raises(LatencyBudgetExceeded):
+        agent.bedrock_guard.call(invoke(agent.bedrock_client))
+
+    start = time.monotonic()
+    assert agent.generate_ai_summary(*TRIP) == agent.summary_fallback(TRIP[0])
+    assert time.monotonic() - start < 0.3
+    assert agent.bedrock_guard.metrics()["slow_fallbacks"] == 2
+
+
+def test_latency_budget_without_hedging():
+    guard = BedrockGuard(latency_budget=0.1, slow_call_mode="off")
+    with pytest.raises(LatencyBudgetExceeded):
+        guard.call(invoke(FaultInjectingBedrock(latency=0.5)))
+    assert guard.metrics()["budget_exceeded"] == 1
+
+
+def test_slow_threshold_tracks_recent_p95():
+    guard = BedrockGuard(hedge_after=5.0)
+    stub = FaultInjectingBedrock()
+    assert guard.slow_threshold() == 5.0
+    for _ in range(20):
+        guard.call(invoke(stub))
+    assert guard.slow_threshold() == MIN_HEDGE_AFTER
+
+
+def test_breaker_opens_on_errors_and_skips_bedrock(agent):
+    agent.bedrock_client = FaultInjectingBedrock(error_rate=1.0)
+    agent.bedrock_guard = BedrockGuard(breaker=CircuitBreaker(window=10, min_calls=4, error_rate=0.5, cooldown=0.2))
+
+    for _ in range(4):
+        with pytest.raises(ClientError):
+            agent.bedrock_guard.call(invoke(agent.bedrock_client))
+    assert agent.bedrock_guard.breaker.state == "open"
+
+    assert agent.generate_ai_summary(*TRIP) == agent.summary_fallback(TRIP[0])
+    assert list(agent.stream_ai_summary(*TRIP)) == [agent.summary_fallback(TRIP[0])]
+    with pytest.raises(CircuitOpenError):
+        agent.bedrock_guard.call(invoke(agent.bedrock_client))
+    assert agent.bedrock_client.calls == 4
+    assert agent.bedrock_guard.metrics()["short_circuited"] == 2
+
+
+def test_breaker_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker(window=10, min_calls=2, error_rate=0.5, cooldown=0.05)
+    guard = BedrockGuard(breaker=breaker)
+    failing = FaultInjectingBedrock(error_rate=1.0)
+    for _ in range(2):
+        with pytest.raises(ClientError):
+            guard.call(invoke(failing))
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    with pytest.raises(ClientError):
+        guard.call(invoke(failing))  # failed probe
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # one probe at a time
+    breaker.record(True)
+    assert breaker.state == "closed"
+    assert guard.metrics()["breaker_opened"] == 2
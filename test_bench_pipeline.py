@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipeline load-testing harness
+"""
+
+import argparse
+
+from bench_pipeline import regressions, run_target, trip_specs
+
+
+def test_trip_specs_mix_lengths():
+    specs = list(trip_specs(50, [2, 30], seed=1))
+    assert {spec["days"] for spec in specs} == {2, 30}
+    assert specs == list(trip_specs(50, [2, 30], seed=1))
+
+
+def test_run_target_reports_percentiles_and_rss():
+    args = argparse.Namespace(requests=6, warmup=1, days=[2, 3], seed=7, concurrency=2)
+    result = run_target("markdown", args)
+
+    assert (result["target"], result["requests"], result["errors"]) == ("markdown", 6, 0)
+    assert 0 < result["p50_ms"] <= result["p99_ms"] <= result["max_ms"]
+    assert result["ops_per_s"] > 0 and result["peak_rss_mb"] > 0
+
+
+def test_regressions_gate_each_metric():
+    baseline = {"results": [{"target": "http", "ops_per_s": 100, "p99_ms": 20, "peak_rss_mb": 50}]}
+    steady = [{"target": "http", "ops_per_s": 90, "p99_ms": 23, "peak_rss_mb": 55}]
+    worse = [{"target": "http", "ops_per_s": 70, "p99_ms": 30, "peak_rss_mb": 50},
+             {"target": "markdown", "ops_per_s": 1, "p99_ms": 1, "peak_rss_mb": 1}]
+
+    assert regressions(steady, baseline, 0.2) == []
+    assert regressions(worse, baseline, 0.2) == ["http ops_per_s: 100 -> 70 (-30%)", "http p99_ms: 20 -> 30 (+50%)"]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the budget-constrained bundle optimizer
+"""
+
+import itertools
+import random
+
+from bundle_optimizer import ActivityKnapsack, cheapest_bundle, optimize_bundles, prune_dominated
+from travel_orchestrator import orchestrator
+from trip_models import TripRequest
+
+
+def option(id, price, rating=0):
+    return {"id": id, "price": price, "rating": rating}
+
+
+def brute_force_scores(flights, hotels, activities, budget, travelers, nights, top_n, max_activities):
+    scores = []
+    for flight, hotel in itertools.product(flights, hotels):
+        fixed = flight["price"] * travelers + hotel["price"] * nights
+        if fixed > budget:
+            continue
+        best = 0
+        for k in range(max_activities + 1):
+            for chosen in itertools.combinations(activities, k):
+                if fixed + sum(a["price"] for a in chosen) * travelers <= budget:
+                    best = max(best, sum(a["rating"] for a in chosen))
+        scores.append(round(flight["rating"] + hotel["rating"] + best, 2))
+    return sorted(scores, reverse=True)[:top_n]
+
+
+def test_matches_brute_force():
+    rng = random.Random(3)
+    for _ in range(100):
+        flights = [option(f"f{i}", rng.randint(50, 300), rng.choice([0, 3.5, 4.5])) for i in range(rng.randint(1, 6))]
+        hotels = [option(f"h{i}", rng.randint(40, 150), round(rng.uniform(3, 5), 1)) for i in range(rng.randint(1, 6))]
+        activities = [option(f"a{i}", rng.randint(0, 40), round(rng.uniform(3, 5), 1)) for i in range(rng.randint(0, 6))]
+        args = dict(budget=rng.randint(150, 500), travelers=rng.randint(1, 3), nights=rng.randint(1, 3),
+                    top_n=rng.randint(1, 4), max_activities=rng.randint(1, 3))
+
+        bundles = optimize_bundles(flights, hotels, activities, **args)
+
+        assert [b["score"] for b in bundles] == brute_force_scores(flights, hotels, activities, **args)
+        for bundle in bundles:
+            assert bundle["total_cost"] <= args["budget"]
+            assert len(bundle["activities"]) <= args["max_activities"]
+
+
+def test_budget_scales_with_travelers_and_nights():
+    flights = [option("cheap", 100), option("pricey", 300, 4.0)]
+    hotels = [option("hostel", 30, 3.0), option("palace", 200, 5.0)]
+    # 2 travelers, 3 nights, $800: pricey flight (600) + hostel (90) is the only mix with a rated flight
+    bundles = optimize_bundles(flights, hotels, [], budget=800, travelers=2, nights=3, top_n=4)
+    assert [(b["flight"]["id"], b["hotel"]["id"], b["total_cost"]) for b in bundles] == [
+        ("pricey", "hostel", 690), ("cheap", "palace", 800), ("cheap", "hostel", 290)]
+    assert optimize_bundles(flights, hotels, [], budget=100, travelers=2, nights=3) == []
+    assert cheapest_bundle(flights, hotels, travelers=2, nights=3)["total_cost"] == 290
+
+
+def test_pruning_keeps_options_needed_for_top_n():
+    hotels = [option("a", 100, 4.0), option("b", 90, 4.5), option("c", 120, 3.9), option("d", 150, 4.8)]
+    assert [h["id"] for h in prune_dominated(hotels, 1)] == ["b", "d"]
+    assert [h["id"] for h in prune_dominated(hotels, 2)] == ["b", "a", "d"]
+
+
+def test_knapsack_respects_item_cap():
+    activities = [option("a", 10, 4.0), option("b", 10, 4.5), option("c", 50, 5.0), option("d", 0, 3.0)]
+    knapsack = ActivityKnapsack(activities, capacity=60, max_items=2)
+    assert knapsack.value(60) == 9.5
+    assert sorted(a["id"] for a in knapsack.select(60)) == ["b", "c"]
+    assert sorted(a["id"] for a in knapsack.select(20)) == ["a", "b"]
+    assert knapsack.value(-1) == float("-inf")
+
+
+def test_itinerary_uses_best_bundle(monkeypatch):
+    def many_options(request):
+        return {
+            "flights": [dict(option("flight_late", 250), arrival="18:00"), dict(option("flight_001", 300), arrival="13:00")],
+            "hotels": [option("hotel_cheap", 80, 3.2), option("hotel_good", 110, 4.6), option("hotel_lux", 400, 4.9)],
+        }
+    monkeypatch.setattr(orchestrator, "call_flights_hotels_agent", many_options)
+    request = TripRequest(destination="Munich, Germany", start_date="2024-10-01", end_date="2024-10-03",
+                          budget=1000, interests=["history"], travelers=1)
+
+    itinerary = orchestrator.call_itinerary_agent(
+        orchestrator.call_flights_hotels_agent(request), orchestrator.call_activities_agent(request), request)
+
+    assert (itinerary.flight.id, itinerary.hotel.id) == ("flight_late", "hotel_good")
+    assert itinerary.total_cost <= 1000
+    assert itinerary.bundles[0]["flight_id"] == "flight_late"
+    assert all(a.time >= "19:30" for a in itinerary.daily_plan[0].activities)
+
+
+def test_best_bundle_matches_the_daily_plan():
+    request = TripRequest(destination="Munich, Germany", start_date="2024-10-01", end_date="2024-10-03",
+                          budget=1300, interests=["history", "beer", "museums"], travelers=1)
+
+    itinerary = orchestrator.call_itinerary_agent(
+        orchestrator.call_flights_hotels_agent(request), orchestrator.call_activities_agent(request), request)
+
+    scheduled = [a for day in itinerary.daily_plan for a in day.activities]
+    best = itinerary.bundles[0]
+    assert scheduled and len(best["activity_ids"]) == len(scheduled)
+    assert best["total_cost"] == itinerary.total_cost <= 1300
+    assert (best["flight_id"], best["hotel_id"]) == (itinerary.flight.id, itinerary.hotel.id)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the local bedrock-runtime stand-in, through a real botocore client
+"""
+
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from aws_clients import get_bedrock_runtime_client
+from bedrock_resilience import BedrockGuard
+from fake_bedrock import latency_sampler
+from test_bedrock_resilience import TRIP
+from travel_orchestrator import TravelOrchestratorAgent
+
+BODY = json.dumps({"anthropic_version": "bedrock-2023-05-31", "max_tokens": 50,
+                   "messages": [{"role": "user", "content": "Plan a trip to Munich"}]})
+
+
+@pytest.fixture
+def fake(fake_bedrock_server):
+    fake_bedrock_server.chunks = 4
+    return fake_bedrock_server
+
+
+def single_attempt_client(server):
+    # adaptive retries would back off and rate-limit the client after each ThrottlingException
+    return boto3.client("bedrock-runtime", region_name="us-west-2", endpoint_url=server.endpoint_url,
+                        config=Config(retries={"mode": "standard", "total_max_attempts": 1}))
+
+
+def test_latency_specs():
+    sample = latency_sampler("sequence:0.1,2")
+    assert [sample(), sample(), sample()] == [0.1, 2.0, 0.1]
+    assert latency_sampler("0.25")() == 0.25
+    assert latency_sampler("lognormal:-1.5,0.5", seed=3)() == latency_sampler("lognormal:-1.5,0.5", seed=3)()
+    with pytest.raises(ValueError):
+        latency_sampler("gamma:1,2")
+    with pytest.raises(ValueError):
+        latency_sampler("uniform:0.1")
+
+
+def test_invoke_and_stream_through_botocore(fake):
+    fake.latency = latency_sampler("0.05")
+    bedrock = get_bedrock_runtime_client(endpoint_url=fake.endpoint_url)
+
+    start = time.monotonic()
+    reply = json.loads(bedrock.invoke_model(modelId="anthropic.claude-3-5-sonnet", body=BODY)["body"].read())
+    assert time.monotonic() - start >= 0.05
+    assert reply["content"][0]["text"].startswith("🎯 (stub)")
+
+    events = [json.loads(event["chunk"]["bytes"])
+              for event in bedrock.invoke_model_with_response_stream(modelId="m", body=BODY)["body"]]
+    assert events[0]["type"] == "message_start" and events[-1]["type"] == "message_stop"
+    text = "".join(e["delta"]["text"] for e in events if e["type"] == "content_block_delta")
+    assert text == reply["content"][0]["text"]
+
+    with urllib.request.urlopen(f"{fake.endpoint_url}/stats") as response:
+        stats = json.load(response)
+    assert (stats["calls"], stats["invocations"], stats["streams"], stats["throttled"]) == (2, 1, 1, 0)
+
+
+def test_throttling_is_surfaced_by_error_code(fake, monkeypatch):
+    fake.throttle_rate = 1.0
+    with pytest.raises(ClientError) as raised:
+        single_attempt_client(fake).invoke_model(modelId="m", body=BODY)
+    assert raised.value.response["Error"]["Code"] == "ThrottlingException"
+
+    monkeypatch.setenv("SUMMARY_BATCH_SIZE", "1")
+    agent = TravelOrchestratorAgent()
+    agent.bedrock_client = single_attempt_client(fake)
+    agent.bedrock_guard = BedrockGuard(latency_budget=5.0)
+    assert agent.generate_ai_summary(*TRIP) == agent.summary_fallback(TRIP[0])
+    assert "".join(agent.stream_ai_summary(*TRIP)) == agent.summary_fallback(TRIP[0])
+    assert agent.bedrock_guard.metrics()["errors"] == {"ThrottlingException": 2}
+
+
+def test_max_inflight_throttles_concurrent_calls(fake):
+    fake.max_inflight = 1
+    fake.latency = latency_sampler("sequence:0.3,0")
+    bedrock = single_attempt_client(fake)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        slow = executor.submit(bedrock.invoke_model, modelId="m", body=BODY)
+        time.sleep(0.1)
+        with pytest.raises(ClientError, match="ThrottlingException"):
+            bedrock.invoke_model(modelId="m", body=BODY)
+        slow.result()
+    assert fake.stats()["peak_inflight"] == 1
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental re-planning of follow-up turns
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+from incremental_planner import IncrementalPlanner, apply_changes, changed_fields, stages_to_rerun
+from stage_metrics import RequestTimer
+from travel_orchestrator import ainvoke_handler, invoke_handler, orchestrator, plan_cache, replanner, stream_handler
+from trip_models import TripModelError, TripRequest
+
+MUNICH = TripRequest(destination="Munich, Germany", start_date="2025-10-01", end_date="2025-10-03",
+                     budget=2000, interests=["history"], travelers=2)
+PROMPT = ("Plan a trip to Munich from 2025-10-01 to 2025-10-03 for 2 travelers, budget $2000, "
+          "interests: history")
+
+
+def counting_stages(calls):
+    def stage(name):
+        def run(*args):
+            calls[name] += 1
+            return (name, args[-1].budget)
+        return run
+    return {name: stage(name) for name in ("flights_hotels", "activities", "itinerary", "summary")}
+
+
+def test_stages_to_rerun_follow_the_dependency_graph():
+    def rerun(**changes):
+        return stages_to_rerun(changed_fields(MUNICH, apply_changes(MUNICH, changes)))
+
+    assert rerun(interests=["history", "beer"]) == ["activities", "itinerary", "summary"]
+    assert rerun(budget=3000) == ["itinerary", "summary"]
+    assert rerun(travelers=3) == ["flights_hotels", "itinerary", "summary"]
+    assert rerun(destination="Paris, France") == ["flights_hotels", "activities", "itinerary", "summary"]
+    assert rerun(interests=["History "], budget=2000.0) == []
+
+
+def test_planner_reuses_unaffected_outputs_per_session():
+    planner = IncrementalPlanner(max_sessions=1)
+    calls = Counter()
+    stages = counting_stages(calls)
+
+    planner.plan("s1", MUNICH, stages, RequestTimer())
+    outputs = planner.plan("s1", apply_changes(MUNICH, {"budget": 3000}), stages, RequestTimer())
+
+    assert calls == {"flights_hotels": 1, "activities": 1, "itinerary": 2, "summary": 2}
+    assert outputs["flights_hotels"] == ("flights_hotels", 2000) and outputs["summary"] == ("summary", 3000)
+    assert planner.previous("s1")[0].budget == 3000
+
+    planner.plan("s2", MUNICH, stages, RequestTimer())  # evicts s1
+    assert planner.previous("s1") is None
+    planner.plan(None, MUNICH, stages, RequestTimer())
+    stats = planner.stats()
+    assert (stats["sessions"], stats["evictions"], stats["stage_runs"]["flights_hotels"]) == (1, 1, 3)
+
+    with pytest.raises(TripModelError, match="changes.travelers"):
+        apply_changes(MUNICH, {"travelers": "two"})
+
+
+def test_new_prompt_reruns_only_the_summary():
+    planner = IncrementalPlanner()
+    calls = Counter()
+    stages = counting_stages(calls)
+
+    planner.plan("s1", MUNICH, stages, RequestTimer(), prompt=PROMPT)
+    planner.plan("s1", MUNICH, stages, RequestTimer(), prompt=PROMPT)
+    planner.plan("s1", MUNICH, stages, RequestTimer(), prompt=PROMPT + ", we love beer halls")
+
+    assert calls == {"flights_hotels": 1, "activities": 1, "itinerary": 1, "summary": 2}
+    assert stages_to_rerun({"prompt"}) == ["summary"]
+
+
+def test_follow_up_turn_matches_a_full_replan(monkeypatch):
+    monkeypatch.setattr(orchestrator, "generate_ai_summary", lambda data, user_input: "stub summary")
+    calls = Counter()
+    original = orchestrator.call_flights_hotels_agent
+
+    def counted(request):
+        calls["flights_hotels"] += 1
+        return original(request)
+    monkeypatch.setattr(orchestrator, "call_flights_hotels_agent", counted)
+    plan_cache.clear()
+
+    invoke_handler({"prompt": PROMPT, "session_id": "trip-42", "use_cache": False})
+    follow_up = invoke_handler({"session_id": "trip-42", "changes": {"interests": ["history", "beer"], "budget": 2600},
+                                "use_cache": False, "timings": True})
+    full = invoke_handler({"trip_request": {
+        "destination": "Munich, Germany", "start_date": "2025-10-01", "end_date": "2025-10-03", "budget": 2600,
+        "interests": ["history", "beer"], "travelers": 2}, "use_cache": False})
+
+    assert calls["flights_hotels"] == 2  # the first turn and the full replan, not the follow-up
+    assert "flights_hotels_ms" not in follow_up.pop("timings")
+    assert follow_up == full
+    replanner.forget("trip-42")
+
+
+def test_cached_answer_becomes_the_sessions_current_request(monkeypatch):
+    monkeypatch.setattr(orchestrator, "generate_ai_summary", lambda data, user_input: "stub summary")
+    plan_cache.clear()
+    invoke_handler({"prompt": PROMPT})  # cached, outside the session
+    invoke_handler({"prompt": PROMPT.replace("2000", "900"), "session_id": "trip-7"})
+    invoke_handler({"session_id": "trip-7", "changes": {"budget": 2000}})  # answered from the plan cache
+
+    response = invoke_handler({"session_id": "trip-7", "changes": {"travelers": 1}})
+    assert response["trip_overview"]["budget"] == "$2000" and response["trip_overview"]["travelers"] == 1
+    replanner.forget("trip-7")
+    plan_cache.clear()
+
+
+def test_changes_without_a_session_or_prompt_are_rejected(monkeypatch):
+    parsed = []
+    monkeypatch.setattr(orchestrator, "parse_trip_request", lambda user_input: parsed.append(user_input))
+
+    response = invoke_handler({"session_id": "expired", "changes": {"budget": 2600}, "prompt": ""})
+    events = list(stream_handler({"changes": {"budget": 2600}}))
+
+    assert "Unknown or expired session" in response["error"]
+    assert [name for name, _ in events] == ["error"]
+    assert parsed == []
+
+
+def test_async_and_stream_turns_continue_the_session(monkeypatch):
+    monkeypatch.setattr(orchestrator, "generate_ai_summary", lambda data, user_input: "stub summary")
+    monkeypatch.setattr(orchestrator, "stream_ai_summary", lambda data, user_input: iter(["stub summary"]))
+    plan_cache.clear()
+
+    asyncio.run(ainvoke_handler({"prompt": PROMPT, "session_id": "trip-9", "use_cache": False}))
+    events = list(stream_handler({"session_id": "trip-9", "changes": {"budget": 2600}, "use_cache": False}))
+    follow_up = invoke_handler({"session_id": "trip-9", "changes": {"budget": 2700}, "use_cache": False,
+                                "timings": True})
+
+    assert events[0][1]["budget"] == 2600 and events[-1][0] == "complete"
+    assert follow_up["trip_overview"]["budget"] == "$2700"
+    assert "flights_hotels_ms" not in follow_up["timings"]  # reused from the streamed turn
+    replanner.forget("trip-9")
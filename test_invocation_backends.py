@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the agent invocation backends used by travel_server.py
+"""
+
+import sys
+
+import pytest
+
+from invocation_backends import AgentInvocationError, SubprocessBackend, create_backend, parse_agent_output
+from stage_metrics import stage_metrics
+
+
+def test_parse_agent_output_direct_json():
+    assert parse_agent_output('{"status": "success"}') == {"status": "success"}
+
+
+def test_parse_agent_output_decorated():
+    output = '╭── travel_orchestrator ──╮\n│ Session: abc │\n╰──────╯\n\nResponse:\n{"status": "success", "nested": {"a": 1}}\n'
+    assert parse_agent_output(output) == {"status": "success", "nested": {"a": 1}}
+
+
+def test_parse_agent_output_no_json():
+    with pytest.raises(AgentInvocationError) as exc:
+        parse_agent_output("no json here")
+    assert exc.value.status_code == 500
+
+
+def test_subprocess_backend_fresh_process():
+    backend = SubprocessBackend(cmd=[sys.executable, '-c', 'import sys; print(sys.argv[1])'])
+    assert backend.invoke("hello") == {"prompt": "hello"}
+
+
+def test_subprocess_backend_missing_command():
+    backend = SubprocessBackend(cmd=['definitely-not-an-agentcore-binary'])
+    with pytest.raises(AgentInvocationError, match="not found"):
+        backend.invoke("hello")
+
+
+@pytest.mark.parametrize("name", ["inprocess", "pool"])
+def test_warm_backends_return_trip_plan(name):
+    kwargs = {"workers": 1} if name == "pool" else {}
+    backend = create_backend(name, **kwargs)
+    stage_metrics.clear()
+    try:
+        result = backend.invoke("Plan a 3-day trip to Munich", use_cache=False)
+        bedrock = backend.bedrock_metrics()
+    finally:
+        backend.close()
+    assert result["status"] == "success"
+    assert result["trip_overview"]["destination"] == "Munich, Germany"
+    assert "worker_metrics" not in result
+    # Stages run in a pool worker are recorded in this process too
+    assert {"parse", "flights_hotels", "itinerary", "summary", "total"} <= set(stage_metrics.snapshot())
+    assert bedrock["breaker_states" if name == "pool" else "breaker_state"] in ({"closed": 1}, "closed")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_backend("carrier-pigeon")
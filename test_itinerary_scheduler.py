@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the itinerary scheduling engine
+"""
+
+import gc
+import random
+import time
+from datetime import date, timedelta
+
+from itinerary_scheduler import schedule_itinerary, to_minutes
+
+TRIP = [date(2024, 10, 1), date(2024, 10, 2), date(2024, 10, 3)]  # Tuesday to Thursday
+
+
+def activity(id, rating, price=10, slots=("10:00", "14:00"), duration=60, **extra):
+    return dict({"id": id, "name": id, "location": id, "price": price, "rating": rating,
+                 "time_slots": list(slots), "duration_minutes": duration}, **extra)
+
+
+def scheduled_names(schedule):
+    return [[a["activity"] for a in day] for day in schedule]
+
+
+def test_no_repeats_and_spread_over_days():
+    schedule = schedule_itinerary([activity("a", 4.8), activity("b", 4.5), activity("c", 4.2)], TRIP)
+    assert scheduled_names(schedule) == [["a"], ["b"], ["c"]]
+    assert schedule[0][0] == {"time": "10:00", "end_time": "11:00", "activity": "a", "location": "a", "price": 10}
+
+
+def test_respects_opening_hours_by_weekday():
+    closed_tuesday = {"wed": "09:00-18:00", "thu": "09:00-18:00"}
+    evening_only = "18:00-23:00"
+    schedule = schedule_itinerary([
+        activity("museum", 4.9, opening_hours=closed_tuesday),
+        activity("opera", 4.8, slots=("10:00", "19:00"), duration=180, opening_hours=evening_only),
+    ], TRIP[:1] + TRIP[1:2])
+    assert scheduled_names(schedule) == [["opera"], ["museum"]]
+    assert schedule[0][0]["time"] == "19:00"
+
+
+def test_travel_time_between_locations():
+    # ~10 km apart: 10 min overhead + 40 min at 15 km/h, so a 60 min activity
+    # ending at 11:00 cannot be followed at 11:30 but can at 12:00
+    here = {"lat": 48.137, "lon": 11.575}
+    there = {"lat": 48.137 + 10 / 111.2, "lon": 11.575}
+    schedule = schedule_itinerary([
+        activity("first", 4.9, slots=("10:00",), **here),
+        activity("too_soon", 4.8, slots=("11:30",), **there),
+        activity("later", 4.7, slots=("12:00",), **there),
+    ], TRIP[:1])
+    assert scheduled_names(schedule) == [["first", "later"]]
+
+
+def test_arrival_day_starts_after_arrival():
+    schedule = schedule_itinerary([activity("a", 4.8, slots=("10:00", "14:00", "16:00"))],
+                                  TRIP[:1], first_day_start="13:00")
+    assert schedule[0][0]["time"] == "16:00"
+
+
+def test_budget_maximizes_total_rating():
+    # One expensive top pick versus three cheaper ones that together rate higher
+    activities = [
+        activity("gala", 5.0, price=90),
+        activity("tour", 4.4, price=30),
+        activity("market", 4.3, price=30),
+        activity("park", 4.1, price=0),
+    ]
+    schedule = schedule_itinerary(activities, TRIP, budget=60)
+    chosen = {a["activity"] for day in schedule for a in day}
+    assert chosen == {"tour", "market", "park"}
+    assert sum(a["price"] for day in schedule for a in day) <= 60
+    # Without a binding budget the best rated activities win
+    assert "gala" in {a["activity"] for day in schedule_itinerary(activities, TRIP, budget=500) for a in day}
+
+
+def test_week_with_hundreds_of_candidates_is_fast():
+    rng = random.Random(7)
+    candidates = [
+        activity(f"act_{i}", round(rng.uniform(3, 5), 1), price=rng.randint(0, 80),
+                 slots=rng.sample(["09:00", "10:00", "11:00", "13:00", "14:00", "16:00", "19:00"], 3),
+                 duration=rng.choice([45, 60, 90, 120, 180]),
+                 lat=48.1 + rng.random() / 10, lon=11.5 + rng.random() / 10,
+                 opening_hours=rng.choice([None, "09:00-18:00", {"tue": "10:00-20:00", "sat": "10:00-20:00"}]))
+        for i in range(500)
+    ]
+    week = [date(2024, 10, 1) + timedelta(days=i) for i in range(7)]
+
+    # Best of three, after a collection, so a full GC of the test process's heap isn't timed
+    gc.collect()
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        schedule = schedule_itinerary(candidates, week, budget=400)
+        timings.append(time.perf_counter() - start)
+
+    assert min(timings) < 0.1
+    names = [a["activity"] for day in schedule for a in day]
+    assert len(names) == len(set(names)) == 21
+    assert sum(a["price"] for day in schedule for a in day) <= 400
+    for day in schedule:
+        times = [(to_minutes(a["time"]), to_minutes(a["end_time"])) for a in day]
+        assert all(end <= next_start for (_, end), (next_start, _) in zip(times, times[1:]))
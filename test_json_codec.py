@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSON response encoder backends
+"""
+
+import importlib
+import json
+
+import pytest
+
+import json_codec
+from trip_fixtures import make_sample_plan
+
+
+@pytest.fixture
+def reload_codec(monkeypatch):
+    def load(backend):
+        monkeypatch.setenv("JSON_BACKEND", backend)
+        return importlib.reload(json_codec)
+
+    yield load
+    monkeypatch.delenv("JSON_BACKEND", raising=False)
+    importlib.reload(json_codec)
+
+
+@pytest.mark.parametrize("name", list(json_codec.available_backends()))
+def test_backends_emit_identical_utf8(name):
+    encode = json_codec.available_backends()[name]
+    plan = make_sample_plan(40)
+    plan["ids"] = {1: "flight_001"}
+
+    data = encode(plan)
+
+    assert data == json_codec.available_backends()["stdlib"](plan)
+    assert "Hofbräu München".encode("utf-8") in data
+    assert b"\\u00" not in data
+    assert data.startswith(b'{"request":{"destination":"Munich, Germany","dates":{')
+    assert json.loads(data) == json.loads(json.dumps(plan))
+
+
+@pytest.mark.parametrize("name", list(json_codec.available_backends()))
+def test_backends_differ_only_at_documented_edges(name):
+    encode = json_codec.available_backends()[name]
+    stdlib = json_codec.available_backends()["stdlib"]
+    plain = [0, -1, 2**63 - 1, 12.5, 0.1, 0.0001, -0.0, 1e15, 123456789.123, True, None]
+
+    assert encode(plain) == stdlib(plain)
+    for value in (1e16, 1e-7):
+        assert json.loads(encode(value)) == value
+    assert (stdlib(1e16), stdlib(1e-7)) == (b"1e+16", b"1e-07")
+    with pytest.raises(ValueError):
+        stdlib(float("nan"))
+    assert stdlib(2**64) == b"18446744073709551616"
+    if name != "stdlib":
+        assert encode([float("nan"), float("inf")]) == b"[null,null]"
+    if name == "orjson":
+        assert (encode(1e16), encode(1e-7)) == (b"1e16", b"1e-7")
+        with pytest.raises(TypeError):
+            encode(2**64)
+
+
+def test_backend_selection(reload_codec):
+    assert reload_codec("stdlib").BACKEND == "stdlib"
+    assert json_codec.dumps({"name": "Hofbräu München"}) == '{"name":"Hofbräu München"}'.encode("utf-8")
+    with pytest.raises(ValueError):
+        reload_codec("simdjson")
+
+
+def test_missing_backend_falls_back_to_stdlib(monkeypatch):
+    def not_installed():
+        raise ImportError("No module named 'msgspec'")
+
+    monkeypatch.setitem(json_codec._LOADERS, "msgspec", not_installed)
+    monkeypatch.setenv("JSON_BACKEND", "msgspec")
+    assert json_codec._select_backend()[0] == "stdlib"
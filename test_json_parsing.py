@@ -3,8 +3,7 @@
 Test script to verify JSON parsing from agentcore output
 """
 
-import json
-import re
+from json_extract import JSONExtractionError, StreamingJSONExtractor, extract_json
 
 # Sample agentcore output (from your logs)
 sample_output = """╭─────────────────────────────────────────────────────── travel_orchestrator ────────────────────────────────────────────────────────╮
@@ -24,31 +23,48 @@ Response:
 def test_json_parsing():
     print("🧪 Testing JSON parsing from agentcore output...")
     
-    # Method 1: Look for "Response:" followed by JSON
-    response_match = re.search(r'Response:\s*(\{.*\})', sample_output, re.DOTALL)
-    if response_match:
-        json_str = response_match.group(1).strip()
-        try:
-            response_data = json.loads(json_str)
-            print("✅ Successfully extracted JSON from agentcore response!")
-            print(f"📊 Status: {response_data.get('status')}")
-            print(f"📍 Destination: {response_data.get('trip_overview', {}).get('destination')}")
-            print(f"💰 Cost: {response_data.get('trip_overview', {}).get('estimated_cost')}")
-            
-            # Check if we have raw_data
-            if 'raw_data' in response_data:
-                print("✅ Found raw_data structure")
-                trip_plan = response_data['raw_data']['trip_plan']
-                print(f"🏨 Hotel: {trip_plan['accommodation'][0]['name']}")
-                print(f"✈️ Flight: {trip_plan['transportation'][0]['duration']}")
-            
-            return response_data
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing failed: {e}")
-            return None
-    else:
-        print("❌ Could not find Response: marker in output")
+    # Single pass: first complete top-level JSON object in the output
+    try:
+        response_data = extract_json(sample_output)
+    except JSONExtractionError as e:
+        print(f"❌ JSON parsing failed: {e}")
         return None
+    
+    print("✅ Successfully extracted JSON from agentcore response!")
+    print(f"📊 Status: {response_data.get('status')}")
+    print(f"📍 Destination: {response_data.get('trip_overview', {}).get('destination')}")
+    print(f"💰 Cost: {response_data.get('trip_overview', {}).get('estimated_cost')}")
+    
+    # Check if we have raw_data
+    if 'raw_data' in response_data:
+        print("✅ Found raw_data structure")
+        trip_plan = response_data['raw_data']['trip_plan']
+        print(f"🏨 Hotel: {trip_plan['accommodation'][0]['name']}")
+        print(f"✈️ Flight: {trip_plan['transportation'][0]['duration']}")
+    
+    return response_data
+
+def test_json_parsing_chunked():
+    print("🧪 Testing incremental JSON parsing of chunked agentcore output...")
+    expected = extract_json(sample_output)
+    
+    for chunk_size in (1, 7, 256):
+        extractor = StreamingJSONExtractor()
+        for i in range(0, len(sample_output), chunk_size):
+            extractor.feed(sample_output[i:i + chunk_size])
+        assert extractor.close() == expected
+    print("✅ Chunked parsing matches single-shot parsing")
+
+def test_json_parsing_edge_cases():
+    print("🧪 Testing JSON parsing edge cases...")
+    assert extract_json('noise {not json} Response: {"a": "}{", "b": {"c": 1}}') == {"a": "}{", "b": {"c": 1}}
+    assert extract_json('│ stray { brace │\nResponse:\n{"ok": true}') == {"ok": True}
+    try:
+        extract_json('╭── box ──╮\nResponse:\n{"status": "succ')
+    except JSONExtractionError:
+        print("✅ Truncated output rejected")
+    else:
+        raise AssertionError("truncated output should not parse")
 
 if __name__ == "__main__":
     result = test_json_parsing()
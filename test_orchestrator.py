@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for the travel orchestrator handler paths
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import travel_orchestrator
+from travel_orchestrator import orchestrator, invoke_handler, ainvoke_handler, stream_handler, plan_cache
+from trip_models import Itinerary
+
+
+@pytest.fixture(autouse=True)
+def empty_plan_cache():
+    plan_cache.clear()
+    yield
+    plan_cache.clear()
+
+
+def _stub_summary(monkeypatch):
+    monkeypatch.setattr(orchestrator, "generate_ai_summary", lambda data, user_input: "stub summary")
+
+
+def test_ainvoke_matches_sync_shape(monkeypatch):
+    _stub_summary(monkeypatch)
+    payload = {"prompt": "Plan a 3-day trip to Munich for Oktoberfest"}
+
+    sync_result = invoke_handler(payload)
+    async_result = asyncio.run(ainvoke_handler(payload))
+
+    assert async_result == sync_result
+    assert async_result["status"] == "success"
+
+
+def test_ainvoke_runs_sub_agents_concurrently(monkeypatch):
+    _stub_summary(monkeypatch)
+    flights = orchestrator.call_flights_hotels_agent
+    activities = orchestrator.call_activities_agent
+
+    def slow_flights(request):
+        time.sleep(0.2)
+        return flights(request)
+
+    def slow_activities(request):
+        time.sleep(0.2)
+        return activities(request)
+
+    monkeypatch.setattr(orchestrator, "call_flights_hotels_agent", slow_flights)
+    monkeypatch.setattr(orchestrator, "call_activities_agent", slow_activities)
+
+    start = time.perf_counter()
+    result = asyncio.run(ainvoke_handler({"prompt": "Plan a 3-day trip to Munich"}))
+    elapsed = time.perf_counter() - start
+
+    assert result["status"] == "success"
+    assert elapsed < 0.35
+
+
+def test_ainvoke_sub_agent_timeout(monkeypatch):
+    _stub_summary(monkeypatch)
+    itinerary_calls = []
+
+    def hanging_activities(request):
+        time.sleep(0.3)
+        return {"activities": []}
+
+    monkeypatch.setattr(orchestrator, "call_activities_agent", hanging_activities)
+    monkeypatch.setattr(orchestrator, "call_itinerary_agent", lambda *args: itinerary_calls.append(args))
+
+    result = asyncio.run(ainvoke_handler({"prompt": "Plan a 3-day trip to Munich"}, timeouts={"activities": 0.05}))
+
+    assert "activities agent timed out" in result["error"]
+    assert itinerary_calls == []
+
+
+def test_ainvoke_summary_failure_uses_fallback(monkeypatch):
+    def failing_summary(data, user_input):
+        raise RuntimeError("bedrock unavailable")
+
+    monkeypatch.setattr(orchestrator, "generate_ai_summary", failing_summary)
+    result = asyncio.run(ainvoke_handler({"prompt": "Plan a 3-day trip to Munich", "profile": "debug"}))
+
+    assert result["status"] == "success"
+    assert result["summary"] == travel_orchestrator.fallback_summary(Itinerary.from_dict(result["raw_data"]["trip_plan"]["itinerary"]))
+
+
+def test_repeat_request_served_from_cache(monkeypatch):
+    summaries = []
+    monkeypatch.setattr(orchestrator, "generate_ai_summary",
+                        lambda data, user_input: summaries.append(user_input) or "stub summary")
+
+    first = invoke_handler({"prompt": "Plan a 3-day trip to Munich"})
+    second = asyncio.run(ainvoke_handler({"prompt": "3 days in Munich please"}))
+    uncached = invoke_handler({"prompt": "Plan a 3-day trip to Munich", "use_cache": False})
+
+    assert first == second == uncached
+    assert summaries == ["Plan a 3-day trip to Munich", "Plan a 3-day trip to Munich"]
+
+
+class StreamingBedrockStub:
+    """Minimal bedrock-runtime client returning a canned response stream"""
+
+    def __init__(self, texts):
+        self.texts = texts
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        events = [{"chunk": {"bytes": json.dumps({"type": "message_start"}).encode()}}]
+        for text in self.texts:
+            delta = {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}}
+            events.append({"chunk": {"bytes": json.dumps(delta).encode()}})
+        events.append({"chunk": {"bytes": json.dumps({"type": "message_stop"}).encode()}})
+        return {"body": iter(events)}
+
+
+def test_stream_handler_emits_stages_in_order(monkeypatch):
+    monkeypatch.setattr(orchestrator, "bedrock_client", StreamingBedrockStub(["Prost ", "to Munich!"]))
+    _stub_summary(monkeypatch)
+
+    events = list(stream_handler({"prompt": "Plan a 3-day trip to Munich"}))
+    names = [name for name, _ in events]
+
+    assert names[0] == "request"
+    assert sorted(names[1:3]) == ["activities", "flights_hotels"]
+    assert names[3:] == ["itinerary", "summary", "summary", "complete"]
+    complete = events[-1][1]
+    assert complete["summary"] == "Prost to Munich!"
+    assert {k: v for k, v in complete.items() if k != "summary"} == \
+        {k: v for k, v in invoke_handler({"prompt": "Plan a 3-day trip to Munich", "use_cache": False}).items() if k != "summary"}
+
+
+def test_stream_handler_summary_fallback(monkeypatch):
+    class FailingBedrock:
+        def invoke_model_with_response_stream(self, modelId, body):
+            raise RuntimeError("throttled")
+
+    monkeypatch.setattr(orchestrator, "bedrock_client", FailingBedrock())
+    events = list(stream_handler({"prompt": "Plan a 3-day trip to Munich"}))
+    summary_events = [data for name, data in events if name == "summary"]
+
+    assert len(summary_events) == 1
+    assert events[-1][0] == "complete"
+    assert events[-1][1]["summary"] == summary_events[0]["text"]
+
+
+def test_response_profiles(monkeypatch):
+    _stub_summary(monkeypatch)
+    prompt = "Plan a 3-day trip to Munich"
+
+    standard = invoke_handler({"prompt": prompt})
+    debug = invoke_handler({"prompt": prompt, "profile": "debug"})
+    minimal = invoke_handler({"prompt": prompt, "profile": "minimal"})
+
+    assert "raw_data" not in standard
+    assert debug == dict(standard, raw_data=debug["raw_data"])
+    assert debug["raw_data"]["trip_plan"]["request"]["destination"] == "Munich, Germany"
+    assert set(minimal) == {"status", "summary", "trip_overview", "daily_schedule"}
+    assert len(json.dumps(standard)) < len(json.dumps(debug)) / 1.5
+
+    error = invoke_handler({"prompt": prompt, "profile": "verbose"})
+    assert "Unknown response profile 'verbose'" in error["error"]
+
+
+def test_import_is_lazy():
+    check = ("import sys, travel_orchestrator as t; "
+             "print(sorted(m for m in ('boto3', 'botocore', 'asyncio') if m in sys.modules), t.orchestrator._bedrock_client)")
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True,
+                            env={**os.environ, "BEDROCK_STUB": ""})
+    assert result.stdout.strip().splitlines()[-1] == "[] None"
+
+
+def test_bedrock_client_created_on_first_use(monkeypatch):
+    monkeypatch.delenv("BEDROCK_STUB", raising=False)
+    agent = travel_orchestrator.TravelOrchestratorAgent()
+    created = []
+    monkeypatch.setattr(travel_orchestrator, "get_bedrock_runtime_client",
+                        lambda region_name: created.append(region_name) or "client")
+    assert agent._bedrock_client is None
+    assert agent.bedrock_client == "client"
+    assert agent.bedrock_client == "client"
+    assert created == ["us-west-2"]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for per-stage latency histograms and the response timings block
+"""
+
+import asyncio
+
+import pytest
+
+from stage_metrics import LatencyHistogram, RequestTimer, StageMetrics, WorkerMetrics, bedrock_prometheus, stage_metrics
+from travel_orchestrator import ainvoke_handler, invoke_handler, orchestrator, plan_cache, stream_handler
+
+PIPELINE_STAGES = {"parse_ms", "flights_hotels_ms", "activities_ms", "itinerary_ms", "summary_ms", "total_ms"}
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    monkeypatch.setattr(orchestrator, "generate_ai_summary", lambda data, user_input: "stub summary")
+    monkeypatch.setattr(orchestrator, "stream_ai_summary", lambda data, user_input: iter(["stub ", "summary"]))
+    plan_cache.clear()
+    stage_metrics.clear()
+    yield
+    plan_cache.clear()
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = LatencyHistogram(buckets=(0.01, 0.1, 1))
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+    assert histogram.counts == [10, 90, 0, 0]
+    assert histogram.count == 100
+    assert histogram.quantiles() == {"p50": 0.05, "p95": 0.095, "p99": 0.099}
+
+
+def test_prometheus_exposition():
+    metrics = StageMetrics()
+    timer = RequestTimer(metrics)
+    with timer.stage("itinerary"):
+        pass
+    timer.record("parse", 0.003)
+    timings = timer.finish()
+
+    text = metrics.prometheus()
+    assert set(timings) == {"parse_ms", "itinerary_ms", "total_ms"}
+    assert text.index('stage="parse"') < text.index('stage="itinerary"') < text.index('stage="total"')
+    assert "# TYPE travel_stage_duration_seconds histogram" in text
+    assert 'travel_stage_duration_seconds_bucket{stage="parse",le="0.001"} 0' in text
+    assert 'travel_stage_duration_seconds_bucket{stage="parse",le="0.005"} 1' in text
+    assert 'travel_stage_duration_seconds_bucket{stage="parse",le="+Inf"} 1' in text
+    assert 'travel_stage_duration_seconds_count{stage="parse"} 1' in text
+    assert 'travel_stage_duration_quantile_seconds{stage="parse",quantile="0.95"} 0.003000' in text
+    assert text.endswith("\n")
+
+
+def test_timings_block_is_opt_in():
+    assert "timings" not in invoke_handler({"prompt": "Plan a 3-day trip to Munich"})
+
+    response = invoke_handler({"prompt": "Plan a 3-day trip to Vienna", "timings": True})
+    assert set(response["timings"]) == PIPELINE_STAGES
+    assert all(value >= 0 for value in response["timings"].values())
+
+    snapshot = stage_metrics.snapshot()
+    assert snapshot["itinerary"]["count"] == 2
+    assert set(snapshot["summary"]) == {"count", "sum_s", "p50_s", "p95_s", "p99_s"}
+
+
+def test_cached_response_timings_and_no_timings_in_cache():
+    invoke_handler({"prompt": "Plan a 3-day trip to Munich", "timings": True})
+    cached = invoke_handler({"prompt": "Plan a 3-day trip to Munich", "timings": True})
+    assert set(cached["timings"]) == {"parse_ms", "total_ms"}
+
+
+def test_async_and_stream_handlers_report_timings():
+    response = asyncio.run(ainvoke_handler({"prompt": "Plan a 3-day trip to Rome", "timings": True}))
+    assert set(response["timings"]) == PIPELINE_STAGES
+
+    events = list(stream_handler({"prompt": "Plan a 3-day trip to Paris", "timings": True}))
+    event, response = events[-1]
+    assert event == "complete"
+    assert set(response["timings"]) == PIPELINE_STAGES
+
+
+def test_worker_reports_feed_the_server_registry():
+    response = invoke_handler({"prompt": "Plan a 3-day trip to Munich", "worker_metrics": True})
+    report = response["worker_metrics"]
+    assert {"parse", "flights_hotels", "summary", "total"} <= set(report["stages"])
+    assert report["bedrock"]["breaker_state"] == "closed"
+
+    metrics = StageMetrics()
+    workers = WorkerMetrics(metrics, max_processes=2)
+    bedrock = {"calls": 3, "failures": 1, "errors": {"ThrottlingException": 1}, "breaker_state": "closed"}
+    workers.record({"process": "a", "stages": {"summary": 0.2}, "bedrock": bedrock})
+    workers.record({"process": "a", "stages": {"summary": 0.3}, "bedrock": dict(bedrock, calls=4)})
+    workers.record({"process": "b", "stages": {}, "bedrock": dict(bedrock, breaker_state="open")})
+    workers.record({"process": "c", "stages": {}, "bedrock": bedrock})  # retires "a"
+    workers.record(True)
+
+    assert metrics.snapshot()["summary"]["count"] == 2
+    totals = workers.bedrock()
+    assert (totals["calls"], totals["failures"]) == (10, 3)
+    assert totals["errors"] == {"ThrottlingException": 3}
+    assert totals["breaker_states"] == {"open": 1, "closed": 1}
+
+    text = bedrock_prometheus(totals)
+    assert "travel_bedrock_calls_total 10" in text
+    assert 'travel_bedrock_errors_total{code="ThrottlingException"} 3' in text
+    assert 'travel_bedrock_breaker_state{state="open"} 1' in text
+    assert "travel_bedrock_latency_p95_seconds" in bedrock_prometheus(orchestrator.bedrock_guard.metrics())
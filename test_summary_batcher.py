@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for micro-batched trip summaries against the fake bedrock-runtime server
+"""
+
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from summary_batcher import SummaryBatcher, split_summaries
+from summary_prompt import StubBedrockRuntime
+from travel_orchestrator import TravelOrchestratorAgent
+from trip_models import Itinerary, TripRequest
+
+
+class SummaryRuntime(StubBedrockRuntime):
+    """Replies with one summary per "- Destination:" line and records every prompt"""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+        self.malformed = False
+
+    def reply(self, modelId, body):
+        prompt = json.loads(body)["messages"][0]["content"]
+        destinations = re.findall(r"- Destination: (.+)", prompt)
+        with self._lock:
+            self.prompts.append(prompt)
+        if "=== Trip" not in prompt:
+            text = f"Summary for {destinations[0]}"
+        elif self.malformed:
+            text = "Here are your summaries: 1) ..."
+        else:
+            text = json.dumps({"summaries": [f"Summary for {d}" for d in destinations]})
+        reply = super().reply(modelId, body)
+        reply["content"] = [{"type": "text", "text": text}]
+        return reply
+
+
+@pytest.fixture
+def bedrock_stub(fake_bedrock_server):
+    fake_bedrock_server.runtime = SummaryRuntime()
+    return fake_bedrock_server.runtime
+
+
+def trip(destination):
+    return {"trip_plan": {
+        "request": TripRequest(destination=destination, start_date="2024-10-01", end_date="2024-10-03",
+                               budget=800, interests=["history"]),
+        "itinerary": Itinerary(destination=destination, duration="3 days", total_cost=700),
+        "accommodation": [{"name": "City Hotel"}],
+        "activities": [{"name": "Old Town Tour"}],
+    }}, f"Plan a trip to {destination}"
+
+
+CITIES = ["Munich", "Berlin", "Vienna", "Paris", "Rome", "London"]
+
+
+def test_concurrent_requests_share_one_call(bedrock_stub):
+    agent = TravelOrchestratorAgent()
+    batcher = SummaryBatcher(agent, max_batch_size=8, max_wait=0.5)
+    start = threading.Barrier(len(CITIES))
+
+    def summarize(city):
+        start.wait()
+        return batcher.summarize(*trip(city))
+
+    with ThreadPoolExecutor(max_workers=len(CITIES)) as executor:
+        summaries = list(executor.map(summarize, CITIES))
+    batcher.close()
+
+    assert summaries == [f"Summary for {city}" for city in CITIES]
+    assert len(bedrock_stub.prompts) == 1
+    assert batcher.stats()["requests_per_call"] == len(CITIES)
+
+
+def test_summarize_many_packs_batches(bedrock_stub):
+    batcher = SummaryBatcher(TravelOrchestratorAgent(), max_batch_size=4)
+    items = [trip(f"{city} {i}") for i in range(2) for city in CITIES[:5]]
+
+    summaries = batcher.summarize_many(items)
+
+    assert summaries == [f"Summary for {data['trip_plan']['request'].destination}" for data, _ in items]
+    assert len(bedrock_stub.prompts) == 3
+
+
+def test_unsplittable_reply_falls_back_to_single_calls(bedrock_stub):
+    bedrock_stub.malformed = True
+    batcher = SummaryBatcher(TravelOrchestratorAgent(), max_batch_size=4)
+
+    assert batcher.summarize_many([trip(c) for c in CITIES[:3]]) == [f"Summary for {c}" for c in CITIES[:3]]
+    assert len(bedrock_stub.prompts) == 4
+    assert batcher.stats()["split_failures"] == 1
+
+
+def test_agent_routes_summaries_through_batcher(bedrock_stub):
+    agent = TravelOrchestratorAgent()
+    agent.enable_summary_batching(max_batch_size=4, max_wait=0.01)
+
+    assert agent.generate_ai_summary(*trip("Munich")) == "Summary for Munich"
+    # A lone request is sent with the regular single-trip prompt
+    assert bedrock_stub.prompts[0] == agent.build_summary_request(*trip("Munich"))["messages"][0]["content"]
+    agent.enable_summary_batching(max_batch_size=1)
+    assert agent.summary_batcher is None
+
+
+def test_split_summaries():
+    assert split_summaries('Sure!\n{"summaries": ["a", " b "]}', 2) == ["a", "b"]
+    assert split_summaries('{"summaries": ["a"]}', 2) is None
+    assert split_summaries('{"summaries": ["a", ""]}', 2) is None
+    assert split_summaries("no json", 1) is None
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the cacheable summary prompt and the local prompt-caching stub
+"""
+
+import io
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from summary_prompt import (
+    MIN_CACHEABLE_TOKENS, SUMMARY_SYSTEM_PROMPT, TRIP_DETAILS_TEMPLATE, PromptTemplate, StubBedrockRuntime,
+    TokenUsage, estimate_tokens, system_blocks, use_prompt_caching,
+)
+from travel_orchestrator import TravelOrchestratorAgent, orchestrator, stream_handler
+from trip_models import Hotel, Itinerary, TripRequest
+
+TRIP = ({"trip_plan": {
+    "request": TripRequest(destination="Munich, Germany", start_date="2024-10-01", end_date="2024-10-03",
+                           budget=800, interests=["history", "beer"]),
+    "itinerary": Itinerary(destination="Munich, Germany", duration="3 days", total_cost=700,
+                           hotel=Hotel(id="hotel_001", name="Munich City Hotel", price=120)),
+    "accommodation": [{"name": "Other Hotel"}],
+    "activities": [{"name": "Marienplatz Historical Tour"}, {"name": "Hofbräu Beer Garden"}],
+}}, "Plan a 3-day trip to Munich")
+
+
+def test_template_matches_str_format():
+    values = {field: f"<{field}>" for field in TRIP_DETAILS_TEMPLATE.fields}
+    assert TRIP_DETAILS_TEMPLATE.render(**values) == TRIP_DETAILS_TEMPLATE.text.format(**values)
+    with pytest.raises(ValueError):
+        PromptTemplate("{price:.2f}")
+
+
+def test_summary_request_has_static_system_prefix(monkeypatch):
+    monkeypatch.setenv("BEDROCK_STUB", "1")
+    agent = TravelOrchestratorAgent()
+
+    body = agent.build_summary_request(*TRIP)
+
+    assert body["system"] == [{"type": "text", "text": SUMMARY_SYSTEM_PROMPT}]
+    user = body["messages"][0]["content"]
+    assert "- Hotel: Munich City Hotel" in user
+    assert "- Activities planned: Marienplatz Historical Tour, Hofbräu Beer Garden" in user
+    assert system_blocks()[0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_prompt_caching_needs_supporting_model_and_long_prefix():
+    long_prefix = "x" * 4 * MIN_CACHEABLE_TOKENS
+    assert use_prompt_caching("anthropic.claude-3-7-sonnet-20250219-v1:0", long_prefix)
+    assert use_prompt_caching("us.anthropic.claude-sonnet-4-20250514-v1:0", long_prefix)
+    assert not use_prompt_caching("anthropic.claude-3-7-sonnet-20250219-v1:0", long_prefix, requested=False)
+    assert not use_prompt_caching("anthropic.claude-3-5-sonnet-20240620-v1:0", long_prefix)
+    assert not use_prompt_caching("anthropic.claude-3-5-haiku-20241022-v1:0", long_prefix)  # needs 2,048
+    assert not use_prompt_caching("anthropic.claude-3-7-sonnet-20250219-v1:0")  # instructions too short
+
+
+def test_stub_reports_cache_writes_reads_and_savings():
+    stub = StubBedrockRuntime(min_cacheable_tokens=10)
+    usage = TokenUsage()
+    body = {"system": [{"type": "text", "text": "x" * 400, "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": "y" * 40}]}
+
+    for _ in range(3):
+        reply = json.loads(stub.invoke_model(modelId="m", body=json.dumps(body))["body"].read())
+        usage.record(reply["usage"])
+
+    report = usage.report()
+    assert (report["calls"], report["input_tokens"]) == (3, 30)
+    assert report["cache_creation_input_tokens"] == 100
+    assert report["cache_read_input_tokens"] == 200
+    assert report["input_tokens_saved"] == round(200 * 0.9 - 100 * 0.25)
+
+
+def test_stub_does_not_cache_short_prefixes():
+    # Like Bedrock, prefixes under the model minimum are processed as normal input
+    stub = StubBedrockRuntime()
+    body = {"system": [{"type": "text", "text": SUMMARY_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": "hi"}]}
+    assert estimate_tokens(SUMMARY_SYSTEM_PROMPT) < MIN_CACHEABLE_TOKENS
+    for _ in range(2):
+        usage = json.loads(stub.invoke_model(modelId="m", body=json.dumps(body))["body"].read())["usage"]
+    assert usage["cache_read_input_tokens"] == 0
+    assert usage["input_tokens"] == estimate_tokens(SUMMARY_SYSTEM_PROMPT) + 1
+
+
+class NoCachingModel:
+    """Rejects cache_control the way models without prompt caching do"""
+
+    def __init__(self):
+        self.bodies = []
+
+    def invoke_model(self, modelId, body):
+        self.bodies.append(json.loads(body))
+        if "cache_control" in body:
+            raise ClientError({"Error": {"Code": "ValidationException", "Message": "cache_control not supported"}},
+                              "InvokeModel")
+        reply = {"content": [{"type": "text", "text": "Servus!"}], "usage": {"input_tokens": 200}}
+        return {"body": io.BytesIO(json.dumps(reply).encode())}
+
+
+def test_unsupported_model_never_gets_cache_control(monkeypatch):
+    monkeypatch.setenv("BEDROCK_STUB", "1")
+    monkeypatch.setenv("BEDROCK_PROMPT_CACHING", "true")
+    agent = TravelOrchestratorAgent()
+    agent.bedrock_client = NoCachingModel()
+
+    assert agent.generate_ai_summary(*TRIP) == "Servus!"
+    assert agent.generate_ai_summary(*TRIP) == "Servus!"
+
+    assert agent.prompt_caching is False
+    assert len(agent.bedrock_client.bodies) == 2  # no request is spent discovering support
+    assert agent.summary_usage.report()["input_tokens"] == 400
+
+
+def test_stub_streams_the_summary(monkeypatch):
+    monkeypatch.setenv("BEDROCK_STUB", "1")
+    monkeypatch.setattr(orchestrator, "bedrock_client", StubBedrockRuntime())
+    monkeypatch.setattr(orchestrator, "bedrock_guard", TravelOrchestratorAgent().bedrock_guard)
+
+    events = list(stream_handler({"prompt": "Plan a 3-day trip to Munich", "use_cache": False}))
+    chunks = [data["text"] for name, data in events if name == "summary"]
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == events[-1][1]["summary"] == "🎯 (stub) Your trip summary would appear here."
+    assert orchestrator.bedrock_guard.metrics()["errors"] == {}
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Tests for the travel planner HTTP server
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from travel_server import TravelPlannerHandler, TravelPlannerServer
+
+
+class SlowBackend:
+    name = "slow"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.release = threading.Event()
+
+    def invoke(self, prompt):
+        self.release.wait(self.delay)
+        return {"status": "success", "prompt": prompt}
+
+    def stream(self, prompt):
+        yield "request", {"destination": "Munich, Germany"}
+        yield "summary", {"text": "Hofbräu "}
+        yield "complete", self.invoke(prompt)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    servers = []
+
+    def start(backend, **kwargs):
+        monkeypatch.setattr(TravelPlannerHandler, "backend", backend)
+        monkeypatch.setattr(TravelPlannerHandler, "log_message", lambda *args: None)
+        httpd = TravelPlannerServer(('127.0.0.1', 0), TravelPlannerHandler, **kwargs)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.drain(timeout=5)
+        httpd.server_close()
+
+
+def post_plan(base_url, prompt="Plan a trip to Munich"):
+    request = urllib.request.Request(
+        base_url + "/api/generate-plan",
+        data=json.dumps({"prompt": prompt}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+
+def test_generate_plan(server):
+    _, base_url = server(SlowBackend())
+    status, _, body = post_plan(base_url, "Plan a trip to Vienna")
+    assert status == 200
+    assert body == {"status": "success", "prompt": "Plan a trip to Vienna"}
+
+
+def test_static_files_not_blocked_by_slow_agent(server):
+    backend = SlowBackend(delay=10)
+    _, base_url = server(backend, workers=4, max_inflight=2)
+    slow = threading.Thread(target=post_plan, args=(base_url,))
+    slow.start()
+    time.sleep(0.1)
+
+    start = time.perf_counter()
+    with urllib.request.urlopen(base_url + "/", timeout=5) as response:
+        assert response.status == 200
+    assert time.perf_counter() - start < 1.0
+
+    backend.release.set()
+    slow.join()
+
+
+def test_inflight_limit_returns_429(server):
+    backend = SlowBackend(delay=10)
+    _, base_url = server(backend, workers=4, max_inflight=1, retry_after=7)
+    slow = threading.Thread(target=post_plan, args=(base_url,))
+    slow.start()
+    time.sleep(0.1)
+
+    status, headers, body = post_plan(base_url)
+    assert status == 429
+    assert headers['Retry-After'] == '7'
+    assert 'error' in body
+
+    backend.release.set()
+    slow.join()
+    assert post_plan(base_url)[0] == 200
+
+
+def test_drain_waits_for_inflight_and_rejects_new_work(server):
+    backend = SlowBackend(delay=0.3)
+    httpd, base_url = server(backend, workers=4, max_inflight=2)
+    results = []
+    slow = threading.Thread(target=lambda: results.append(post_plan(base_url)))
+    slow.start()
+    time.sleep(0.1)
+
+    httpd.draining = True
+    status, headers, _ = post_plan(base_url)
+    assert status == 503
+    assert 'Retry-After' in headers
+
+    assert httpd.drain(timeout=5)
+    slow.join()
+    assert results[0][0] == 200
+
+
+def read_events(stream):
+    events = []
+    for block in stream.read().decode('utf-8').strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_generate_plan_stream_post(server):
+    _, base_url = server(SlowBackend())
+    request = urllib.request.Request(
+        base_url + "/api/generate-plan/stream",
+        data=json.dumps({"prompt": "Plan a trip"}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        assert response.headers['Content-Type'] == 'text/event-stream'
+        events = read_events(response)
+
+    assert [event for event, _ in events] == ["request", "summary", "complete"]
+    assert events[1][1] == {"text": "Hofbräu "}
+    assert events[-1][1]["prompt"] == "Plan a trip"
+
+
+def test_generate_plan_stream_get(server):
+    _, base_url = server(SlowBackend())
+    with urllib.request.urlopen(base_url + "/api/generate-plan/stream?prompt=Plan%20a%20trip", timeout=10) as response:
+        events = read_events(response)
+    assert events[-1] == ("complete", {"status": "success", "prompt": "Plan a trip"})
+
+
+def test_metrics_endpoint(server):
+    _, base_url = server(SlowBackend())
+    assert post_plan(base_url)[0] == 200
+
+    with urllib.request.urlopen(base_url + "/metrics", timeout=5) as response:
+        assert response.status == 200
+        assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+        text = response.read().decode('utf-8')
+    assert "# TYPE travel_stage_duration_seconds histogram" in text
+    assert 'travel_stage_duration_seconds_count{stage="serialize"}' in text
+    assert "travel_bedrock_calls_total" not in text  # SlowBackend has no Bedrock guard
+
+
+def test_metrics_endpoint_exports_bedrock_guard(server):
+    backend = SlowBackend()
+    backend.bedrock_metrics = lambda: {"calls": 5, "hedged": 2, "errors": {"ThrottlingException": 1},
+                                       "breaker_states": {"closed": 2}}
+    _, base_url = server(backend)
+
+    with urllib.request.urlopen(base_url + "/metrics", timeout=5) as response:
+        text = response.read().decode('utf-8')
+    assert "travel_bedrock_calls_total 5" in text and "travel_bedrock_hedged_total 2" in text
+    assert 'travel_bedrock_errors_total{code="ThrottlingException"} 1' in text
+    assert 'travel_bedrock_breaker_state{state="closed"} 2' in text
+
+
+class RecordingBackend(SlowBackend):
+    """Echoes a large plan and remembers the options each request was invoked with"""
+
+    def __init__(self):
+        super().__init__()
+        self.options = []
+
+    def invoke(self, prompt, **options):
+        self.options.append(options)
+        return {"status": "success", "summary": "Hofbräu München " * 200}
+
+
+def test_options_passed_to_backend_and_gzip_response(server):
+    import gzip
+
+    backend = RecordingBackend()
+    _, base_url = server(backend)
+    request = urllib.request.Request(
+        base_url + "/api/generate-plan",
+        data=json.dumps({"prompt": "Plan a trip to Munich", "profile": "debug", "timings": True}).encode('utf-8'),
+        headers={'Content-Type': 'application/json', 'Accept-Encoding': 'br;q=0, gzip'},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        assert response.headers['Content-Encoding'] == 'gzip'
+        raw = response.read()
+    body = gzip.decompress(raw)
+    assert json.loads(body)["summary"].startswith("Hofbräu München")
+    assert b'","' in body and b'", "' not in body  # compact separators
+    assert len(raw) < len(body) / 10
+    assert backend.options == [{"profile": "debug", "timings": True}]
+
+    status, headers, _ = post_plan(base_url)
+    assert status == 200 and 'Content-Encoding' not in headers
+    assert backend.options[-1] == {}
+
+
+def test_choose_encoding():
+    from travel_server import choose_encoding
+
+    assert choose_encoding(None) is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("deflate, gzip;q=0.5") == "gzip"
+    assert choose_encoding("*") in ("br", "gzip")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the trip plan response cache
+"""
+
+import time
+
+from trip_cache import TripPlanCache, trip_request_key
+
+REQUEST = {
+    "destination": "Munich, Germany",
+    "start_date": "2024-10-01",
+    "end_date": "2024-10-03",
+    "budget": 800,
+    "interests": ["history", "beer", "Oktoberfest"],
+    "travelers": 1
+}
+
+
+def test_key_ignores_formatting_differences():
+    variant = dict(REQUEST, destination="  munich,   GERMANY ", budget=800.0,
+                   interests=["Oktoberfest", "history", "beer", "history"])
+    assert trip_request_key(variant) == trip_request_key(REQUEST)
+    assert trip_request_key(dict(REQUEST, travelers=2)) != trip_request_key(REQUEST)
+
+
+def test_hit_miss_counters_and_copy_semantics():
+    cache = TripPlanCache()
+    assert cache.get(REQUEST) is None
+    cache.put(REQUEST, {"status": "success", "activities": ["Hofbräu München"]})
+
+    hit = cache.get(REQUEST)
+    hit["activities"].append("mutated")
+    assert cache.get(REQUEST) == {"status": "success", "activities": ["Hofbräu München"]}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_lru_eviction_by_entries():
+    cache = TripPlanCache(max_entries=2)
+    requests = [dict(REQUEST, travelers=n) for n in (1, 2, 3)]
+    cache.put(requests[0], {"n": 1})
+    cache.put(requests[1], {"n": 2})
+    cache.get(requests[0])
+    cache.put(requests[2], {"n": 3})
+
+    assert cache.get(requests[1]) is None
+    assert cache.get(requests[0]) == {"n": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_bound():
+    cache = TripPlanCache(max_bytes=100)
+    cache.put(dict(REQUEST, travelers=1), {"summary": "x" * 60})
+    cache.put(dict(REQUEST, travelers=2), {"summary": "y" * 60})
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] <= 100
+    cache.put(dict(REQUEST, travelers=3), {"summary": "z" * 500})
+    assert cache.get(dict(REQUEST, travelers=3)) is None
+
+
+def test_memory_bound_counts_utf8_bytes():
+    cache = TripPlanCache(max_bytes=100)
+    cache.put(REQUEST, {"summary": "ü" * 40})  # 40 characters, 80 bytes
+    assert cache.stats()["bytes"] > 80
+    cache.put(dict(REQUEST, travelers=2), {"summary": "€" * 40})  # 120 bytes on its own
+    assert cache.get(dict(REQUEST, travelers=2)) is None
+    assert cache.get(REQUEST) == {"summary": "ü" * 40}
+
+
+def test_ttl_expiry():
+    cache = TripPlanCache(ttl=0.05)
+    cache.put(REQUEST, {"status": "success"})
+    assert cache.get(REQUEST) is not None
+    time.sleep(0.06)
+    assert cache.get(REQUEST) is None
+
+
+def test_disk_backing_survives_restart(tmp_path):
+    TripPlanCache(cache_dir=str(tmp_path)).put(REQUEST, {"status": "success"})
+
+    restarted = TripPlanCache(cache_dir=str(tmp_path))
+    assert restarted.get(REQUEST) == {"status": "success"}
+    assert restarted.stats()["disk_hits"] == 1
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the typed trip plan model
+"""
+
+import json
+
+import pytest
+
+import json_codec
+from travel_orchestrator import invoke_handler, orchestrator
+from trip_fixtures import make_itinerary_dict
+from trip_models import Flight, Hotel, Itinerary, TripModelError, TripRequest, to_wire
+
+REQUEST = {"destination": "Munich, Germany", "start_date": "2024-10-01", "end_date": "2024-10-03",
+           "budget": 800, "interests": ["history", "beer"], "travelers": 2}
+
+
+def test_round_trip_keeps_wire_shape():
+    itinerary = make_itinerary_dict(3)
+    model = Itinerary.from_dict(itinerary)
+
+    assert model.flight.arrival == "13:00"
+    assert model.daily_plan[1].activities[0].activity == "Marienplatz Historical Tour #1"
+    assert to_wire(model) == itinerary
+    assert list(to_wire(model)) == list(itinerary)
+    assert to_wire(TripRequest.from_dict(REQUEST)) == REQUEST
+    assert not hasattr(model.daily_plan[0], "__dict__")
+
+
+def test_sub_agent_option_id_alias():
+    assert Flight.from_dict({"option_id": "FL001", "price": 450, "airline": "Lufthansa"}).id == "FL001"
+    assert Hotel.from_dict({"id": "hotel_001", "price": 120, "rating": 4.2}).name is None
+
+
+@pytest.mark.parametrize("change, message", [
+    ({"destination": " "}, "trip_request.destination must not be empty"),
+    ({"start_date": "October 1st"}, "trip_request.start_date must be a YYYY-MM-DD date"),
+    ({"end_date": "2024-09-30"}, "trip_request.end_date 2024-09-30 is before start_date"),
+    ({"budget": "lots"}, "trip_request.budget must be int or float, got str"),
+    ({"budget": -5}, "trip_request.budget must not be negative"),
+    ({"travelers": True}, "trip_request.travelers must be int, got bool"),
+    ({"interests": ["art", 3]}, "trip_request.interests[1] must be str"),
+])
+def test_trip_request_validation_names_the_field(change, message):
+    with pytest.raises(TripModelError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        TripRequest.from_dict(dict(REQUEST, **change))
+
+
+def test_nested_validation_path():
+    itinerary = make_itinerary_dict(2)
+    itinerary["daily_plan"][1]["activities"][2]["price"] = "free"
+    with pytest.raises(TripModelError, match=r"itinerary\.daily_plan\[1\]\.activities\[2\]\.price"):
+        Itinerary.from_dict(itinerary)
+
+
+@pytest.mark.parametrize("name", list(json_codec.available_backends()))
+def test_models_encode_like_their_dicts(name):
+    encode = json_codec.available_backends()[name]
+    itinerary = make_itinerary_dict(5)
+    model = {"itinerary": Itinerary.from_dict(itinerary)}
+    assert encode(model) == encode({"itinerary": itinerary})
+    with pytest.raises(TypeError):
+        encode({"value": object()})
+
+
+def test_handler_rejects_invalid_trip_request(monkeypatch):
+    monkeypatch.setattr(orchestrator, "generate_ai_summary", lambda data, user_input: "stub summary")
+    result = invoke_handler({"trip_request": dict(REQUEST, travelers=0), "use_cache": False})
+
+    assert "trip_request.travelers must be at least 1" in result["error"]
+    valid = invoke_handler({"trip_request": REQUEST, "use_cache": False, "profile": "debug"})
+    assert valid["status"] == "success"
+    assert json.loads(json.dumps(valid["raw_data"]))["trip_plan"]["request"] == REQUEST
+
+
+def test_handler_plans_without_a_budget(monkeypatch):
+    monkeypatch.setattr(orchestrator, "generate_ai_summary", lambda data, user_input: "stub summary")
+    request = {key: value for key, value in REQUEST.items() if key != "budget"}
+
+    result = invoke_handler({"trip_request": request, "use_cache": False})
+
+    assert result["status"] == "success"
+    assert "budget" not in result["trip_overview"] and "savings" not in result["trip_overview"]
+    assert result["trip_overview"]["estimated_cost"].startswith("$")
+    details = orchestrator.summary_trip_details({"trip_plan": {
+        "request": TripRequest.from_dict(request), "itinerary": Itinerary(destination="Munich", duration="3 days", total_cost=700),
+        "accommodation": [{"name": "Munich City Hotel"}], "activities": [],
+    }}, "Plan a trip to Munich")
+    assert "- Budget: not specified" in details
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the deterministic fast-path trip request parser
+"""
+
+from datetime import date
+
+from trip_parser import TripRequestParser, fast_parse
+
+TODAY = date(2026, 10, 18)
+
+
+def test_full_prompt():
+    result = fast_parse("Oktoberfest in Munich Sep 21-24 for 2 adults, budget 1200, beer, traditional food and history",
+                        today=TODAY)
+    assert result.request == {
+        "destination": "Munich, Germany",
+        "start_date": "2027-09-21",
+        "end_date": "2027-09-24",
+        "budget": 1200,
+        "interests": ["Oktoberfest", "beer", "food", "history"],
+        "travelers": 2,
+    }
+    assert result.confidence == 1.0
+
+
+def test_date_shapes():
+    assert fast_parse("Munich Oct 1-3, 2025", today=TODAY).request["start_date"] == "2025-10-01"
+    assert fast_parse("Munich 2025-03-10 to 2025-03-12", today=TODAY).request["end_date"] == "2025-03-12"
+    assert fast_parse("Copenhagen 28-30 September", today=TODAY).request["start_date"] == "2027-09-28"
+
+    request = fast_parse("Paris Dec 30 - Jan 2", today=TODAY).request
+    assert (request["start_date"], request["end_date"]) == ("2026-12-30", "2027-01-02")
+
+    request = fast_parse("Plan a 3-day trip to Munich", today=TODAY).request
+    assert (request["start_date"], request["end_date"]) == ("2026-11-01", "2026-11-03")
+    assert fast_parse("Venice, 7 nights", today=TODAY).request["end_date"] == "2026-11-08"
+    assert fast_parse("Tokyo for two weeks", today=TODAY).request["end_date"] == "2026-11-14"
+    assert fast_parse("Prague, 4 days in December", today=TODAY).request["start_date"] == "2026-12-01"
+
+
+def test_ranges_across_a_month_end():
+    for prompt, dates in [("Munich Oct 28-3", ("2026-10-28", "2026-11-03")),
+                          ("Rome 30-2 of March", ("2027-03-30", "2027-04-02")),
+                          ("Paris Dec 30-2", ("2026-12-30", "2027-01-02"))]:
+        result = fast_parse(prompt, today=TODAY)
+        assert (result.request["start_date"], result.request["end_date"]) == dates, prompt
+        assert "dates" in result.found and not result.rejected
+
+
+def test_inverted_range_goes_to_the_llm():
+    prompt = "Munich 2025-03-12 to 2025-03-10 with $800 for history"
+    result = fast_parse(prompt, today=TODAY)
+    assert "dates" not in result.found and result.rejected == ["dates"]
+    assert result.request["start_date"] <= result.request["end_date"]
+    assert result.confidence >= 0.6
+
+    parser = TripRequestParser(llm_parse=lambda text: {"start_date": "2025-03-10", "end_date": "2025-03-12"})
+    request = parser.parse(prompt, today=TODAY)
+    assert (request["start_date"], request["end_date"], request["budget"]) == ("2025-03-10", "2025-03-12", 800)
+    assert parser.stats()["llm_fallbacks"] == 1
+
+
+def test_budget_shapes():
+    for prompt, budget in [("Rome, $800", 800), ("Rome, 800 EUR", 800), ("Rome, €4,500", 4500),
+                           ("Rome, budget of 2500", 2500), ("Rome, 5k USD", 5000), ("Rome, £1000", 1000)]:
+        assert fast_parse(prompt, today=TODAY).request["budget"] == budget, prompt
+
+
+def test_travelers_shapes():
+    for prompt, travelers in [("London for 4 people", 4), ("Family of 5 to Rome", 5), ("Honeymoon in Venice", 2),
+                              ("Paris for 2 adults and 2 kids", 4), ("Lisbon for 2 weeks", 1)]:
+        assert fast_parse(prompt, today=TODAY).request["travelers"] == travelers, prompt
+
+
+def test_unknown_city_and_low_confidence():
+    assert fast_parse("Plan a trip to Kraków for 3 days", today=TODAY).request["destination"] == "Kraków"
+    assert fast_parse("Where should I go in October?", today=TODAY).confidence == 0.0
+
+
+def test_llm_fallback_only_below_threshold():
+    calls = []
+
+    def llm_parse(user_input):
+        calls.append(user_input)
+        return {"destination": "Lisbon, Portugal", "budget": "cheap", "interests": ["surfing"], "travelers": 2}
+
+    parser = TripRequestParser(llm_parse=llm_parse)
+    assert parser.parse("Plan a 3-day trip to Munich, $800", today=TODAY)["destination"] == "Munich, Germany"
+    fallback = parser.parse("Somewhere warm with surfing", today=TODAY)
+
+    assert calls == ["Somewhere warm with surfing"]
+    assert fallback["destination"] == "Lisbon, Portugal"
+    assert fallback["interests"] == ["surfing"]
+    assert fallback["budget"] == 800  # invalid LLM value ignored
+    assert parser.stats()["fast_path_hit_rate"] == 0.5
+
+
+def test_llm_failure_keeps_fast_path_result():
+    def llm_parse(user_input):
+        raise RuntimeError("no credentials")
+
+    parser = TripRequestParser(llm_parse=llm_parse)
+    assert parser.parse("Plan a trip", today=TODAY)["destination"] == "Munich, Germany"
+    assert parser.stats()["llm_failures"] == 1
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming trip plan renderer
+"""
+
+import io
+
+import pytest
+
+from local_testing import format_trip_plan_markdown
+from trip_fixtures import ByteSink, concat_markdown, make_local_plan
+from trip_renderer import iter_html, iter_markdown, iter_trip_plan, write_trip_plan
+
+
+def test_markdown_matches_the_concatenating_formatter():
+    plan = make_local_plan(days=3, options=4)
+    chunks = list(iter_markdown(plan))
+
+    assert "".join(chunks) == concat_markdown(plan) == format_trip_plan_markdown(plan)
+    assert len(chunks) == 1 + 4 + 1 + 4 + 1 + 3  # overview, flights, header, hotels, header, days
+
+
+def test_html_escapes_plan_values():
+    plan = make_local_plan(days=1, options=1)
+    plan["accommodation"][0]["name"] = "<script>alert(1)</script> & Spa"
+    plan["transportation"][0]["booking_link"] = "javascript:alert(1)"
+
+    page = "".join(iter_html(plan))
+    assert "&lt;script&gt;alert(1)&lt;/script&gt; &amp; Spa" in page and "<script>" not in page
+    assert '<a href="#">Book Now</a>' in page
+    assert page.startswith('<article class="trip-plan">') and page.endswith("</article>\n")
+    with pytest.raises(ValueError):
+        iter_trip_plan(plan, "pdf")
+
+
+def test_write_trip_plan_coalesces_chunks():
+    plan = make_local_plan(days=30, options=24)
+    sink = ByteSink()
+    written = write_trip_plan(plan, sink, encoding="utf-8", buffer_size=4096)
+
+    expected = format_trip_plan_markdown(plan).encode("utf-8")
+    assert written == sink.written == len(expected)
+    assert 1 < sink.writes < len(list(iter_markdown(plan)))
+
+    text = io.StringIO()
+    write_trip_plan(plan, text, "html")
+    assert text.getvalue() == "".join(iter_html(plan))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent user preference memory
+"""
+
+import sqlite3
+import time
+
+from user_memory import HISTORY_LIMIT, UserMemoryStore
+
+MUNICH = {"destination": "Munich, Germany", "budget": 800, "interests": ["history", "beer"]}
+PARIS = {"destination": "Paris, France", "budget": 1200, "interests": ["art", "history"]}
+
+
+def test_history_is_appended_and_lru_bounded():
+    store = UserMemoryStore(max_entries=2)
+    store.remember_trip("alice", MUNICH)
+    preferences = store.remember_trip("alice", PARIS)
+
+    assert preferences == {"budget": 1200, "interests": ["art", "history", "beer"],
+                           "last_destination": "Paris, France", "trips": 2}
+    assert [trip["destination"] for trip in store.history("alice")] == ["Munich, Germany", "Paris, France"]
+    store["bob"] = {"budget": 500}
+    store["carol"] = {"budget": 900}
+    assert "alice" not in store and store["bob"] == {"budget": 500}
+    assert store.stats()["evictions"] == 1
+
+    store.get("bob")["budget"] = 0
+    assert store.get("bob") == {"budget": 500}
+
+
+def test_persists_across_restarts(tmp_path):
+    path = str(tmp_path / "memory.sqlite3")
+    store = UserMemoryStore(path)
+    store.remember_trip("alice", MUNICH)
+    for _ in range(HISTORY_LIMIT + 5):
+        store.remember_trip("alice", PARIS)
+    store.close()
+
+    reopened = UserMemoryStore(path)
+    assert reopened.get("alice")["trips"] == HISTORY_LIMIT + 6
+    history = reopened.history("alice")
+    assert len(history) == HISTORY_LIMIT and history[-1]["destination"] == "Paris, France"
+    assert reopened.get("nobody") is None
+    assert reopened.stats()["disk_reads"] == 2
+    reopened.close()
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM trips").fetchone()[0] == HISTORY_LIMIT + 6
+
+
+def test_uncommitted_users_are_not_evicted(tmp_path):
+    store = UserMemoryStore(str(tmp_path / "memory.sqlite3"), max_entries=1, flush_interval=60, flush_batch=1000)
+    for user in ("alice", "bob", "carol"):
+        store.remember_trip(user, MUNICH)
+    assert store.stats()["entries"] == 3
+
+    assert store.flush(timeout=5)
+    stats = store.stats()
+    assert (stats["entries"], stats["pending_writes"]) == (1, 0)
+    assert store.get("alice")["last_destination"] == "Munich, Germany"
+    store.close()
+
+
+def test_request_path_does_not_wait_for_disk_writes(tmp_path):
+    path = str(tmp_path / "memory.sqlite3")
+    store = UserMemoryStore(path, flush_interval=0.01, flush_batch=1)
+    store.remember_trip("alice", MUNICH)
+    assert store.flush(timeout=5)
+
+    blocker = sqlite3.connect(path)
+    blocker.execute("BEGIN EXCLUSIVE")  # the writer thread now waits for the database lock
+    try:
+        start = time.perf_counter()
+        for i in range(50):
+            store.remember_trip("alice", PARIS)
+        assert time.perf_counter() - start < 0.25
+        assert not store.flush(timeout=0.3)
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert store.flush(timeout=5)
+    assert store.get("alice")["trips"] == 51
+    store.close()
@@ -2,35 +2,102 @@
 """
 Travel Orchestrator Agent for AWS Bedrock AgentCore
 Main orchestrator that coordinates all sub-agents
-"""
 
-try:
-    from bedrock_agentcore import BedrockAgentCoreApp
-    AGENTCORE_AVAILABLE = True
-    app = BedrockAgentCoreApp()
-except ImportError:
-    AGENTCORE_AVAILABLE = False
-    print("Running in local test mode - AgentCore SDK not available")
+Importing this module stays cheap: boto3, the Bedrock client and the AgentCore
+SDK are only loaded when first needed (a Bedrock call, or create_app()).
+`python bench_cold_start.py` tracks the import time.
+"""
 
+import importlib.util
 import json
-import boto3
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from functools import partial
+from typing import Dict, List, Any, Iterator, Tuple
+
+AGENTCORE_AVAILABLE = importlib.util.find_spec("bedrock_agentcore") is not None
+if not AGENTCORE_AVAILABLE:
+    print("Running in local test mode - AgentCore SDK not available")
+
+from activity_catalog import default_catalog
+from aws_clients import get_bedrock_runtime_client
+from bedrock_resilience import BedrockGuard, error_code
+from bundle_optimizer import cheapest_bundle, optimize_bundles
+from incremental_planner import IncrementalPlanner, apply_changes
+from itinerary_scheduler import MAX_ACTIVITIES_PER_DAY, schedule_itinerary
+from stage_metrics import RequestTimer
+from summary_batcher import DEFAULT_SUMMARY_BATCH_SIZE, DEFAULT_SUMMARY_WINDOW, SummaryBatcher
+from summary_prompt import (
+    ANTHROPIC_VERSION, TRIP_DETAILS_TEMPLATE, StubBedrockRuntime, TokenUsage, system_blocks, use_prompt_caching,
+)
+from trip_cache import TripPlanCache
+from trip_models import Activity, DayPlan, Flight, Hotel, Itinerary, TripRequest, to_wire
+from trip_parser import TripRequestParser
+
+# Upper bound on activities returned by the activities agent per trip
+MAX_ACTIVITIES = int(os.environ.get("MAX_ACTIVITIES", "10"))
+# Number of alternative flight/hotel bundles kept in the itinerary
+BUNDLE_COUNT = int(os.environ.get("BUNDLE_COUNT", "5"))
+# Add a per-stage "timings" block to every response (callers can also pass "timings": true)
+RESPONSE_TIMINGS = os.environ.get("RESPONSE_TIMINGS", "").lower() in ("1", "true", "yes")
+# Response fields per profile; callers pick one with "profile" in the payload
+RESPONSE_PROFILES = {
+    "minimal": ("status", "summary", "trip_overview", "daily_schedule"),
+    "standard": ("status", "summary", "trip_overview", "flight", "hotel", "activities", "daily_schedule"),
+    "debug": ("status", "summary", "trip_overview", "flight", "hotel", "activities", "daily_schedule", "raw_data"),
+}
+DEFAULT_RESPONSE_PROFILE = os.environ.get("RESPONSE_PROFILE", "standard")
+# Identifies this process in the metrics it reports to the server
+PROCESS_ID = f"{os.getpid()}-{time.time_ns()}"
 
 class TravelOrchestratorAgent:
     """Main orchestrator agent for travel planning"""
     
     def __init__(self):
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name='us-west-2')
+        if os.environ.get("BEDROCK_STUB", "").lower() in ("1", "true", "yes"):
+            # Local stub mode: no AWS calls, usage reports what prompt caching would save
+            self._bedrock_client = StubBedrockRuntime()
+        else:
+            self._bedrock_client = None  # created on first use, see bedrock_client
+        self.summary_usage = TokenUsage()
+        # Latency budget, hedging and circuit breaker for summary calls
+        self.bedrock_guard = BedrockGuard.from_env()
         self.model_id = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+        # Opt-in, and only for models known to accept cache_control with a prefix long enough to cache
+        self.prompt_caching = use_prompt_caching(
+            self.model_id, requested=os.environ.get("BEDROCK_PROMPT_CACHING", "").lower() in ("1", "true", "yes"))
+        self.request_parser = TripRequestParser(llm_parse=self.parse_trip_request_with_llm)
+        self.summary_batcher = None
+        self.enable_summary_batching(
+            int(os.environ.get("SUMMARY_BATCH_SIZE", "1")),
+            float(os.environ.get("SUMMARY_BATCH_WINDOW_MS", "50")) / 1000,
+        )
         
+    @property
+    def bedrock_client(self):
+        """Shared bedrock-runtime client, created (importing boto3) on first access"""
+        if self._bedrock_client is None:
+            self._bedrock_client = get_bedrock_runtime_client(region_name='us-west-2')
+        return self._bedrock_client
+    
+    @bedrock_client.setter
+    def bedrock_client(self, client):
+        self._bedrock_client = client
+    
     def parse_trip_request(self, user_input: str) -> Dict[str, Any]:
         """Parse user input into structured trip request"""
-        # Use Bedrock to parse natural language into structured data
+        # Deterministic fast path; Bedrock is only called for prompts it cannot understand
+        return self.request_parser.parse(user_input)
+    
+    def parse_trip_request_with_llm(self, user_input: str) -> Dict[str, Any]:
+        """Use Bedrock to parse natural language into structured data"""
         prompt = f"""
         Parse this travel request into structured JSON:
         "{user_input}"
         
+        Today's date is {datetime.now().strftime("%Y-%m-%d")}.
         Return only valid JSON with these fields:
         {{
             "destination": "city, country",
@@ -41,19 +108,24 @@ class TravelOrchestratorAgent:
             "travelers": number
         }}
         """
-        # TODO - LLM call to Bedrock
-        
-        # For now, use a simple parser (in production, use Bedrock)
-        return {
-            "destination": "Munich, Germany",
-            "start_date": "2024-10-01",
-            "end_date": "2024-10-03",
-            "budget": 800,
-            "interests": ["history", "beer", "Oktoberfest"],
-            "travelers": 1
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 200,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
         }
+        response = self.bedrock_client.invoke_model(
+            modelId=self.model_id,
+            body=json.dumps(request_body)
+        )
+        text = json.loads(response['body'].read())['content'][0]['text']
+        return json.loads(text[text.index("{"):text.rindex("}") + 1])
     
-    def call_flights_hotels_agent(self, request: Dict) -> Dict:
+    def call_flights_hotels_agent(self, request: TripRequest) -> Dict:
         """Call the flights & hotels agent"""
         # Simulate agent-to-agent communication
         return {
@@ -72,223 +144,549 @@ class TravelOrchestratorAgent:
             }]
         }
     
-    def call_activities_agent(self, request: Dict) -> Dict:
+    def call_activities_agent(self, request: TripRequest) -> Dict:
         """Call the activities agent"""
-        activities = []
-        
-        if "history" in request.get("interests", []):
-            activities.append({
-                "id": "act_001",
-                "name": "Marienplatz Historical Tour",
-                "price": 25,
-                "location": "Marienplatz",
-                "rating": 4.6
-            })
-            
-        if any(beer in request.get("interests", []) for beer in ["beer", "Oktoberfest"]):
-            activities.append({
-                "id": "act_002",
-                "name": "Hofbräu Beer Garden",
-                "price": 15,
-                "location": "Hofbräu München",
-                "rating": 4.4
-            })
-            
+        activities = default_catalog().search(
+            request.destination,
+            request.interests,
+            k=MAX_ACTIVITIES,
+        )
         return {"activities": activities}
     
-    def call_itinerary_agent(self, flights_hotels: Dict, activities: Dict, request: Dict) -> Dict:
+    def call_itinerary_agent(self, flights_hotels: Dict, activities: Dict, request: TripRequest) -> Itinerary:
         """Call the itinerary agent"""
-        start_date = datetime.strptime(request["start_date"], "%Y-%m-%d")
-        end_date = datetime.strptime(request["end_date"], "%Y-%m-%d")
+        start_date = datetime.strptime(request.start_date, "%Y-%m-%d")
+        end_date = datetime.strptime(request.end_date, "%Y-%m-%d")
         
-        days = []
+        dates = []
         current_date = start_date
-        
         while current_date <= end_date:
-            day_activities = []
-            for i, activity in enumerate(activities.get("activities", [])):
-                if i < 2:  # Max 2 activities per day
-                    day_activities.append({
-                        "time": "10:00" if i == 0 else "14:00",
-                        "activity": activity["name"],
-                        "location": activity["location"],
-                        "price": activity["price"]
-                    })
-            
-            days.append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "day_name": current_date.strftime("%A"),
-                "activities": day_activities
-            })
-            
+            dates.append(current_date)
             current_date += timedelta(days=1)
         
-        # Calculate total cost
-        flight_cost = sum(f["price"] for f in flights_hotels.get("flights", []))
-        hotel_cost = sum(h["price"] for h in flights_hotels.get("hotels", [])) * len(days)
-        activity_cost = sum(a["price"] for day in days for a in day["activities"])
+        # Pick the flight and hotel from the best bundle that fits the budget for all travelers
+        budget = request.budget
+        travelers = request.travelers
+        candidates = activities.get("activities", [])
+        bundles = []
+        if budget is not None:
+            bundles = optimize_bundles(
+                flights_hotels.get("flights", []),
+                flights_hotels.get("hotels", []),
+                candidates,
+                budget=budget,
+                travelers=travelers,
+                nights=len(dates),
+                top_n=BUNDLE_COUNT,
+                max_activities=len(dates) * MAX_ACTIVITIES_PER_DAY,
+            )
+        best = bundles[0] if bundles else cheapest_bundle(
+            flights_hotels.get("flights", []), flights_hotels.get("hotels", []), travelers, len(dates))
+        # Sub-agent replies are validated here, where they enter the typed model
+        flight = Flight.from_dict(best["flight"]) if best else None
+        hotel = Hotel.from_dict(best["hotel"]) if best else None
+        flight_cost = flight.price * travelers if flight else 0
+        hotel_cost = hotel.price * len(dates) if hotel else 0
+        if bundles:
+            candidates = best["activities"]  # the best bundle's activity set is the plan
+        
+        # Fill each day with activities that fit the per-traveler budget left after travel and lodging
+        schedule = schedule_itinerary(
+            candidates,
+            dates,
+            budget=(budget - flight_cost - hotel_cost) / travelers if budget is not None else None,
+            first_day_start=flight.arrival if flight else None,
+        )
         
+        days = []
+        for day_date, day_activities in zip(dates, schedule):
+            days.append(DayPlan(
+                date=day_date.strftime("%Y-%m-%d"),
+                day_name=day_date.strftime("%A"),
+                activities=[Activity(**a) for a in day_activities],
+            ))
+        
+        activity_cost = sum(a.price for day in days for a in day.activities) * travelers
+        if bundles:
+            # Activities that fit no opening hours or time slot are dropped, so report what was scheduled
+            scheduled = {a.activity for day in days for a in day.activities}
+            kept = [a for a in best["activities"] if a["name"] in scheduled]
+            bundles[0] = dict(
+                best,
+                activities=kept,
+                total_cost=flight_cost + hotel_cost + activity_cost,
+                score=round(best["score"] - sum(a.get("rating") or 0 for a in best["activities"] if a not in kept), 2),
+            )
+        
+        return Itinerary(
+            destination=request.destination,
+            duration=f"{len(days)} days",
+            total_cost=flight_cost + hotel_cost + activity_cost,
+            daily_plan=days,
+            flight=flight,
+            hotel=hotel,
+            bundles=[
+                {
+                    "flight_id": b["flight"].get("id"),
+                    "hotel_id": b["hotel"].get("id"),
+                    "activity_ids": [a.get("id") for a in b["activities"]],
+                    "total_cost": b["total_cost"],
+                    "score": b["score"]
+                } for b in bundles
+            ]
+        )
+    
+    def summary_trip_details(self, trip_plan_data: Dict[str, Any], user_input: str) -> str:
+        """Request and trip facts the summary prompt is written from"""
+        trip_plan = trip_plan_data["trip_plan"]
+        request, itinerary = trip_plan["request"], trip_plan["itinerary"]
+        return TRIP_DETAILS_TEMPLATE.render(
+            user_input=user_input,
+            destination=request.destination,
+            duration=itinerary.duration,
+            budget=f"${request.budget}" if request.budget is not None else "not specified",
+            total_cost=itinerary.total_cost,
+            interests=", ".join(request.interests),
+            hotel=itinerary.hotel.name if itinerary.hotel else trip_plan["accommodation"][0]["name"],
+            activities=", ".join(act["name"] for act in trip_plan["activities"]),
+        )
+    
+    def build_summary_request(self, trip_plan_data: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """Build the Bedrock request body for the trip summary"""
+        # The static instructions go in a cacheable system prefix; only the trip facts vary
         return {
-            "destination": request["destination"],
-            "duration": f"{len(days)} days",
-            "total_cost": flight_cost + hotel_cost + activity_cost,
-            "daily_plan": days
+            "anthropic_version": ANTHROPIC_VERSION,
+            "max_tokens": 300,
+            "system": system_blocks(cache=self.prompt_caching),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": self.summary_trip_details(trip_plan_data, user_input)
+                }
+            ]
         }
     
+    def summary_fallback(self, trip_plan_data: Dict[str, Any]) -> str:
+        """Basic message used when the LLM call fails"""
+        return f"🎯 I've created a wonderful {trip_plan_data['trip_plan']['itinerary'].duration} trip to {trip_plan_data['trip_plan']['request'].destination} for you! Total estimated cost: ${trip_plan_data['trip_plan']['itinerary'].total_cost}. Your adventure includes flights, hotel accommodation, and exciting activities perfectly matched to your interests."
+    
+    def invoke_summary_model(self, request_body: Dict[str, Any]) -> str:
+        """Send a summary request body to Bedrock under the latency budget and circuit breaker"""
+        return self.bedrock_guard.call(self._send_summary_request, request_body)
+    
+    def _send_summary_request(self, request_body: Dict[str, Any]) -> str:
+        response = self.bedrock_client.invoke_model(
+            modelId=self.model_id,
+            body=json.dumps(request_body)
+        )
+        response_body = json.loads(response['body'].read())
+        self.summary_usage.record(response_body.get('usage'))
+        return response_body['content'][0]['text']
+    
     def generate_ai_summary(self, trip_plan_data: Dict[str, Any], user_input: str) -> str:
         """Use Bedrock LLM to generate a natural language summary of the trip plan"""
         print(f"🤖 Starting AI summary generation with model: {self.model_id}")
         try:
-            # Extract key information for the prompt
-            destination = trip_plan_data["trip_plan"]["request"]["destination"]
-            duration = trip_plan_data["trip_plan"]["itinerary"]["duration"]
-            total_cost = trip_plan_data["trip_plan"]["itinerary"]["total_cost"]
-            budget = trip_plan_data["trip_plan"]["request"]["budget"]
-            interests = ", ".join(trip_plan_data["trip_plan"]["request"]["interests"])
-            activities = [act["name"] for act in trip_plan_data["trip_plan"]["activities"]]
-            hotel = trip_plan_data["trip_plan"]["accommodation"][0]["name"]
+            # Concurrent callers share model calls when micro-batching is enabled
+            if self.summary_batcher is not None:
+                return self.summary_batcher.summarize(trip_plan_data, user_input)
             
-            # Create a comprehensive prompt for the LLM
-            prompt = f"""You are a friendly and professional travel agent. Based on the trip planning data below, create an engaging and personalized travel summary for the customer.
-
-User's Original Request: "{user_input}"
-
-Trip Details:
-- Destination: {destination}
-- Duration: {duration}
-- Budget: ${budget}
-- Total Estimated Cost: ${total_cost}
-- Interests: {interests}
-- Hotel: {hotel}
-- Activities planned: {', '.join(activities)}
-
-Please write a warm, enthusiastic, and informative summary that:
-1. Acknowledges their specific interests and budget
-2. Highlights the exciting experiences they'll have
-3. Mentions the great value (cost vs budget)
-4. Creates excitement about their upcoming trip
-5. Keep it concise but engaging (2-3 paragraphs)
-
-Write in a friendly, professional tone as if you're personally excited to help them plan this amazing trip."""
-
-            # Prepare the request for Bedrock
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 300,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            }
+            request_body = self.build_summary_request(trip_plan_data, user_input)
+            return self.invoke_summary_model(request_body)
             
-            # Call Bedrock
-            response = self.bedrock_client.invoke_model(
+        except Exception as e:
+            # Fallback to basic message if LLM call fails; the error code is counted in bedrock_guard.metrics()
+            print(f"LLM call failed: {error_code(e)}: {str(e)}")
+            return self.summary_fallback(trip_plan_data)
+    
+    def enable_summary_batching(self, max_batch_size: int = DEFAULT_SUMMARY_BATCH_SIZE,
+                                max_wait: float = DEFAULT_SUMMARY_WINDOW):
+        """Pack concurrent summary requests into shared model calls (max_batch_size <= 1 disables)"""
+        if self.summary_batcher is not None:
+            self.summary_batcher.close()
+        self.summary_batcher = SummaryBatcher(self, max_batch_size, max_wait) if max_batch_size > 1 else None
+    
+    def stream_ai_summary(self, trip_plan_data: Dict[str, Any], user_input: str) -> Iterator[str]:
+        """Yield the AI summary as text chunks using Bedrock response streaming"""
+        print(f"🤖 Starting streamed AI summary generation with model: {self.model_id}")
+        emitted = failed = False
+        breaker = self.bedrock_guard.breaker
+        if not breaker.allow():
+            print("🔌 Bedrock circuit breaker open, using fallback summary")
+            yield self.summary_fallback(trip_plan_data)
+            return
+        try:
+            request_body = self.build_summary_request(trip_plan_data, user_input)
+            response = self.bedrock_client.invoke_model_with_response_stream(
                 modelId=self.model_id,
                 body=json.dumps(request_body)
             )
             
-            # Parse response
-            response_body = json.loads(response['body'].read())
-            ai_summary = response_body['content'][0]['text']
-            
-            return ai_summary
-            
+            for event in response['body']:
+                chunk = event.get('chunk')
+                if not chunk:
+                    continue
+                data = json.loads(chunk['bytes'])
+                if data.get('type') == 'message_start':
+                    self.summary_usage.record(data.get('message', {}).get('usage'))
+                if data.get('type') == 'content_block_delta' and data['delta'].get('type') == 'text_delta':
+                    emitted = True
+                    yield data['delta']['text']
+                    
         except Exception as e:
-            # Fallback to basic message if LLM call fails
-            print(f"LLM call failed: {type(e).__name__}: {str(e)}")
-            return f"🎯 I've created a wonderful {trip_plan_data['trip_plan']['itinerary']['duration']} trip to {trip_plan_data['trip_plan']['request']['destination']} for you! Total estimated cost: ${trip_plan_data['trip_plan']['itinerary']['total_cost']}. Your adventure includes flights, hotel accommodation, and exciting activities perfectly matched to your interests."
+            failed = True
+            self.bedrock_guard.record_error(e)
+            # Fallback to basic message if LLM call fails before any text was sent
+            print(f"LLM streaming call failed: {error_code(e)}: {str(e)}")
+            if not emitted:
+                yield self.summary_fallback(trip_plan_data)
+        finally:
+            # Also runs when the consumer stops early, so a half-open probe is never left pending
+            breaker.record(not failed)
 
 # Create agent instance
 orchestrator = TravelOrchestratorAgent()
 
+# Cache of complete responses keyed on the parsed trip request
+plan_cache = TripPlanCache(
+    max_entries=int(os.environ.get("TRIP_CACHE_MAX_ENTRIES", 1024)),
+    ttl=float(os.environ.get("TRIP_CACHE_TTL", 3600)),
+    cache_dir=os.environ.get("TRIP_CACHE_DIR") or None,
+)
+
+# Previous stage outputs per session_id, for follow-up turns that change part of the request
+replanner = IncrementalPlanner.from_env()
+
+# Per-stage timeouts (seconds) for the async orchestration path
+SUB_AGENT_TIMEOUTS = {
+    "flights_hotels": 30.0,
+    "activities": 30.0,
+    "itinerary": 30.0,
+    "summary": 60.0,
+}
+
+def build_trip_plan_data(trip_request: TripRequest, flights_hotels: Dict, activities: Dict,
+                         itinerary: Itinerary) -> Dict[str, Any]:
+    """Combine the sub-agent outputs into the structure passed to the summary step"""
+    return {
+        "trip_plan": {
+            "request": trip_request,
+            "transportation": flights_hotels["flights"],
+            "accommodation": flights_hotels["hotels"],
+            "activities": activities["activities"],
+            "itinerary": itinerary
+        }
+    }
+
+def summarize_plan(flights_hotels: Dict, activities: Dict, itinerary: Itinerary, trip_request: TripRequest,
+                   user_input: str) -> str:
+    """Summary stage: the AI summary of the plan, or the short fallback if generation raises"""
+    temp_response = build_trip_plan_data(trip_request, flights_hotels, activities, itinerary)
+    try:
+        ai_summary = orchestrator.generate_ai_summary(temp_response, user_input)
+        print(f"✅ AI Summary generated successfully")
+        return ai_summary
+    except Exception as e:
+        print(f"⚠️ AI Summary generation failed: {e}")
+        return fallback_summary(itinerary)
+
+def fallback_summary(itinerary: Itinerary) -> str:
+    """Short summary used when AI summary generation raises"""
+    return f"🎯 Trip planned for {itinerary.destination} ({itinerary.duration}) - Total cost: ${itinerary.total_cost}"
+
+def format_response(temp_response: Dict[str, Any], ai_summary: str) -> Dict[str, Any]:
+    """Full response of the handler paths; finish_response trims it to the requested profile"""
+    trip_plan = temp_response["trip_plan"]
+    trip_request = trip_plan["request"]
+    itinerary = trip_plan["itinerary"]
+    budget = trip_request.budget
+    overview = {
+        "destination": trip_request.destination,
+        "dates": f"{trip_request.start_date} to {trip_request.end_date}",
+        "duration": itinerary.duration,
+        "travelers": trip_request.travelers,
+        "budget": f"${budget}" if budget is not None else None,
+        "estimated_cost": f"${itinerary.total_cost}",
+        "savings": f"${max(0, budget - itinerary.total_cost)}" if budget is not None else None,
+    }
+
+    return {
+        "status": "success",
+        "summary": ai_summary,
+        # Requests without a budget have no budget or savings to report
+        "trip_overview": {key: value for key, value in overview.items() if value is not None},
+        "flight": to_wire(itinerary.flight),
+        "hotel": to_wire(itinerary.hotel),
+        "activities": [
+            {
+                "name": act["name"],
+                "location": act["location"],
+                "price": f"${act['price']}",
+                "rating": f"⭐ {act['rating']}"
+            } for act in trip_plan["activities"]
+        ],
+        "daily_schedule": [
+            {
+                "date": day.date,
+                "day": day.day_name,
+                "activities": [
+                    f"{act.time} - {act.activity} at {act.location} (${act.price})"
+                    for act in day.activities
+                ]
+            } for day in itinerary.daily_plan
+        ],
+        "raw_data": temp_response  # Original structure (shared, not copied), only sent with the debug profile
+    }
+
+def error_response(e: Exception) -> Dict[str, str]:
+    """Error payload shared by both handler paths"""
+    return {
+        "error": f"Failed to generate trip plan: {str(e)}",
+        "message": "Sorry, I encountered an error while planning your trip. Please try again."
+    }
+
+def parse_request(payload, user_input: str) -> TripRequest:
+    """The payload's pre-parsed trip_request or the parsed prompt, validated; raises TripModelError"""
+    return TripRequest.from_dict(payload.get("trip_request") or orchestrator.parse_trip_request(user_input))
+
+def parse_turn(payload, user_input: str) -> Tuple[TripRequest, str]:
+    """Trip request and prompt of this turn: the payload's "changes" applied to the session's previous
+    request, or to the parsed request when the session is unknown (e.g. expired); raises ValueError
+    when there is neither a session nor a prompt or trip_request to apply them to"""
+    changes = payload.get("changes")
+    if changes is None:
+        return parse_request(payload, user_input), user_input
+    previous = replanner.previous(payload.get("session_id"))
+    if previous is None:
+        if not payload.get("prompt") and not payload.get("trip_request"):
+            raise ValueError("Unknown or expired session: send the prompt or trip_request again with the changes")
+        return apply_changes(parse_request(payload, user_input), changes), user_input
+    return apply_changes(previous[0], changes), payload.get("prompt") or previous[1]
+
+def response_profile(payload) -> str:
+    """Profile requested in the payload; raises ValueError for unknown names"""
+    profile = payload.get("profile") or DEFAULT_RESPONSE_PROFILE
+    if profile not in RESPONSE_PROFILES:
+        raise ValueError(f"Unknown response profile '{profile}', expected one of: {', '.join(RESPONSE_PROFILES)}")
+    return profile
+
+def finish_response(response: Dict[str, Any], timer: RequestTimer, payload) -> Dict[str, Any]:
+    """Project the full response onto the requested profile and attach timings if asked for"""
+    fields = RESPONSE_PROFILES[response_profile(payload)]
+    response = {key: response[key] for key in fields if key in response}
+    if "raw_data" in response:
+        # The only field holding trip_models objects; callers get plain JSON types
+        response["raw_data"] = to_wire(response["raw_data"])
+    timings = timer.finish()
+    if payload.get("timings", RESPONSE_TIMINGS):
+        response["timings"] = timings
+    if payload.get("worker_metrics"):
+        # Set by the subprocess and pool backends, which export these from the server's /metrics
+        response["worker_metrics"] = {"process": PROCESS_ID, "stages": timer.seconds(),
+                                      "bedrock": orchestrator.bedrock_guard.metrics()}
+    return response
+
 def invoke_handler(payload):
     """Main agent entrypoint"""
+    timer = RequestTimer()
+    try:
+        user_input = payload.get("prompt", "Plan a trip to Munich")
+        response_profile(payload)  # reject unknown profiles before doing any work
+        
+        # Step 1: Parse user request (batch callers may pass it pre-parsed, follow-up turns as changes)
+        with timer.stage("parse"):
+            trip_request, user_input = parse_turn(payload, user_input)
+        
+        use_cache = payload.get("use_cache", True)
+        if use_cache:
+            cached = plan_cache.get(trip_request)
+            if cached is not None:
+                replanner.remember(payload.get("session_id"), trip_request, user_input)
+                return finish_response(cached, timer, payload)
+        
+        # Steps 2-3: Call sub-agents, then generate the AI summary using Bedrock;
+        # within a session only the stages affected by the changed fields run again
+        outputs = replanner.plan(payload.get("session_id"), trip_request, {
+            "flights_hotels": orchestrator.call_flights_hotels_agent,
+            "activities": orchestrator.call_activities_agent,
+            "itinerary": orchestrator.call_itinerary_agent,
+            "summary": partial(summarize_plan, user_input=user_input),
+        }, timer, prompt=user_input)
+        temp_response = build_trip_plan_data(
+            trip_request, outputs["flights_hotels"], outputs["activities"], outputs["itinerary"])
+        
+        # Step 4: Format user-friendly response
+        response = format_response(temp_response, outputs["summary"])
+        if use_cache:
+            plan_cache.put(trip_request, response)
+        return finish_response(response, timer, payload)
+        
+    except Exception as e:
+        return error_response(e)
+
+async def _run_stage(name: str, func, *args, timeouts: Dict[str, float], timer: RequestTimer):
+    """Run a blocking sub-agent call in a worker thread, bounded by its stage timeout"""
+    import asyncio  # only the async entrypoint needs it; keeps the module import light
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(timer.timed, name, func, *args), timeouts[name])
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"{name} agent timed out after {timeouts[name]}s") from None
+
+async def ainvoke_handler(payload, timeouts: Dict[str, float] = None):
+    """Async agent entrypoint.
+
+    Runs the independent flights/hotels and activities agents concurrently,
+    starts the itinerary agent once both results are in, and returns the same
+    response shape as invoke_handler. If one sub-agent fails or times out the
+    sibling task is cancelled. Worker threads cannot be interrupted, so a
+    cancelled call finishes in the background and its result is discarded.
+    Follow-up turns ("changes" with a session_id) are applied to the session,
+    but every stage runs again; only invoke_handler reuses unchanged ones.
+    """
+    import asyncio
+    timeouts = {**SUB_AGENT_TIMEOUTS, **(timeouts or {})}
+    timer = RequestTimer()
     try:
         user_input = payload.get("prompt", "Plan a trip to Munich")
+        response_profile(payload)  # reject unknown profiles before doing any work
+        
+        # Step 1: Parse user request (batch callers may pass it pre-parsed, follow-up turns as changes)
+        with timer.stage("parse"):
+            trip_request, user_input = parse_turn(payload, user_input)
         
-        # Step 1: Parse user request
-        trip_request = orchestrator.parse_trip_request(user_input)
+        use_cache = payload.get("use_cache", True)
+        if use_cache:
+            cached = plan_cache.get(trip_request)
+            if cached is not None:
+                replanner.remember(payload.get("session_id"), trip_request, user_input)
+                return finish_response(cached, timer, payload)
         
-        # Step 2: Call sub-agents
-        flights_hotels = orchestrator.call_flights_hotels_agent(trip_request)
-        activities = orchestrator.call_activities_agent(trip_request)
-        itinerary = orchestrator.call_itinerary_agent(flights_hotels, activities, trip_request)
+        # Step 2: Fan out to the independent sub-agents
+        flights_task = asyncio.create_task(_run_stage(
+            "flights_hotels", orchestrator.call_flights_hotels_agent, trip_request, timeouts=timeouts, timer=timer))
+        activities_task = asyncio.create_task(_run_stage(
+            "activities", orchestrator.call_activities_agent, trip_request, timeouts=timeouts, timer=timer))
+        try:
+            flights_hotels, activities = await asyncio.gather(flights_task, activities_task)
+        except BaseException:
+            flights_task.cancel()
+            activities_task.cancel()
+            raise
+        
+        itinerary = await _run_stage("itinerary", orchestrator.call_itinerary_agent, flights_hotels, activities,
+                                     trip_request, timeouts=timeouts, timer=timer)
         
         # Step 3: Generate AI-powered natural language summary using Bedrock
-        temp_response = {
-            "trip_plan": {
-                "request": trip_request,
-                "transportation": flights_hotels["flights"],
-                "accommodation": flights_hotels["hotels"],
-                "activities": activities["activities"],
-                "itinerary": itinerary
-            }
-        }
+        temp_response = build_trip_plan_data(trip_request, flights_hotels, activities, itinerary)
         
         ai_summary = ""
         try:
-            ai_summary = orchestrator.generate_ai_summary(temp_response, user_input)
+            ai_summary = await _run_stage(
+                "summary", orchestrator.generate_ai_summary, temp_response, user_input, timeouts=timeouts, timer=timer)
             print(f"✅ AI Summary generated successfully")
         except Exception as e:
             print(f"⚠️ AI Summary generation failed: {e}")
-            ai_summary = f"🎯 Trip planned for {itinerary['destination']} ({itinerary['duration']}) - Total cost: ${itinerary['total_cost']}"
+            ai_summary = fallback_summary(itinerary)
+        replanner.remember(payload.get("session_id"), trip_request, user_input, {
+            "flights_hotels": flights_hotels, "activities": activities, "itinerary": itinerary, "summary": ai_summary})
         
         # Step 4: Format user-friendly response
-        response = {
-            "status": "success",
-            "summary": ai_summary,
-            "trip_overview": {
-                "destination": trip_request["destination"],
-                "dates": f"{trip_request['start_date']} to {trip_request['end_date']}",
-                "duration": itinerary["duration"],
-                "travelers": trip_request["travelers"],
-                "budget": f"${trip_request['budget']}",
-                "estimated_cost": f"${itinerary['total_cost']}",
-                "savings": f"${max(0, trip_request['budget'] - itinerary['total_cost'])}"
-            },
-            "flight": flights_hotels["flights"][0] if flights_hotels["flights"] else None,
-            "hotel": flights_hotels["hotels"][0] if flights_hotels["hotels"] else None,
-            "activities": [
-                {
-                    "name": act["name"],
-                    "location": act["location"],
-                    "price": f"${act['price']}",
-                    "rating": f"⭐ {act['rating']}"
-                } for act in activities["activities"]
-            ],
-            "daily_schedule": [
-                {
-                    "date": day["date"],
-                    "day": day["day_name"],
-                    "activities": [
-                        f"{act['time']} - {act['activity']} at {act['location']} (${act['price']})"
-                        for act in day["activities"]
-                    ]
-                } for day in itinerary["daily_plan"]
-            ],
-            "raw_data": temp_response  # Keep original structure for debugging
-        }
+        response = format_response(temp_response, ai_summary)
+        if use_cache:
+            plan_cache.put(trip_request, response)
+        return finish_response(response, timer, payload)
+        
+    except Exception as e:
+        return error_response(e)
+
+def stream_handler(payload) -> Iterator[Tuple[str, Any]]:
+    """Streaming agent entrypoint.
+
+    Yields (event, data) pairs as each pipeline stage finishes: "request",
+    "flights_hotels", "activities", "itinerary", one "summary" event per
+    Bedrock text chunk and finally "complete" with the same response that
+    invoke_handler returns. Failures are reported as a single "error" event.
+    Follow-up turns are applied to the session as in ainvoke_handler, and
+    likewise rerun every stage.
+    """
+    timer = RequestTimer()
+    try:
+        user_input = payload.get("prompt", "Plan a trip to Munich")
+        response_profile(payload)  # reject unknown profiles before doing any work
         
-        return response
+        # Step 1: Parse user request (batch callers may pass it pre-parsed, follow-up turns as changes)
+        with timer.stage("parse"):
+            trip_request, user_input = parse_turn(payload, user_input)
+        yield "request", to_wire(trip_request)
+        
+        use_cache = payload.get("use_cache", True)
+        if use_cache:
+            cached = plan_cache.get(trip_request)
+            if cached is not None:
+                replanner.remember(payload.get("session_id"), trip_request, user_input)
+                yield "complete", finish_response(cached, timer, payload)
+                return
+        
+        # Step 2: Call the independent sub-agents concurrently, emitting whichever finishes first
+        results = {}
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = {
+                executor.submit(timer.timed, "flights_hotels", orchestrator.call_flights_hotels_agent,
+                                trip_request): "flights_hotels",
+                executor.submit(timer.timed, "activities", orchestrator.call_activities_agent,
+                                trip_request): "activities",
+            }
+            for future in as_completed(futures):
+                stage = futures[future]
+                results[stage] = future.result()
+                yield stage, results[stage]
+        flights_hotels, activities = results["flights_hotels"], results["activities"]
+        
+        itinerary = timer.timed("itinerary", orchestrator.call_itinerary_agent, flights_hotels, activities, trip_request)
+        yield "itinerary", to_wire(itinerary)
+        
+        # Step 3: Stream the AI summary as Bedrock produces it
+        temp_response = build_trip_plan_data(trip_request, flights_hotels, activities, itinerary)
+        chunks = []
+        summary_time = 0.0  # excludes time spent waiting on the consumer
+        summary = orchestrator.stream_ai_summary(temp_response, user_input)
+        while True:
+            start = time.perf_counter()
+            chunk = next(summary, None)
+            summary_time += time.perf_counter() - start
+            if chunk is None:
+                break
+            chunks.append(chunk)
+            yield "summary", {"text": chunk}
+        timer.record("summary", summary_time)
+        ai_summary = "".join(chunks)
+        replanner.remember(payload.get("session_id"), trip_request, user_input, {
+            "flights_hotels": flights_hotels, "activities": activities, "itinerary": itinerary, "summary": ai_summary})
+        
+        # Step 4: Format user-friendly response
+        response = format_response(temp_response, ai_summary)
+        if use_cache:
+            plan_cache.put(trip_request, response)
+        yield "complete", finish_response(response, timer, payload)
         
     except Exception as e:
-        return {
-            "error": f"Failed to generate trip plan: {str(e)}",
-            "message": "Sorry, I encountered an error while planning your trip. Please try again."
-        }
+        yield "error", error_response(e)
 
-# Configure for AgentCore or local testing
-if AGENTCORE_AVAILABLE:
+def create_app():
+    """BedrockAgentCoreApp serving invoke_handler; imports the AgentCore SDK"""
+    from bedrock_agentcore import BedrockAgentCoreApp
+    app = BedrockAgentCoreApp()
+    
     @app.entrypoint
     def invoke(payload):
         return invoke_handler(payload)
+    
+    return app
 
 # Local testing server
 if __name__ == "__main__":
     if AGENTCORE_AVAILABLE:
-        app.run()
+        create_app().run()
     else:
         # Simple local test
         test_payload = {"prompt": "Plan a 3-day trip to Munich for Oktoberfest"}
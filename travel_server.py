@@ -3,19 +3,78 @@
 Simple web server to serve the travel planner UI and handle agentcore commands
 """
 
-import subprocess
+import argparse
+import gzip
 import json
 import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from http.server import HTTPServer, SimpleHTTPRequestHandler
-import os
-import sys
+from urllib.parse import parse_qs, urlparse
+
+import json_codec
+from invocation_backends import AgentInvocationError, BACKENDS, SubprocessBackend, create_backend
+from stage_metrics import bedrock_prometheus, stage_metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Request fields passed through to the agent payload
+AGENT_OPTIONS = ('profile', 'timings')
+# Follow-up turns of a session (POST only; see incremental_planner)
+SESSION_OPTIONS = ('session_id', 'changes')
+# Smaller JSON bodies are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+def choose_encoding(accept_encoding):
+    """'br' (if the brotli package is installed) or 'gzip' when the client accepts it, else None"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in (('br',) if brotli else ()) + ('gzip',):
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
 class TravelPlannerHandler(SimpleHTTPRequestHandler):
+    # Agent invocation backend shared by all requests (set by run_server)
+    backend = SubprocessBackend()
+
     def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/api/generate-plan/stream':
+            # EventSource clients can only issue GET requests
+            query = parse_qs(url.query)
+            options = {name: query[name][0] for name in AGENT_OPTIONS if name in query}
+            if 'timings' in options:
+                options['timings'] = options['timings'].lower() in ('1', 'true', 'yes')
+            self.handle_generate_plan_stream(query.get('prompt', [''])[0], options)
+            return
+        if url.path == '/metrics':
+            self.send_metrics()
+            return
         if self.path == '/':
             self.path = '/travel_planner_ui.html'
         return super().do_GET()
@@ -23,10 +82,15 @@ class TravelPlannerHandler(SimpleHTTPRequestHandler):
     def do_POST(self):
         if self.path == '/api/generate-plan':
             self.handle_generate_plan()
+        elif self.path == '/api/generate-plan/stream':
+            request = self.read_request()
+            if request is not None:
+                self.handle_generate_plan_stream(*request)
         else:
             self.send_error(404)
     
-    def handle_generate_plan(self):
+    def read_request(self, option_names=AGENT_OPTIONS):
+        """(prompt, agent options) from the JSON request body; sends an error response and returns None if unusable"""
         try:
             # Get content length and read the request body
             content_length = int(self.headers.get('Content-Length', 0))
@@ -34,100 +98,125 @@ class TravelPlannerHandler(SimpleHTTPRequestHandler):
             
             # Parse the JSON data
             request_data = json.loads(post_data)
-            prompt = request_data.get('prompt', '')
+            options = {name: request_data[name] for name in option_names if name in request_data}
+            return request_data.get('prompt', ''), options
+        except json.JSONDecodeError:
+            self.send_json_error('Invalid JSON in request', 400)
+        except (IOError, OSError) as e:
+            logger.error("I/O error handling request: %s", e)
+            self.send_json_error('Server error: ' + str(e), 500)
+        return None
+    
+    def acquire_agent_slot(self):
+        """Reserve an in-flight agent slot; sends 503/429 with Retry-After and returns False if none is free"""
+        if self.server.draining:
+            self.send_json_error('Server is shutting down', 503,
+                                 {'Retry-After': str(self.server.retry_after)})
+            return False
+        
+        # Bound the number of agent invocations running at once
+        if not self.server.agent_slots.acquire(blocking=False):
+            logger.warning("Rejecting request: %d agent invocations already in flight", self.server.max_inflight)
+            self.send_json_error('Too many requests in flight, please retry', 429,
+                                 {'Retry-After': str(self.server.retry_after)})
+            return False
+        return True
+    
+    def handle_generate_plan(self):
+        request = self.read_request(AGENT_OPTIONS + SESSION_OPTIONS)
+        if request is None:
+            return
+        prompt, options = request
+        if not prompt and 'changes' not in options:
+            self.send_json_error('No prompt provided', 400)
+            return
+        if not self.acquire_agent_slot():
+            return
+        
+        try:
+            logger.info("Executing %s backend with prompt: %s", self.backend.name, prompt)
             
-            if not prompt:
-                self.send_json_error('No prompt provided', 400)
+            try:
+                response_data = self.backend.invoke(prompt, **options)
+            except AgentInvocationError as e:
+                self.send_json_error(e.message, e.status_code)
                 return
             
-            logger.info("Executing agentcore with prompt: %s", prompt)
+            self.send_json_response(response_data)
+        except (IOError, OSError) as e:
+            logger.error("I/O error handling request: %s", e)
+        finally:
+            self.server.agent_slots.release()
+    
+    def handle_generate_plan_stream(self, prompt, options=None):
+        """Stream pipeline stages to the client as Server-Sent Events"""
+        if not prompt:
+            self.send_json_error('No prompt provided', 400)
+            return
+        if not self.acquire_agent_slot():
+            return
+        
+        try:
+            logger.info("Streaming %s backend with prompt: %s", self.backend.name, prompt)
+            events = iter(self.backend.stream(prompt, **(options or {})))
             
-            # Execute the agentcore command
-            cmd = ['agentcore', 'invoke', json.dumps({"prompt": prompt})]
+            # Pull the first event before committing to a 200 so early failures keep their status code
+            try:
+                first_event = next(events, None)
+            except AgentInvocationError as e:
+                self.send_json_error(e.message, e.status_code)
+                return
             
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.close_connection = True
+            
+            if first_event is not None:
+                self.write_event(*first_event)
             try:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=120,  # 2 minute timeout
-                    cwd=os.getcwd()
-                )
-                
-                if result.returncode != 0:
-                    logger.error(f"agentcore command failed: {result.stderr}")
-                    self.send_json_error(f"Agent execution failed: {result.stderr}", 500)
-                    return
-                
-                # Parse the output as JSON
-                try:
-                    logger.info("agentcore raw output: %s", result.stdout)
-                    
-                    # First try to parse as direct JSON
-                    try:
-                        response_data = json.loads(result.stdout)
-                        logger.info("Parsed response as direct JSON successfully")
-                        self.send_json_response(response_data)
-                        return
-                    except json.JSONDecodeError:
-                        pass
-                    
-                    # Extract JSON from agentcore decorated output
-                    # Look for "Response:" followed by JSON
-                    import re
-                    
-                    # Try to find JSON after "Response:" marker
-                    response_match = re.search(r'Response:\s*(\{.*\})', result.stdout, re.DOTALL)
-                    if response_match:
-                        json_str = response_match.group(1).strip()
-                        try:
-                            response_data = json.loads(json_str)
-                            logger.info("Successfully extracted JSON from agentcore response")
-                            self.send_json_response(response_data)
-                            return
-                        except json.JSONDecodeError:
-                            pass
-                    
-                    # Fallback: Look for any JSON-like structure
-                    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', result.stdout, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(0)
-                        try:
-                            response_data = json.loads(json_str)
-                            logger.info("Successfully extracted JSON from mixed output")
-                            self.send_json_response(response_data)
-                            return
-                        except json.JSONDecodeError:
-                            pass
-                    
-                    # If all else fails, return error
-                    logger.error("Could not extract valid JSON from agentcore output")
-                    self.send_json_error("Could not parse JSON from agent response", 500)
-                    
-                except Exception as e:
-                    logger.error("Unexpected error parsing agentcore output: %s", e)
-                    self.send_json_error("Error parsing agent response: " + str(e), 500)
-                
-            except subprocess.TimeoutExpired:
-                logger.error("agentcore command timed out")
-                self.send_json_error("Request timed out", 504)
-            except FileNotFoundError:
-                logger.error("agentcore command not found")
-                self.send_json_error("agentcore command not found. Please ensure it's installed and in PATH.", 500)
-            except subprocess.SubprocessError as e:
-                logger.error("Subprocess error executing agentcore: %s", e)
-                self.send_json_error("Error executing agentcore: " + str(e), 500)
-                
-        except json.JSONDecodeError:
-            self.send_json_error('Invalid JSON in request', 400)
+                for event, data in events:
+                    self.write_event(event, data)
+            except AgentInvocationError as e:
+                self.write_event('error', {'error': e.message})
         except (IOError, OSError) as e:
-            logger.error("I/O error handling request: %s", e)
-            self.send_json_error('Server error: ' + str(e), 500)
+            # Client went away mid-stream
+            logger.warning("Stream aborted: %s", e)
+        finally:
+            self.server.agent_slots.release()
+    
+    def write_event(self, event, data):
+        self.wfile.write(b"event: " + event.encode('utf-8') + b"\ndata: " + json_codec.dumps(data) + b"\n\n")
+        self.wfile.flush()
+    
+    def send_metrics(self):
+        """Stage latency histograms and Bedrock guard metrics in Prometheus text format"""
+        text = stage_metrics.prometheus()
+        bedrock_metrics = getattr(self.backend, 'bedrock_metrics', None)
+        if bedrock_metrics is not None:
+            text += bedrock_prometheus(bedrock_metrics())
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
     
     def send_json_response(self, data):
-        response = json.dumps(data).encode('utf-8')
+        start = time.perf_counter()
+        response = json_codec.dumps(data)
+        encoding = choose_encoding(self.headers.get('Accept-Encoding')) if len(response) >= MIN_COMPRESS_BYTES else None
+        if encoding:
+            response = compress_body(response, encoding)
+        stage_metrics.observe('serialize', time.perf_counter() - start)
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
         self.send_header('Content-Length', str(len(response)))
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
@@ -135,13 +224,15 @@ class TravelPlannerHandler(SimpleHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(response)
     
-    def send_json_error(self, message, status_code):
+    def send_json_error(self, message, status_code, headers=None):
         error_data = {'error': message}
-        response = json.dumps(error_data).encode('utf-8')
+        response = json_codec.dumps(error_data)
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Content-Length', str(len(response)))
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(response)
     
@@ -152,12 +243,88 @@ class TravelPlannerHandler(SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
-def run_server(port=8080):
+class TravelPlannerServer(HTTPServer):
+    """HTTP server that handles connections on a bounded pool of worker threads
+
+    - `workers` threads serve requests, so slow agent calls do not block static files
+    - at most `max_inflight` agent invocations run at once; extra ones get 429
+    - at most `queue_size` connections wait for a free worker; extra ones get 503
+    - drain() stops accepting agent work and waits for in-flight requests
+    """
+
+    def __init__(self, server_address, handler_class, workers=8, max_inflight=4, queue_size=32, retry_after=5):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self.max_inflight = max_inflight
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.agent_slots = threading.BoundedSemaphore(max_inflight)
+        self.draining = False
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='travel-http')
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._pending_lock:
+            if len(self._pending) >= self.workers + self.queue_size:
+                logger.warning("Rejecting connection from %s: request queue full", client_address[0])
+                self._reject(request)
+                return
+            future = self._executor.submit(self._process_request_worker, request, client_address)
+            self._pending.add(future)
+        future.add_done_callback(self._request_done)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def _request_done(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+
+    def _reject(self, request):
+        body = json_codec.dumps({'error': 'Server busy, please retry'})
+        head = (
+            "HTTP/1.0 503 Service Unavailable\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Retry-After: {self.retry_after}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode('latin-1')
+        try:
+            request.sendall(head + body)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def drain(self, timeout=None):
+        """Reject new agent requests and wait for in-flight ones; returns True if all finished"""
+        self.draining = True
+        with self._pending_lock:
+            pending = set(self._pending)
+        done, not_done = wait(pending, timeout=timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        return not not_done
+
+def run_server(port=8080, backend='subprocess', workers=4, threads=8, max_inflight=4, drain_timeout=130):
     """Run the HTTP server"""
+    backend_kwargs = {'workers': workers} if backend == 'pool' else {}
+    TravelPlannerHandler.backend = create_backend(backend, **backend_kwargs)
+    
     server_address = ('', port)
-    httpd = HTTPServer(server_address, TravelPlannerHandler)
+    httpd = TravelPlannerServer(server_address, TravelPlannerHandler, workers=threads, max_inflight=max_inflight)
+    
+    # Treat SIGTERM (docker stop, systemd) like Ctrl+C so in-flight work is drained
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
     
     print(f"🌍 Travel Planner Server running at http://localhost:{port}")
+    print(f"🤖 Agent backend: {backend}, JSON encoder: {json_codec.BACKEND}")
+    print(f"🧵 {threads} worker threads, up to {max_inflight} agent invocations in flight")
     print("📂 Serving files from current directory")
     print("🚀 Open your browser and navigate to the URL above")
     print("Press Ctrl+C to stop the server")
@@ -165,9 +332,25 @@ def run_server(port=8080):
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
-        print("\n👋 Server stopped")
+        print("\n⏳ Draining in-flight requests...")
+        if not httpd.drain(timeout=drain_timeout):
+            logger.warning("Drain timed out after %ss, abandoning remaining requests", drain_timeout)
         httpd.server_close()
+        print("👋 Server stopped")
+    finally:
+        TravelPlannerHandler.backend.close()
 
 if __name__ == '__main__':
-    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
-    run_server(port)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Travel planner web server")
+    parser.add_argument('port', nargs='?', type=int, default=8080)
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='subprocess',
+                        help="How to invoke the agent (default: subprocess via agentcore CLI)")
+    parser.add_argument('--workers', type=int, default=4, help="Worker processes for the pool backend")
+    parser.add_argument('--threads', type=int, default=8, help="HTTP worker threads")
+    parser.add_argument('--max-inflight', type=int, default=4,
+                        help="Maximum concurrent agent invocations before answering 429")
+    parser.add_argument('--drain-timeout', type=float, default=130,
+                        help="Seconds to wait for in-flight requests on shutdown")
+    args = parser.parse_args()
+    run_server(args.port, backend=args.backend, workers=args.workers, threads=args.threads,
+               max_inflight=args.max_inflight, drain_timeout=args.drain_timeout)
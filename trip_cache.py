@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Content-addressed response cache for trip plans
+
+Plans are keyed on the normalized output of parse_trip_request (destination,
+dates, budget, sorted interests, travelers), so prompts that differ only in
+wording share one entry. Entries live in a bounded in-memory LRU with a TTL and
+can optionally be backed by a directory of JSON files.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Optional
+
+import json_codec
+
+
+def normalize_trip_request(trip_request: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical form of a parsed trip request (dict or trip_models.TripRequest) used for cache keys"""
+    if is_dataclass(trip_request):
+        trip_request = asdict(trip_request)
+    budget = trip_request.get("budget")
+    if isinstance(budget, float) and budget.is_integer():
+        budget = int(budget)
+    return {
+        "destination": " ".join(str(trip_request.get("destination", "")).lower().split()),
+        "start_date": trip_request.get("start_date"),
+        "end_date": trip_request.get("end_date"),
+        "budget": budget,
+        "interests": sorted({str(i).strip().lower() for i in trip_request.get("interests", [])}),
+        "travelers": int(trip_request.get("travelers") or 1),
+    }
+
+
+def trip_request_key(trip_request: Dict[str, Any]) -> str:
+    """SHA-256 hex digest of the normalized trip request"""
+    canonical = json.dumps(normalize_trip_request(trip_request), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TripPlanCache:
+    """Thread-safe LRU + TTL cache of trip plan responses
+
+    Responses are stored as UTF-8 encoded JSON so the memory bound is measured
+    in bytes and callers always get an independent copy back.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: Optional[float] = 3600, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()  # key -> (expires_at, serialized)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, trip_request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = trip_request_key(trip_request)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, serialized = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(serialized)
+                self._remove(key)
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, *entry)
+        return json.loads(entry[1])
+
+    def put(self, trip_request: Dict[str, Any], response: Dict[str, Any]):
+        key = trip_request_key(trip_request)
+        serialized = json_codec.dumps(response)  # UTF-8 bytes; encodes trip_models types as well
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._store(key, expires_at, serialized)
+        self._write_disk(key, expires_at, serialized)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _store(self, key, expires_at, serialized):
+        if key in self._entries:
+            self._remove(key)
+        size = len(serialized)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, serialized)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, serialized = self._entries.pop(key)
+        self._bytes -= len(serialized)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _read_disk(self, key, now):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        expires_at = record.get("expires_at")
+        if expires_at is not None and expires_at <= now:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            return None
+        return expires_at, record["response"].encode("utf-8")
+
+    def _write_disk(self, key, expires_at, serialized):
+        if not self.cache_dir:
+            return
+        record = json.dumps({"expires_at": expires_at, "response": serialized.decode("utf-8")})
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(record)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
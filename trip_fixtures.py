@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Synthetic trip plans of any size, shared by the tests and the benchmarks
+
+- make_sample_plan: sample_trip_plan.json scaled to a number of days
+- make_local_plan: local_testing-shaped plan with N flights, hotels and activities per day
+- make_itinerary_dict: call_itinerary_agent-shaped itinerary with four activities a day
+
+concat_markdown is the plan formatter as it was before trip_renderer, kept as
+the reference output and benchmark baseline; ByteSink stands in for a socket.
+"""
+
+import json
+import os
+from datetime import date, timedelta
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_trip_plan.json")
+
+
+def make_sample_plan(days):
+    """sample_trip_plan.json with `days` days of activities (distinct dicts, like a real plan)"""
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        plan = json.load(f)
+    template = plan["itinerary"]["daily_plan"]
+    plan["itinerary"]["daily_plan"] = [
+        dict(template[i % len(template)], date=f"day-{i + 1}",
+             activities=[dict(a) for a in template[i % len(template)]["activities"]])
+        for i in range(days)
+    ]
+    return plan
+
+
+def make_local_plan(days, options):
+    """Plan shaped like TripOrchestratorAgent.plan_trip's output"""
+    start = date(2025, 1, 1)
+    end = (start + timedelta(days=days - 1)).isoformat()
+    return {
+        "request": {"destination": "Munich, Germany", "dates": {"start_date": start.isoformat(), "end_date": end},
+                    "budget": 400 * days, "interests": ["history", "craft beer", "art"], "travelers": 2},
+        "transportation": [
+            {"option_id": f"flight_{i:03d}", "price": 300 + i, "duration": "2h 30m", "departure": "10:30",
+             "arrival": "13:00", "booking_link": f"https://example.com/book/flight_{i:03d}"}
+            for i in range(options)
+        ],
+        "accommodation": [
+            {"option_id": f"hotel_{i:03d}", "name": f"Munich Hotel {i}", "price": 90 + i, "check_in": start.isoformat(),
+             "check_out": end, "rating": 4.2, "booking_link": f"https://example.com/book/hotel_{i:03d}"}
+            for i in range(options)
+        ],
+        "itinerary": {
+            "total_estimated_cost": 300 * days,
+            "daily_plan": [
+                {
+                    "date": (start + timedelta(days=d)).isoformat(),
+                    "day_name": (start + timedelta(days=d)).strftime("%A"),
+                    "accommodation": "Munich Hotel 0",
+                    "activities": [
+                        {"time": f"{8 + i % 14:02d}:00", "activity": f"Activity {d}-{i}", "price": 10 + i,
+                         "location": f"Location {i}"}
+                        for i in range(options)
+                    ],
+                } for d in range(days)
+            ],
+        },
+    }
+
+
+def concat_markdown(plan):
+    """The formatter as it was before trip_renderer: one growing string"""
+    md = f"""# Trip Plan: {plan['request']['destination']}
+
+## 📋 Trip Overview
+- **Destination**: {plan['request']['destination']}
+- **Dates**: {plan['request']['dates']['start_date']} to {plan['request']['dates']['end_date']}
+- **Budget**: ${plan['request']['budget']}
+- **Interests**: {', '.join(plan['request']['interests'])}
+- **Estimated Total Cost**: ${plan['itinerary']['total_estimated_cost']}
+
+## ✈️ Transportation
+"""
+    for flight in plan['transportation']:
+        md += f"- **Flight {flight['option_id']}**: ${flight['price']}, {flight['duration']}\n"
+        md += f"  Departure: {flight['departure']} → Arrival: {flight['arrival']}\n"
+        md += f"  [Book Now]({flight['booking_link']})\n\n"
+
+    md += "## 🏨 Accommodation\n"
+    for hotel in plan['accommodation']:
+        md += f"- **{hotel['name']}**: ${hotel['price']}/night, Rating: {hotel['rating']}/5\n"
+        md += f"  Check-in: {hotel['check_in']} → Check-out: {hotel['check_out']}\n"
+        md += f"  [Book Now]({hotel['booking_link']})\n\n"
+
+    md += "## 📅 Daily Itinerary\n"
+    for day in plan['itinerary']['daily_plan']:
+        md += f"### {day['day_name']}, {day['date']}\n"
+        md += f"**Accommodation**: {day['accommodation']}\n\n"
+
+        for activity in day['activities']:
+            md += f"- **{activity['time']}**: {activity['activity']} (${activity['price']})\n"
+            md += f"  📍 {activity['location']}\n\n"
+
+    return md
+
+
+class ByteSink:
+    """Stand-in for a socket file: counts the bytes written and keeps nothing"""
+
+    def __init__(self):
+        self.written = 0
+        self.writes = 0
+
+    def write(self, data):
+        self.written += len(data)
+        self.writes += 1
+
+
+ITINERARY_ACTIVITIES = [("09:00", "10:30", "Marienplatz Historical Tour", "Marienplatz", 25),
+                        ("11:00", "13:00", "Deutsches Museum", "Museumsinsel 1", 15),
+                        ("14:00", "16:00", "English Garden Walk", "Englischer Garten", 0),
+                        ("19:00", "21:30", "Hofbräu Beer Garden", "Hofbräu München", 30)]
+
+
+def make_itinerary_dict(days):
+    """Itinerary shaped like call_itinerary_agent's output, with distinct strings per day"""
+    return {
+        "destination": "Munich, Germany",
+        "duration": f"{days} days",
+        "total_cost": 450 + 120 * days + 70 * days,
+        "daily_plan": [
+            {
+                "date": (date(2025, 1, 1) + timedelta(days=i)).isoformat(),
+                "day_name": (date(2025, 1, 1) + timedelta(days=i)).strftime("%A"),
+                "activities": [
+                    {"time": start, "end_time": end, "activity": f"{name} #{i}", "location": location, "price": price}
+                    for start, end, name, location, price in ITINERARY_ACTIVITIES
+                ],
+            } for i in range(days)
+        ],
+        "flight": {"id": "flight_001", "price": 450, "duration": "2h 30m", "departure": "10:30", "arrival": "13:00"},
+        "hotel": {"id": "hotel_001", "name": "Munich City Hotel", "price": 120, "rating": 4.2},
+        "bundles": [],
+    }
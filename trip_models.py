@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Typed data model for trip plans
+
+The planning pipeline passes these slotted dataclasses around instead of
+nested dicts: attribute access is checked by linters, and a 365-day itinerary
+of Activity objects is a fraction of the size of the equivalent dicts.
+
+Data coming from outside (prompts parsed by the LLM, batch payloads, sub-agent
+replies) is validated once by from_dict(), which raises TripModelError naming
+the offending field. json_codec.dumps() encodes the models directly, without
+building intermediate dicts; to_wire() converts them to plain dicts and lists
+for callers that need builtin JSON types. Field order is the wire order.
+"""
+
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class TripModelError(ValueError):
+    """Invalid trip data; the message names the offending field"""
+
+
+def _get(data: Dict[str, Any], name: str, path: str, kinds, required: bool = True, default=None):
+    value = data.get(name)
+    if value is None:
+        if required:
+            raise TripModelError(f"{path}.{name} is required")
+        return default
+    # bool is an int subclass, but never a valid price or count
+    if isinstance(value, bool) and bool not in kinds or not isinstance(value, kinds):
+        expected = " or ".join(kind.__name__ for kind in kinds)
+        raise TripModelError(f"{path}.{name} must be {expected}, got {type(value).__name__}")
+    return value
+
+
+def _mapping(data: Any, path: str) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise TripModelError(f"{path} must be an object, got {type(data).__name__}")
+    return data
+
+
+def _date(data: Dict[str, Any], name: str, path: str) -> str:
+    value = _get(data, name, path, (str,))
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise TripModelError(f"{path}.{name} must be a YYYY-MM-DD date, got '{value}'") from None
+    return value
+
+
+_NUMBER = (int, float)
+
+
+@dataclass(slots=True, kw_only=True)
+class TripRequest:
+    destination: str
+    start_date: str
+    end_date: str
+    budget: Optional[float] = None
+    interests: List[str] = field(default_factory=list)
+    travelers: int = 1
+
+    @classmethod
+    def from_dict(cls, data: Any, path: str = "trip_request") -> "TripRequest":
+        data = _mapping(data, path)
+        destination = _get(data, "destination", path, (str,)).strip()
+        if not destination:
+            raise TripModelError(f"{path}.destination must not be empty")
+        start_date, end_date = _date(data, "start_date", path), _date(data, "end_date", path)
+        if end_date < start_date:
+            raise TripModelError(f"{path}.end_date {end_date} is before start_date {start_date}")
+        budget = _get(data, "budget", path, _NUMBER, required=False)
+        if budget is not None and budget < 0:
+            raise TripModelError(f"{path}.budget must not be negative")
+        interests = _get(data, "interests", path, (list,), required=False, default=[])
+        for i, interest in enumerate(interests):
+            if not isinstance(interest, str):
+                raise TripModelError(f"{path}.interests[{i}] must be str, got {type(interest).__name__}")
+        travelers = _get(data, "travelers", path, (int,), required=False, default=1)
+        if travelers < 1:
+            raise TripModelError(f"{path}.travelers must be at least 1")
+        return cls(destination=destination, start_date=start_date, end_date=end_date, budget=budget,
+                   interests=list(interests), travelers=travelers)
+
+
+@dataclass(slots=True, kw_only=True)
+class Flight:
+    id: str
+    price: float
+    duration: Optional[str] = None
+    departure: Optional[str] = None
+    arrival: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Any, path: str = "flight") -> "Flight":
+        data = _mapping(data, path)
+        return cls(
+            id=_option_id(data, path),
+            price=_price(data, path),
+            duration=_get(data, "duration", path, (str,), required=False),
+            departure=_get(data, "departure", path, (str,), required=False),
+            arrival=_get(data, "arrival", path, (str,), required=False),
+        )
+
+
+@dataclass(slots=True, kw_only=True)
+class Hotel:
+    id: str
+    name: Optional[str] = None
+    price: float
+    rating: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Any, path: str = "hotel") -> "Hotel":
+        data = _mapping(data, path)
+        return cls(
+            id=_option_id(data, path),
+            name=_get(data, "name", path, (str,), required=False),
+            price=_price(data, path),
+            rating=_get(data, "rating", path, _NUMBER, required=False),
+        )
+
+
+def _option_id(data: Dict[str, Any], path: str) -> str:
+    # The sub-agents call it option_id
+    if data.get("id") is None and data.get("option_id") is not None:
+        return str(data["option_id"])
+    return str(_get(data, "id", path, (str, int)))
+
+
+def _price(data: Dict[str, Any], path: str) -> float:
+    price = _get(data, "price", path, _NUMBER)
+    if price < 0:
+        raise TripModelError(f"{path}.price must not be negative")
+    return price
+
+
+@dataclass(slots=True, kw_only=True)
+class Activity:
+    """One scheduled activity of a day plan"""
+    time: str
+    end_time: Optional[str] = None
+    activity: str
+    location: Optional[str] = None
+    price: float = 0
+
+    @classmethod
+    def from_dict(cls, data: Any, path: str = "activity") -> "Activity":
+        data = _mapping(data, path)
+        return cls(
+            time=_get(data, "time", path, (str,)),
+            end_time=_get(data, "end_time", path, (str,), required=False),
+            activity=_get(data, "activity", path, (str,)),
+            location=_get(data, "location", path, (str,), required=False),
+            price=_get(data, "price", path, _NUMBER, required=False, default=0),
+        )
+
+
+@dataclass(slots=True, kw_only=True)
+class DayPlan:
+    date: str
+    day_name: str
+    activities: List[Activity] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Any, path: str = "day") -> "DayPlan":
+        data = _mapping(data, path)
+        activities = _get(data, "activities", path, (list,), required=False, default=[])
+        return cls(
+            date=_date(data, "date", path),
+            day_name=_get(data, "day_name", path, (str,)),
+            activities=[Activity.from_dict(a, f"{path}.activities[{i}]") for i, a in enumerate(activities)],
+        )
+
+
+@dataclass(slots=True, kw_only=True)
+class Itinerary:
+    destination: str
+    duration: str
+    total_cost: float
+    daily_plan: List[DayPlan] = field(default_factory=list)
+    flight: Optional[Flight] = None
+    hotel: Optional[Hotel] = None
+    bundles: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Any, path: str = "itinerary") -> "Itinerary":
+        data = _mapping(data, path)
+        days = _get(data, "daily_plan", path, (list,), required=False, default=[])
+        flight, hotel = data.get("flight"), data.get("hotel")
+        return cls(
+            destination=_get(data, "destination", path, (str,)),
+            duration=_get(data, "duration", path, (str,)),
+            total_cost=_get(data, "total_cost", path, _NUMBER),
+            daily_plan=[DayPlan.from_dict(day, f"{path}.daily_plan[{i}]") for i, day in enumerate(days)],
+            flight=Flight.from_dict(flight, f"{path}.flight") if flight is not None else None,
+            hotel=Hotel.from_dict(hotel, f"{path}.hotel") if hotel is not None else None,
+            bundles=list(_get(data, "bundles", path, (list,), required=False, default=[])),
+        )
+
+
+MODELS = (TripRequest, Flight, Hotel, Activity, DayPlan, Itinerary)
+_FIELD_NAMES = {model: tuple(f.name for f in fields(model)) for model in MODELS}
+
+
+def to_wire(value: Any) -> Any:
+    """value with every model replaced by a plain dict, recursing into dicts and lists"""
+    names = _FIELD_NAMES.get(type(value))
+    if names is not None:
+        return {name: to_wire(getattr(value, name)) for name in names}
+    if isinstance(value, dict):
+        return {key: to_wire(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_wire(item) for item in value]
+    return value
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Deterministic fast-path parser for trip requests
+
+Extracts destination, dates, budget, travelers and interests from common prompt
+shapes with precompiled regular expressions, and scores how much of the request
+it understood. TripRequestParser only falls back to the LLM when that
+confidence is below its threshold or a date range could not be used (e.g. it
+ends before it starts), and counts how often the fast path is used.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_DESTINATION = "Munich, Germany"
+DEFAULT_BUDGET = 800
+DEFAULT_DURATION_DAYS = 3
+DEFAULT_LEAD_DAYS = 14  # trips without explicit dates start two weeks out
+
+# Field weights used for the confidence score
+FIELD_WEIGHTS = {
+    "destination": 0.4,
+    "dates": 0.3,
+    "budget": 0.2,
+    "interests": 0.1,
+}
+FAST_PATH_MIN_CONFIDENCE = 0.6
+
+CITIES = {
+    "amsterdam": "Amsterdam, Netherlands",
+    "athens": "Athens, Greece",
+    "bangkok": "Bangkok, Thailand",
+    "barcelona": "Barcelona, Spain",
+    "berlin": "Berlin, Germany",
+    "boston": "Boston, USA",
+    "brussels": "Brussels, Belgium",
+    "budapest": "Budapest, Hungary",
+    "buenos aires": "Buenos Aires, Argentina",
+    "cape town": "Cape Town, South Africa",
+    "chicago": "Chicago, USA",
+    "copenhagen": "Copenhagen, Denmark",
+    "dubai": "Dubai, United Arab Emirates",
+    "dublin": "Dublin, Ireland",
+    "edinburgh": "Edinburgh, United Kingdom",
+    "florence": "Florence, Italy",
+    "frankfurt": "Frankfurt, Germany",
+    "hamburg": "Hamburg, Germany",
+    "hong kong": "Hong Kong, China",
+    "istanbul": "Istanbul, Turkey",
+    "kyoto": "Kyoto, Japan",
+    "lisbon": "Lisbon, Portugal",
+    "london": "London, United Kingdom",
+    "los angeles": "Los Angeles, USA",
+    "madrid": "Madrid, Spain",
+    "milan": "Milan, Italy",
+    "montreal": "Montreal, Canada",
+    "munich": "Munich, Germany",
+    "münchen": "Munich, Germany",
+    "new york": "New York, USA",
+    "nyc": "New York, USA",
+    "oslo": "Oslo, Norway",
+    "paris": "Paris, France",
+    "prague": "Prague, Czech Republic",
+    "reykjavik": "Reykjavik, Iceland",
+    "rome": "Rome, Italy",
+    "salzburg": "Salzburg, Austria",
+    "san francisco": "San Francisco, USA",
+    "seoul": "Seoul, South Korea",
+    "singapore": "Singapore, Singapore",
+    "stockholm": "Stockholm, Sweden",
+    "sydney": "Sydney, Australia",
+    "tokyo": "Tokyo, Japan",
+    "toronto": "Toronto, Canada",
+    "venice": "Venice, Italy",
+    "vienna": "Vienna, Austria",
+    "warsaw": "Warsaw, Poland",
+    "zurich": "Zurich, Switzerland",
+}
+
+# Canonical interest -> keywords that imply it (order defines output order on ties)
+INTERESTS = {
+    "history": ["history", "historic", "historical", "castles", "castle", "heritage"],
+    "beer": ["beer", "beers", "brewery", "breweries", "beer garden", "beer gardens"],
+    "craft beer": ["craft beer"],
+    "Oktoberfest": ["oktoberfest", "wiesn"],
+    "food": ["food", "foodie", "culinary", "cuisine", "restaurants", "traditional food"],
+    "fine dining": ["fine dining", "michelin"],
+    "wine": ["wine", "wineries", "vineyards"],
+    "art": ["art", "galleries", "gallery"],
+    "museums": ["museum", "museums"],
+    "architecture": ["architecture"],
+    "classical music": ["classical music", "opera", "concerts"],
+    "nightlife": ["nightlife", "clubs", "bars"],
+    "shopping": ["shopping", "markets", "christmas markets"],
+    "nature": ["nature", "hiking", "mountains", "alps", "lakes"],
+    "beaches": ["beach", "beaches"],
+    "coffee culture": ["coffee", "cafes", "coffee culture"],
+    "walking tours": ["walking tour", "walking tours"],
+    "romance": ["romantic", "honeymoon"],
+    "family": ["family", "kids", "children"],
+}
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10,
+    "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14,
+}
+
+_NUM = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+_MONTH = r"(" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+
+
+def _alternation(words):
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_CITY_RE = re.compile(r"\b(" + _alternation(CITIES) + r")\b", re.IGNORECASE)
+_DESTINATION_RE = re.compile(
+    r"\b(?:to|in|visit|visiting|around)\s+([A-Z][\w'’-]+(?:\s+[A-Z][\w'’-]+){0,2})")
+_NOT_DESTINATIONS = set(MONTHS) | {
+    "a", "the", "my", "our", "spring", "summer", "autumn", "fall", "winter", "christmas", "easter",
+    "oktoberfest", "europe", "asia", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+}
+_INTEREST_KEYWORDS = {kw: name for name, kws in INTERESTS.items() for kw in kws}
+_INTEREST_RE = re.compile(r"\b(" + _alternation(_INTEREST_KEYWORDS) + r")\b", re.IGNORECASE)
+
+_ISO_RANGE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})\s*(?:to|until|through|-|–)\s*(\d{4}-\d{2}-\d{2})")
+_MONTH_DAY_RANGE_RE = re.compile(
+    r"\b" + _MONTH + r"\s+(\d{1,2})(?:st|nd|rd|th)?\s*(?:-|–|to|until|through)\s*(?:" + _MONTH + r"\s+)?"
+    r"(\d{1,2})(?:st|nd|rd|th)?(?:,?\s*(\d{4}))?", re.IGNORECASE)
+_DAY_MONTH_RANGE_RE = re.compile(
+    r"\b(\d{1,2})(?:st|nd|rd|th)?\s*(?:-|–|to|until)\s*(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?" + _MONTH +
+    r"(?:,?\s*(\d{4}))?", re.IGNORECASE)
+_DURATION_RE = re.compile(r"\b" + _NUM + r"[\s-]+(day|days|night|nights|week|weeks)\b", re.IGNORECASE)
+_WEEK_LONG_RE = re.compile(r"\bweek[\s-]?long\b", re.IGNORECASE)
+_WEEKEND_RE = re.compile(r"\b(?:long\s+)?weekend\b", re.IGNORECASE)
+_IN_MONTH_RE = re.compile(r"\b(?:in|during)\s+(early|mid|late)?[\s-]?" + _MONTH + r"\b", re.IGNORECASE)
+
+_BUDGET_RE = re.compile(
+    r"(?:(?P<pre>[$€£]|usd|eur|gbp)\s*(?P<a>\d[\d,]*(?:\.\d+)?)\s*(?P<ka>k)?\b"
+    r"|\b(?P<b>\d[\d,]*(?:\.\d+)?)\s*(?P<kb>k)?\s*(?P<post>usd|eur|euros?|gbp|dollars|bucks|€|\$)"
+    r"|\bbudget(?:\s+(?:of|is|around|about|:))*\s*(?P<c>\d[\d,]*(?:\.\d+)?)\s*(?P<kc>k)?\b)",
+    re.IGNORECASE)
+
+_TRAVELERS_RE = re.compile(
+    r"\b(?:party|group|family) of\s+" + _NUM + r"\b"
+    r"|\b" + _NUM + r"\s+(?:people|persons?|travell?ers?|adults|friends|guests|of us)\b",
+    re.IGNORECASE)
+_CHILDREN_RE = re.compile(r"\band\s+" + _NUM + r"\s+(?:kids|children|teens)\b", re.IGNORECASE)
+_COUPLE_RE = re.compile(r"\b(?:couple|honeymoon|my (?:wife|husband|partner|girlfriend|boyfriend))\b", re.IGNORECASE)
+_SOLO_RE = re.compile(r"\b(?:solo|alone|by myself|just me)\b", re.IGNORECASE)
+
+
+def _number(token: str) -> int:
+    token = token.lower()
+    return NUMBER_WORDS[token] if token in NUMBER_WORDS else int(token)
+
+
+def _next_occurrence(month: int, day: int, today: date, year: Optional[int] = None) -> date:
+    if year:
+        return date(year, month, day)
+    candidate = date(today.year, month, day)
+    return candidate if candidate >= today else date(today.year + 1, month, day)
+
+
+@dataclass
+class ParseResult:
+    """Fast-path parse output: the request plus which fields were actually found"""
+    request: Dict[str, Any]
+    found: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+    rejected: List[str] = field(default_factory=list)  # present in the prompt but unusable; needs the LLM
+
+
+def _parse_dates(text: str, today: date):
+    """Return (start, end) if explicit dates are present, else (None, duration_days or None),
+    plus whether an explicit range was present but unusable"""
+    try:
+        dates = _parse_date_range(text, today)
+    except ValueError:
+        # Impossible calendar dates such as "Feb 30-31", or a range that ends before it starts
+        return None, None, True
+    if dates:
+        return (*dates, False)
+    match = _DURATION_RE.search(text)
+    if match:
+        count, unit = _number(match.group(1)), match.group(2).lower()
+        if unit.startswith("week"):
+            return None, count * 7, False
+        if unit.startswith("night"):
+            return None, count + 1, False
+        return None, count, False
+
+    if _WEEK_LONG_RE.search(text):
+        return None, 7, False
+    if _WEEKEND_RE.search(text):
+        return None, 3 if "long" in text.lower() else 2, False
+    return None, None, False
+
+
+def _month_start(text: str, today: date) -> Optional[date]:
+    """Start date for prompts that only name a month ("4 days in December")"""
+    match = _IN_MONTH_RE.search(text)
+    if not match:
+        return None
+    day = {"mid": 15, "late": 22}.get((match.group(1) or "").lower(), 1)
+    start = _next_occurrence(MONTHS[match.group(2).lower()], day, today)
+    return start if start >= today else None
+
+
+def _parse_date_range(text: str, today: date):
+    """(start, end) of an explicit range or None; raises ValueError for impossible or inverted ranges"""
+    dates = None
+    match = _ISO_RANGE_RE.search(text)
+    if match:
+        dates = date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))
+
+    match = None if dates else _MONTH_DAY_RANGE_RE.search(text)
+    if match:
+        start_month = MONTHS[match.group(1).lower()]
+        year = int(match.group(5)) if match.group(5) else None
+        start = _next_occurrence(start_month, int(match.group(2)), today, year)
+        if match.group(3):
+            end_month = MONTHS[match.group(3).lower()]
+            dates = start, date(start.year + (end_month < start_month), end_month, int(match.group(4)))
+        else:
+            dates = start, _end_day(start, int(match.group(4)))
+
+    match = None if dates else _DAY_MONTH_RANGE_RE.search(text)
+    if match:
+        month = MONTHS[match.group(3).lower()]
+        year = int(match.group(4)) if match.group(4) else None
+        start = _next_occurrence(month, int(match.group(1)), today, year)
+        dates = start, _end_day(start, int(match.group(2)))
+
+    if dates and dates[0] > dates[1]:
+        raise ValueError(f"Date range {dates[0]} to {dates[1]} ends before it starts")
+    return dates
+
+
+def _end_day(start: date, day: int) -> date:
+    """End date for a range that only gives the end day: in start's month, or the next one
+    when the day is earlier ("Oct 28-3" ends on November 3)"""
+    if day >= start.day:
+        return date(start.year, start.month, day)
+    return date(start.year + start.month // 12, start.month % 12 + 1, day)
+
+
+def _parse_budget(text: str) -> Optional[float]:
+    match = _BUDGET_RE.search(text)
+    if not match:
+        return None
+    amount = match.group("a") or match.group("b") or match.group("c")
+    value = float(amount.replace(",", ""))
+    if match.group("ka") or match.group("kb") or match.group("kc"):
+        value *= 1000
+    return int(value) if value.is_integer() else value
+
+
+def _parse_travelers(text: str) -> Optional[int]:
+    match = _TRAVELERS_RE.search(text)
+    if match:
+        travelers = _number(match.group(1) or match.group(2))
+        children = _CHILDREN_RE.search(text)
+        if children:
+            travelers += _number(children.group(1))
+        return travelers
+    if _COUPLE_RE.search(text):
+        return 2
+    if _SOLO_RE.search(text):
+        return 1
+    return None
+
+
+def _parse_destination(text: str):
+    """Return (destination, known) where known means it matched the city gazetteer"""
+    match = _CITY_RE.search(text)
+    if match:
+        return CITIES[match.group(1).lower()], True
+    for match in _DESTINATION_RE.finditer(text):
+        if match.group(1).split()[0].lower() not in _NOT_DESTINATIONS:
+            return match.group(1), False
+    return None, False
+
+
+def _parse_interests(text: str) -> List[str]:
+    interests = []
+    for match in _INTEREST_RE.finditer(text):
+        name = _INTEREST_KEYWORDS[match.group(1).lower()]
+        if name not in interests:
+            interests.append(name)
+    return interests
+
+
+def fast_parse(user_input: str, today: Optional[date] = None) -> ParseResult:
+    """Parse a prompt without the LLM; missing fields are filled with defaults"""
+    today = today or date.today()
+    found = []
+    confidence = 0.0
+
+    destination, known = _parse_destination(user_input)
+    if destination:
+        found.append("destination")
+        confidence += FIELD_WEIGHTS["destination"] * (1.0 if known else 0.6)
+
+    start, end, dates_rejected = _parse_dates(user_input, today)
+    if start is not None:
+        found.append("dates")
+        confidence += FIELD_WEIGHTS["dates"]
+    else:
+        duration = end or DEFAULT_DURATION_DAYS
+        if end is not None:
+            found.append("dates")
+            confidence += FIELD_WEIGHTS["dates"]
+        start = _month_start(user_input, today) or today + timedelta(days=DEFAULT_LEAD_DAYS)
+        end = start + timedelta(days=duration - 1)
+
+    budget = _parse_budget(user_input)
+    if budget is not None:
+        found.append("budget")
+        confidence += FIELD_WEIGHTS["budget"]
+
+    interests = _parse_interests(user_input)
+    if interests:
+        found.append("interests")
+        confidence += FIELD_WEIGHTS["interests"]
+
+    travelers = _parse_travelers(user_input)
+    if travelers is not None:
+        found.append("travelers")
+
+    return ParseResult(
+        request={
+            "destination": destination or DEFAULT_DESTINATION,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "budget": budget if budget is not None else DEFAULT_BUDGET,
+            "interests": interests,
+            "travelers": travelers or 1,
+        },
+        found=found,
+        confidence=round(confidence, 3),
+        rejected=["dates"] if dates_rejected else [],
+    )
+
+
+class TripRequestParser:
+    """Fast-path parser with an optional LLM fallback and hit-rate counters"""
+
+    def __init__(self, llm_parse: Optional[Callable[[str], Dict[str, Any]]] = None,
+                 min_confidence: float = FAST_PATH_MIN_CONFIDENCE):
+        self.llm_parse = llm_parse
+        self.min_confidence = min_confidence
+        self.fast_path_hits = 0
+        self.llm_fallbacks = 0
+        self.llm_failures = 0
+        self._lock = threading.Lock()
+
+    def parse(self, user_input: str, today: Optional[date] = None) -> Dict[str, Any]:
+        result = fast_parse(user_input, today)
+        if (result.confidence >= self.min_confidence and not result.rejected) or self.llm_parse is None:
+            with self._lock:
+                self.fast_path_hits += 1
+            return result.request
+
+        with self._lock:
+            self.llm_fallbacks += 1
+        try:
+            llm_request = self.llm_parse(user_input)
+        except Exception as e:
+            print(f"LLM parse failed, using fast-path result: {type(e).__name__}: {str(e)}")
+            with self._lock:
+                self.llm_failures += 1
+            return result.request
+        return merge_requests(result, llm_request)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.fast_path_hits + self.llm_fallbacks
+            return {
+                "fast_path_hits": self.fast_path_hits,
+                "llm_fallbacks": self.llm_fallbacks,
+                "llm_failures": self.llm_failures,
+                "fast_path_hit_rate": round(self.fast_path_hits / total, 4) if total else 0.0,
+            }
+
+
+def merge_requests(result: ParseResult, llm_request: Dict[str, Any]) -> Dict[str, Any]:
+    """Prefer fields the fast path actually found, take the rest from the LLM when well-typed"""
+    merged = dict(result.request)
+    checks = {
+        "destination": lambda v: isinstance(v, str) and v.strip(),
+        "start_date": lambda v: isinstance(v, str) and re.fullmatch(r"\d{4}-\d{2}-\d{2}", v),
+        "end_date": lambda v: isinstance(v, str) and re.fullmatch(r"\d{4}-\d{2}-\d{2}", v),
+        "budget": lambda v: isinstance(v, (int, float)) and v > 0,
+        "interests": lambda v: isinstance(v, list) and all(isinstance(i, str) for i in v),
+        "travelers": lambda v: isinstance(v, int) and v > 0,
+    }
+    sources = {"start_date": "dates", "end_date": "dates"}
+    for key, valid in checks.items():
+        if sources.get(key, key) in result.found:
+            continue
+        value = llm_request.get(key)
+        if value is not None and valid(value):
+            merged[key] = value
+    return merged
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Streaming Markdown and HTML rendering of trip plans
+
+iter_markdown() and iter_html() yield a plan (local_testing.TripOrchestratorAgent
+output) as text chunks: the overview first, then one chunk per flight, hotel and
+day. A caller can send the first chunk before the rest is rendered and never
+holds more than one section in memory. write_trip_plan() coalesces the chunks
+into buffer_size writes on any io-style writer, such as an HTTP handler's wfile
+(unbuffered, so every write() would otherwise be its own send) or a file.
+
+Usage: python trip_renderer.py [--format markdown|html] [--days 3]
+"""
+
+import argparse
+import html
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, Optional
+
+FORMATS = ("markdown", "html")
+DEFAULT_BUFFER_SIZE = 16 * 1024
+
+
+def iter_markdown(plan: Dict[str, Any]) -> Iterator[str]:
+    """The plan as Markdown, in chunks"""
+    request = plan['request']
+    yield f"""# Trip Plan: {request['destination']}
+
+## 📋 Trip Overview
+- **Destination**: {request['destination']}
+- **Dates**: {request['dates']['start_date']} to {request['dates']['end_date']}
+- **Budget**: ${request['budget']}
+- **Interests**: {', '.join(request['interests'])}
+- **Estimated Total Cost**: ${plan['itinerary']['total_estimated_cost']}
+
+## ✈️ Transportation
+"""
+    for flight in plan['transportation']:
+        yield (f"- **Flight {flight['option_id']}**: ${flight['price']}, {flight['duration']}\n"
+               f"  Departure: {flight['departure']} → Arrival: {flight['arrival']}\n"
+               f"  [Book Now]({flight['booking_link']})\n\n")
+
+    yield "## 🏨 Accommodation\n"
+    for hotel in plan['accommodation']:
+        yield (f"- **{hotel['name']}**: ${hotel['price']}/night, Rating: {hotel['rating']}/5\n"
+               f"  Check-in: {hotel['check_in']} → Check-out: {hotel['check_out']}\n"
+               f"  [Book Now]({hotel['booking_link']})\n\n")
+
+    yield "## 📅 Daily Itinerary\n"
+    for day in plan['itinerary']['daily_plan']:
+        yield "".join([
+            f"### {day['day_name']}, {day['date']}\n",
+            f"**Accommodation**: {day['accommodation']}\n\n",
+            *(f"- **{activity['time']}**: {activity['activity']} (${activity['price']})\n"
+              f"  📍 {activity['location']}\n\n" for activity in day['activities']),
+        ])
+
+
+def _text(value: Any) -> str:
+    return html.escape(str(value))
+
+
+def _link(url: Any) -> str:
+    """Escaped href; anything but an http(s) URL becomes "#" so plan data cannot inject javascript: links"""
+    url = str(url)
+    return html.escape(url) if url.startswith(("https://", "http://")) else "#"
+
+
+def iter_html(plan: Dict[str, Any]) -> Iterator[str]:
+    """The plan as an HTML fragment (an <article>), in chunks; every value is escaped"""
+    request = plan['request']
+    yield (f'<article class="trip-plan">\n<h1>Trip Plan: {_text(request["destination"])}</h1>\n'
+           f'<h2>📋 Trip Overview</h2>\n<ul>\n'
+           f'<li><strong>Destination</strong>: {_text(request["destination"])}</li>\n'
+           f'<li><strong>Dates</strong>: {_text(request["dates"]["start_date"])} to '
+           f'{_text(request["dates"]["end_date"])}</li>\n'
+           f'<li><strong>Budget</strong>: ${_text(request["budget"])}</li>\n'
+           f'<li><strong>Interests</strong>: {_text(", ".join(request["interests"]))}</li>\n'
+           f'<li><strong>Estimated Total Cost</strong>: ${_text(plan["itinerary"]["total_estimated_cost"])}</li>\n'
+           f'</ul>\n<h2>✈️ Transportation</h2>\n<ul>\n')
+    for flight in plan['transportation']:
+        yield (f'<li><strong>Flight {_text(flight["option_id"])}</strong>: '
+               f'${_text(flight["price"])}, {_text(flight["duration"])}'
+               f'<br>Departure: {_text(flight["departure"])} → Arrival: {_text(flight["arrival"])}'
+               f'<br><a href="{_link(flight["booking_link"])}">Book Now</a></li>\n')
+
+    yield '</ul>\n<h2>🏨 Accommodation</h2>\n<ul>\n'
+    for hotel in plan['accommodation']:
+        yield (f'<li><strong>{_text(hotel["name"])}</strong>: '
+               f'${_text(hotel["price"])}/night, Rating: {_text(hotel["rating"])}/5'
+               f'<br>Check-in: {_text(hotel["check_in"])} → Check-out: {_text(hotel["check_out"])}'
+               f'<br><a href="{_link(hotel["booking_link"])}">Book Now</a></li>\n')
+
+    yield '</ul>\n<h2>📅 Daily Itinerary</h2>\n'
+    for day in plan['itinerary']['daily_plan']:
+        yield "".join([
+            f'<section class="day">\n<h3>{_text(day["day_name"])}, {_text(day["date"])}</h3>\n',
+            f'<p><strong>Accommodation</strong>: {_text(day["accommodation"])}</p>\n<ul>\n',
+            *(f'<li><strong>{_text(activity["time"])}</strong>: '
+              f'{_text(activity["activity"])} (${_text(activity["price"])})'
+              f'<br>📍 {_text(activity["location"])}</li>\n' for activity in day['activities']),
+            '</ul>\n</section>\n',
+        ])
+    yield '</article>\n'
+
+
+def iter_trip_plan(plan: Dict[str, Any], fmt: str = "markdown") -> Iterator[str]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    return iter_markdown(plan) if fmt == "markdown" else iter_html(plan)
+
+
+def write_trip_plan(plan: Dict[str, Any], writer, fmt: str = "markdown", encoding: Optional[str] = None,
+                    buffer_size: int = DEFAULT_BUFFER_SIZE) -> int:
+    """Write the rendered plan to writer in writes of about buffer_size characters; str writes,
+    or bytes when an encoding is given. Returns the number of characters (or bytes) written."""
+    buffered, size, written = [], 0, 0
+
+    def flush():
+        data = "".join(buffered)
+        if encoding:
+            data = data.encode(encoding)
+        writer.write(data)
+        buffered.clear()
+        return len(data)
+
+    for chunk in iter_trip_plan(plan, fmt):
+        buffered.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            written += flush()
+            size = 0
+    if buffered:
+        written += flush()
+    return written
+
+
+def main():
+    import asyncio
+    import contextlib
+    import os
+    from local_testing import TripOrchestratorAgent, TripRequest
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--format', choices=FORMATS, default="markdown")
+    parser.add_argument('--days', type=int, default=3)
+    args = parser.parse_args()
+
+    start = date(2024, 10, 1)
+    request = TripRequest(destination="Munich, Germany",
+                          dates={"start_date": start.isoformat(),
+                                 "end_date": (start + timedelta(days=args.days - 1)).isoformat()},
+                          budget=800 * args.days, interests=["history", "craft beer"])
+    with contextlib.redirect_stdout(open(os.devnull, "w")):  # the agents print progress
+        plan = asyncio.run(TripOrchestratorAgent().plan_trip(request))
+    write_trip_plan(plan, sys.stdout, args.format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Bounded, persistent user preference memory
+
+UserMemoryStore keeps each user's preferences (budget, interests, last
+destination, number of trips) and their most recent trips in a thread-safe LRU
+of at most max_entries users. With a SQLite path it is backed by a local
+database: misses are read from disk, and writes are queued and committed by a
+background thread in batches (write-behind), so the request path never waits
+on a disk write. Users with queued writes stay in memory until they are
+committed, so a read never sees older data than was written.
+
+remember_trip() appends to a user's history instead of overwriting it; the
+full history stays in the trips table, the last HISTORY_LIMIT trips are kept
+in memory. Without a path the store is memory-only and evicted users are
+forgotten.
+"""
+
+import atexit
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds between write-behind commits
+DEFAULT_FLUSH_BATCH = 500     # queued writes that trigger an early commit
+HISTORY_LIMIT = 20            # recent trips kept in memory per user
+MAX_INTERESTS = 20
+
+SCHEMA = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+CREATE TABLE IF NOT EXISTS preferences (user_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS trips (user_id TEXT NOT NULL, recorded_at REAL NOT NULL, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS trips_by_user ON trips (user_id, recorded_at);
+"""
+
+
+class UserMemoryStore:
+    """Thread-safe LRU of user preferences in front of an optional SQLite database"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, flush_batch: int = DEFAULT_FLUSH_BATCH):
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._entries = OrderedDict()  # user_id -> {"preferences": {...}, "history": [...]}
+        self._dirty: Dict[str, int] = {}  # user_id -> queued writes not yet committed
+        self._pending: List[tuple] = []   # ("preferences" | "trip", user_id, recorded_at, data)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.disk_reads = 0
+        self.evictions = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.max_flush_seconds = 0.0
+        self._reader = None
+        self._read_lock = threading.Lock()
+        self._writer_thread = None
+        if path:
+            writer = sqlite3.connect(path, check_same_thread=False)
+            writer.executescript(SCHEMA)
+            self._reader = sqlite3.connect(path, check_same_thread=False)
+            self._writer_thread = threading.Thread(target=self._write_behind, args=(writer,),
+                                                   name="user-memory-writer", daemon=True)
+            self._writer_thread.start()
+            atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> "UserMemoryStore":
+        """Store configured from USER_MEMORY_PATH (unset: memory-only), USER_MEMORY_MAX_ENTRIES,
+        USER_MEMORY_FLUSH_INTERVAL and USER_MEMORY_FLUSH_BATCH"""
+        return cls(
+            path=os.environ.get("USER_MEMORY_PATH") or None,
+            max_entries=int(os.environ.get("USER_MEMORY_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            flush_interval=float(os.environ.get("USER_MEMORY_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)),
+            flush_batch=int(os.environ.get("USER_MEMORY_FLUSH_BATCH", DEFAULT_FLUSH_BATCH)),
+        )
+
+    # dict-style access to the preferences, as the old plain dict offered
+    def __getitem__(self, user_id: str) -> Dict[str, Any]:
+        preferences = self.get(user_id)
+        if preferences is None:
+            raise KeyError(user_id)
+        return preferences
+
+    def __setitem__(self, user_id: str, preferences: Dict[str, Any]):
+        self.put(user_id, preferences)
+
+    def __contains__(self, user_id: str) -> bool:
+        return self.get(user_id) is not None
+
+    def get(self, user_id: str, default: Any = None) -> Any:
+        """Copy of the user's preferences, or default for unknown users"""
+        entry = self._entry(user_id)
+        return copy.deepcopy(entry["preferences"]) if entry is not None else default
+
+    def history(self, user_id: str) -> List[Dict[str, Any]]:
+        """The user's most recent trips (at most HISTORY_LIMIT), oldest first"""
+        entry = self._entry(user_id)
+        return copy.deepcopy(entry["history"]) if entry is not None else []
+
+    def put(self, user_id: str, preferences: Dict[str, Any]):
+        """Replace the user's preferences"""
+        preferences = copy.deepcopy(preferences)
+        self._update(user_id, lambda entry: entry.update(preferences=preferences),
+                     ("preferences", user_id, time.time(), preferences))
+
+    def remember_trip(self, user_id: str, trip: Dict[str, Any]) -> Dict[str, Any]:
+        """Append a trip ({"destination", "budget", "interests", ...}) to the user's history,
+        fold it into their preferences and return the updated preferences"""
+        trip = copy.deepcopy(trip)
+        now = time.time()
+        entry = self._entry(user_id) or {"preferences": {}, "history": []}
+        updated = {}
+
+        def apply(entry):
+            preferences = dict(entry["preferences"])
+            interests = list(dict.fromkeys(list(trip.get("interests", [])) + preferences.get("interests", [])))
+            preferences.update(
+                budget=trip.get("budget", preferences.get("budget")),
+                interests=interests[:MAX_INTERESTS],
+                last_destination=trip.get("destination", preferences.get("last_destination")),
+                trips=preferences.get("trips", 0) + 1,
+            )
+            entry["preferences"] = preferences
+            entry["history"] = (entry["history"] + [dict(trip, recorded_at=now)])[-HISTORY_LIMIT:]
+            updated.update(copy.deepcopy(preferences))
+
+        self._update(user_id, apply, ("trip", user_id, now, trip), entry)
+        return updated
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write is committed; False on timeout (no-op when memory-only)"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._wakeup:
+            while (self._pending or self._dirty) and self._writer_thread is not None:
+                self._wakeup.notify_all()
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._wakeup.wait(min(remaining, 0.05) if remaining is not None else 0.05)
+        return True
+
+    def close(self):
+        """Commit queued writes and stop the writer thread"""
+        if self._writer_thread is None or self._closed:
+            return
+        self.flush()
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify_all()
+        self._writer_thread.join()
+        self._reader.close()
+        atexit.unregister(self.close)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "pending_writes": len(self._pending),
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_reads": self.disk_reads,
+                "evictions": self.evictions,
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+                "max_flush_ms": round(self.max_flush_seconds * 1000, 3),
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _entry(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        if self._reader is None:
+            return None
+        loaded = self._read_disk(user_id)
+        if loaded is None:
+            return None
+        with self._lock:
+            # Another thread may have written this user while we were reading
+            entry = self._entries.setdefault(user_id, loaded)
+            self._entries.move_to_end(user_id)
+            self._evict()
+            return entry
+
+    def _update(self, user_id: str, apply, write: tuple, entry: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            entry = self._entries.get(user_id) or entry or {"preferences": {}, "history": []}
+            apply(entry)
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            if self._writer_thread is not None:
+                self._pending.append(write)
+                self._dirty[user_id] = self._dirty.get(user_id, 0) + 1
+                if len(self._pending) >= self.flush_batch:
+                    self._wakeup.notify_all()
+            self._evict()
+
+    def _evict(self):
+        # Called with the lock held; users with uncommitted writes are never evicted
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        victims = []
+        for user_id in self._entries:  # oldest first
+            if len(victims) == excess:
+                break
+            if user_id not in self._dirty:
+                victims.append(user_id)
+        for user_id in victims:
+            del self._entries[user_id]
+        self.evictions += len(victims)
+
+    def _read_disk(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._read_lock:
+            row = self._reader.execute("SELECT data FROM preferences WHERE user_id = ?", (user_id,)).fetchone()
+            trips = self._reader.execute(
+                "SELECT recorded_at, data FROM trips WHERE user_id = ? ORDER BY recorded_at DESC LIMIT ?",
+                (user_id, HISTORY_LIMIT)).fetchall()
+        with self._lock:
+            self.disk_reads += 1
+        if row is None and not trips:
+            return None
+        history = [dict(json.loads(data), recorded_at=recorded_at) for recorded_at, data in reversed(trips)]
+        return {"preferences": json.loads(row[0]) if row else {}, "history": history}
+
+    def _write_behind(self, connection):
+        while True:
+            with self._wakeup:
+                if not self._pending and not self._closed:
+                    self._wakeup.wait(self.flush_interval)
+                if self._closed and not self._pending:
+                    break
+                batch, self._pending = self._pending, []
+                if not batch:
+                    continue
+                # The latest preferences of each user in the batch are written along with its trips.
+                # Updates replace the preferences dict rather than mutating it, so it is safe to
+                # serialize outside the lock.
+                latest = {user_id: (self._entries[user_id]["preferences"], recorded_at)
+                          for _, user_id, recorded_at, _ in batch}
+            preferences = {user_id: (json.dumps(data), recorded_at) for user_id, (data, recorded_at) in latest.items()}
+            trips = [(user_id, recorded_at, json.dumps(data))
+                     for kind, user_id, recorded_at, data in batch if kind == "trip"]
+            started = time.perf_counter()
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO preferences (user_id, data, updated_at) VALUES (?, ?, ?)",
+                        [(user_id, data, recorded_at) for user_id, (data, recorded_at) in preferences.items()])
+                    connection.executemany("INSERT INTO trips (user_id, recorded_at, data) VALUES (?, ?, ?)", trips)
+            except sqlite3.Error as e:
+                print(f"⚠️ User memory write failed, retrying: {e}")
+                with self._wakeup:
+                    self._pending = batch + self._pending
+                    self._wakeup.wait(self.flush_interval)
+                continue
+            with self._wakeup:
+                for _, user_id, _, _ in batch:
+                    self._dirty[user_id] -= 1
+                    if not self._dirty[user_id]:
+                        del self._dirty[user_id]
+                self.flushes += 1
+                self.rows_written += len(preferences) + len(trips)
+                self.max_flush_seconds = max(self.max_flush_seconds, time.perf_counter() - started)
+                self._evict()
+                self._wakeup.notify_all()
+        connection.close()